@@ -0,0 +1,462 @@
+"""功能组件基准测试套件：在模拟的系统环境（fake_os）中运行三个功能组件
+
+测量项目：
+- monitor_tick: 音量监控一个检测周期的耗时，随进程数和音频会话数变化（空闲场景，需要完整扫描）
+- key_dispatch: 键盘钩子回调的吞吐量，以及从按键到向媒体会话发送播放/暂停的延迟
+- media_toggle: 媒体控制器播放/暂停一次的耗时（使用缓存的会话列表 / 每次重新枚举）
+- save: 从按下保存键到保存动作完成的端到端耗时；标题没有修改标记的文档的端到端耗时
+- autosave: 定时自动保存一批后台文档窗口的耗时（不含保存间隔）
+- status_publish: 连续发布状态更新的耗时，以及实际安排的界面刷新次数（合并后）
+- warning_dialog: 反复触发音量警告时每次显示的耗时，以及实际创建的窗口数（应为1）
+- state_store: 修改持久化状态的耗时、批量写出一批变更的耗时，以及重新打开数据库并载入状态的耗时
+- inject: 各按键注入后端发送单个按键和组合键的耗时（原生后端只在对应平台上测量，见bench_injection.py）
+- cold_start: 各入口脚本的冷启动时间（新解释器中导入模块并创建窗口）
+
+结果以JSON保存，可与之前保存的基线比较，超出容差的项目视为性能回退（退出码为1）:
+    python benchmarks/bench_components.py --output benchmarks/baseline.json
+    python benchmarks/bench_components.py --baseline benchmarks/baseline.json
+
+没有图形界面时自动替换tkinter（结果中fake_tk为true），此时窗口创建不计入耗时。
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(BENCH_DIR, '..', 'src')
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, SRC_DIR)
+
+import fake_os
+from state_store import STATE_PATH_ENV
+
+# 入口脚本 -> 应用类名
+ENTRY_POINTS = {
+    'volume_monitor': 'VolumeMonitorApp',
+    'hotkey_controller': 'HotkeyControllerApp',
+    'document_saver': 'DocumentSaverApp',
+    'smart_assistant': 'SmartAssistantApp',
+}
+
+
+def summarize(samples):
+    """耗时样本（秒）的统计信息"""
+    ordered = sorted(samples)
+    return {
+        'n': len(ordered),
+        'mean': statistics.fmean(ordered),
+        'p50': ordered[len(ordered) // 2],
+        'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        'max': ordered[-1],
+    }
+
+
+def make_injector(desktop):
+    """把注入的按键交给模拟桌面处理的注入后端"""
+    from input_injector import RecordingInjector
+    return RecordingInjector(on_send=lambda keys: desktop.inject(*keys))
+
+
+def make_tracker(desktop):
+    """由模拟桌面的焦点/标题变化事件驱动的前台窗口跟踪器"""
+    from foreground_tracker import ForegroundTracker, FakeForegroundBackend
+    backend = FakeForegroundBackend()
+    tracker = ForegroundTracker(backend, pid_source=lambda: list(desktop.processes))
+    tracker.start()
+    desktop.foreground_listeners.append(backend.set_foreground)
+    return tracker
+
+
+class DisabledFeed:
+    """不使用Linux进程连接器，与Windows上一样通过pid差集刷新进程表"""
+
+    def start(self):
+        return False
+
+
+def bench_monitor_tick(desktop, process_counts, session_counts, ticks):
+    import volume_monitor
+    from audio_backend import FakeAudioBackend
+    from keyboard_bus import KeyboardBus
+    volume_monitor.ProcConnectorFeed = DisabledFeed
+
+    results = {}
+    for process_count in process_counts:
+        for session_count in session_counts:
+            desktop.populate(process_count, session_count)
+            app = volume_monitor.VolumeMonitorApp(audio_backend=FakeAudioBackend(), keyboard_bus=KeyboardBus())
+            # 停止后台监控线程，由基准测试逐个驱动检测周期
+            app.stop()
+            app.check_once()
+            samples = []
+            for _ in range(ticks):
+                desktop.churn()
+                start = time.perf_counter()
+                app.check_once()
+                samples.append(time.perf_counter() - start)
+            results[f'monitor_tick/processes={process_count},sessions={session_count}'] = summarize(samples)
+    return results
+
+
+def bench_key_dispatch(desktop, presses, latency_samples):
+    from hotkey_controller import HotkeyControllerApp
+    from keyboard_bus import KeyboardBus
+    from pynput import keyboard
+
+    from media_control import MediaController, FakeMediaBackend
+
+    bus = KeyboardBus()
+    media = FakeMediaBackend()
+    media.add_player('vlc', 'VLC media player', playing=True)
+    app = HotkeyControllerApp(keyboard_bus=bus, foreground_tracker=make_tracker(desktop),
+                              input_injector=make_injector(desktop), media_controller=MediaController(media))
+    listener = keyboard.Listener.instances[-1]
+    desktop.focus('vlc.exe', '电影 - VLC media player')
+    results = {}
+
+    # 钩子回调吞吐量：连续按键，大部分请求被令牌桶限流或合并
+    start = time.perf_counter()
+    for _ in range(presses):
+        listener.press('a')
+    elapsed = time.perf_counter() - start
+    results['key_dispatch/throughput'] = {'n': presses, 'mean': elapsed / presses,
+                                          'per_second': presses / elapsed}
+
+    # 按键到播放/暂停命令的延迟：取消限流，每次等待命令发出
+    app.executor.set_limit('pause_video', None)
+    toggled_at = []
+    play_pause = media.play_pause
+
+    def timed_play_pause(session):
+        play_pause(session)
+        toggled_at.append(time.perf_counter())
+    media.play_pause = timed_play_pause
+    samples = []
+    for _ in range(latency_samples):
+        count = len(toggled_at)
+        start = time.perf_counter()
+        listener.press('a')
+        if not fake_os.wait_for(lambda: len(toggled_at) > count):
+            raise RuntimeError("按键后未发送播放/暂停命令")
+        samples.append(toggled_at[-1] - start)
+    if desktop.injected:
+        raise RuntimeError(f"有媒体会话时不应注入按键: {desktop.injected[:3]}")
+    results['key_dispatch/press_to_toggle'] = summarize(samples)
+    app.stop()
+    return results
+
+
+def bench_save(desktop, samples_count):
+    from document_saver import DocumentSaverApp
+    from keyboard_bus import KeyboardBus
+    from metrics import get_metrics
+    from pynput import keyboard
+
+    bus = KeyboardBus()
+    app = DocumentSaverApp(keyboard_bus=bus, foreground_tracker=make_tracker(desktop),
+                           input_injector=make_injector(desktop))
+    app.executor.set_limit('save_document', None)
+    listener = keyboard.Listener.instances[-1]
+    completed = get_metrics().histogram('focus_action_seconds', '', ('action',)).labels('save_document')
+    samples = []
+    for index in range(samples_count):
+        desktop.focus('notepad.exe', f'*笔记{index}.txt - 记事本')
+        count = completed.count
+        start = time.perf_counter()
+        listener.press('a')
+        if not fake_os.wait_for(lambda: completed.count > count, timeout=10.0):
+            raise RuntimeError("保存动作未完成")
+        samples.append(time.perf_counter() - start)
+    # 标题没有修改标记：手动保存照常发送快捷键，规则只用于标注结果
+    clean = []
+    for index in range(samples_count):
+        desktop.focus('notepad.exe', f'笔记{index}.txt - 记事本')
+        count = completed.count
+        injected = len(desktop.injected)
+        start = time.perf_counter()
+        listener.press('a')
+        if not fake_os.wait_for(lambda: completed.count > count, timeout=10.0):
+            raise RuntimeError("保存动作未完成")
+        clean.append(time.perf_counter() - start)
+        if len(desktop.injected) == injected:
+            raise RuntimeError("标题没有修改标记时没有发送保存快捷键")
+    app.stop()
+    return {'save/end_to_end': summarize(samples), 'save/clean_title': summarize(clean)}
+
+
+def bench_autosave(desktop, batches, window_count):
+    from document_saver import DocumentSaverApp
+    from keyboard_bus import KeyboardBus
+
+    tracker = make_tracker(desktop)
+    window_source = lambda: [(hwnd, title, hwnd) for hwnd, title in desktop.windows.items()]
+    app = DocumentSaverApp(keyboard_bus=KeyboardBus(), foreground_tracker=tracker,
+                           window_source=window_source, idle_source=lambda: float('inf'),
+                           input_injector=make_injector(desktop))
+    app.auto_saver.spacing = 0.0
+    samples = []
+    for batch in range(batches):
+        desktop.windows.clear()
+        desktop.focus('winword.exe', '报告 - Word')
+        for index in range(window_count):
+            desktop.open_window('notepad.exe', f'*草稿{batch}-{index}.txt - 记事本')
+        start = time.perf_counter()
+        results = app.auto_saver.run_batch()
+        samples.append(time.perf_counter() - start)
+        if len(results) != window_count or any(status != 'confirmed' for _, status in results):
+            raise RuntimeError(f"自动保存结果不符: {results}")
+        if desktop.foreground_title != '报告 - Word':
+            raise RuntimeError("自动保存后没有恢复原来的前台窗口")
+    app.stop()
+    return {f'autosave/batch_windows={window_count}': summarize(samples)}
+
+
+def bench_inject(desktop, samples_count):
+    from input_injector import PyAutoGuiInjector
+    results = {}
+    for injector in (make_injector(desktop), PyAutoGuiInjector()):
+        for label, keys in (('press', ('space',)), ('chord', ('alt', 'tab'))):
+            samples = []
+            for _ in range(samples_count):
+                start = time.perf_counter()
+                injector.hotkey(*keys)
+                samples.append(time.perf_counter() - start)
+            results[f'inject/{injector.name}/{label}'] = summarize(samples)
+    desktop.injected.clear()
+    return results
+
+
+def bench_media_toggle(samples_count, session_count=8, discovery_delay=0.002):
+    """枚举会话按discovery_delay模拟系统调用耗时（SMTC/D-Bus枚举通常为毫秒级）"""
+    from media_control import MediaController, FakeMediaBackend
+    results = {}
+    for label, ttl in (('cached', 60.0), ('uncached', 0.0)):
+        backend = FakeMediaBackend(discovery_delay=discovery_delay)
+        backend.supports_events = False
+        for index in range(session_count):
+            backend.add_player(f'player{index}', playing=index == 0)
+        controller = MediaController(backend, ttl=ttl)
+        samples = []
+        for _ in range(samples_count):
+            start = time.perf_counter()
+            controller.toggle()
+            samples.append(time.perf_counter() - start)
+        results[f'media_toggle/{label}'] = dict(summarize(samples), discoveries=backend.discoveries)
+    return results
+
+
+def bench_status_publish(publishes, slots=3):
+    from ui_updates import StatusBoard
+
+    class Root:
+        """记录after回调，由基准测试手动执行"""
+        def __init__(self):
+            self.callbacks = []
+
+        def after(self, ms, func):
+            self.callbacks.append(func)
+
+    root = Root()
+    board = StatusBoard(root)
+    applied = []
+    for slot in range(slots):
+        board.slot(slot, applied.append)
+    samples = []
+    for index in range(publishes):
+        start = time.perf_counter()
+        board.publish(index % slots, f'状态 {index}')
+        samples.append(time.perf_counter() - start)
+    scheduled = len(root.callbacks)
+    for callback in root.callbacks:
+        callback()
+    return {'status_publish/burst': dict(summarize(samples), scheduled=scheduled, applied=len(applied))}
+
+
+def bench_warning_dialog(triggers):
+    """用户不在时反复触发音量警告：始终只有一个窗口，重复触发只更新计数"""
+    import tkinter
+    from dialogs import WarningDialog
+
+    root = tkinter.Tk()
+    root.withdraw()
+    dialog = WarningDialog(root, "音量提示", "检测到当前为外放状态，已设置系统为静音",
+                           actions=[("取消静音设置", lambda: None, 15)])
+    samples = []
+    for _ in range(triggers):
+        start = time.perf_counter()
+        dialog.show()
+        root.update_idletasks()
+        samples.append(time.perf_counter() - start)
+    count = dialog.count
+    dialog.destroy()
+    root.destroy()
+    return {'warning_dialog/repeat': dict(summarize(samples), windows=dialog.builds, count=count)}
+
+
+def bench_state_store(samples_count, keys=50):
+    """状态存储：修改一个键的耗时（热路径，只写内存）、批量写出的耗时和启动时载入命名空间的耗时"""
+    from state_store import StateStore
+
+    path = os.path.join(tempfile.mkdtemp(prefix='focus-state-'), 'state.db')
+    # 只测量显式的flush，不启动后台写出线程的定时写出
+    store = StateStore(path, flush_interval=3600)
+    state = store.namespace('bench')
+    set_samples = []
+    flush_samples = []
+    for index in range(samples_count):
+        for key in range(keys):
+            start = time.perf_counter()
+            state.set(f'last_run.action{key}', time.time())
+            set_samples.append(time.perf_counter() - start)
+        state.incr('runs')
+        start = time.perf_counter()
+        store.flush()
+        flush_samples.append(time.perf_counter() - start)
+    store.close()
+    load_samples = []
+    for _ in range(max(3, samples_count // 10)):
+        start = time.perf_counter()
+        reopened = StateStore(path, flush_interval=3600)
+        reopened.namespace('bench')
+        load_samples.append(time.perf_counter() - start)
+        reopened.close()
+    return {
+        'state_store/set': summarize(set_samples),
+        f'state_store/flush_keys={keys}': summarize(flush_samples),
+        'state_store/open_and_load': summarize(load_samples),
+    }
+
+
+def cold_start_child(module_name, fake_tk):
+    """在新解释器中运行：安装模拟模块后导入入口脚本并创建窗口"""
+    start = time.perf_counter()
+    fake_os.install(fake_os.FakeDesktop(), fake_tk=fake_tk)
+    import importlib
+    module = importlib.import_module(module_name)
+    imported = time.perf_counter()
+    app = getattr(module, ENTRY_POINTS[module_name])()
+    app.root.update()
+    ready = time.perf_counter()
+    print(json.dumps({'import': imported - start, 'ready': ready - start}), flush=True)
+    # 不等待组件清理，直接结束进程
+    os._exit(0)
+
+
+def bench_cold_start(fake_tk, runs):
+    results = {}
+    for module_name in ENTRY_POINTS:
+        totals = []
+        imports = []
+        for _ in range(runs):
+            args = [sys.executable, os.path.abspath(__file__), '--cold-start-child', module_name]
+            if fake_tk:
+                args.append('--fake-tk')
+            start = time.perf_counter()
+            output = subprocess.run(args, capture_output=True, text=True, cwd=SRC_DIR, timeout=60).stdout
+            total = time.perf_counter() - start
+            lines = [line for line in output.splitlines() if line.startswith('{')]
+            if not lines:
+                raise RuntimeError(f"{module_name} 未报告启动结果")
+            # 进程总耗时包含解释器启动和退出
+            child = json.loads(lines[-1])
+            totals.append(total)
+            imports.append(child['import'])
+        results[f'cold_start/{module_name}'] = dict(summarize(totals), import_mean=statistics.fmean(imports))
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """与基线比较平均耗时，返回回退的项目"""
+    regressions = []
+    print(f"\n{'项目':<48} {'基线':>10} {'当前':>10} {'变化':>8}")
+    for name, current in sorted(results.items()):
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            print(f"{name:<48} {'-':>10} {current['mean'] * 1000:>8.3f}ms {'新增':>8}")
+            continue
+        change = current['mean'] / base['mean'] - 1 if base['mean'] else 0.0
+        flag = ''
+        if change > tolerance:
+            regressions.append(name)
+            flag = ' !'
+        print(f"{name:<48} {base['mean'] * 1000:>8.3f}ms {current['mean'] * 1000:>8.3f}ms {change:>+7.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="功能组件基准测试（模拟系统环境）")
+    parser.add_argument('--output', help="把结果保存为JSON（可作为基线）")
+    parser.add_argument('--baseline', help="与基线JSON比较")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="允许的平均耗时增长比例（默认0.25）")
+    parser.add_argument('--quick', action='store_true', help="减少样本数，快速检查")
+    parser.add_argument('--skip-cold-start', action='store_true')
+    parser.add_argument('--fake-tk', action='store_true', help="即使有图形界面也替换tkinter")
+    parser.add_argument('--cold-start-child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    fake_tk = args.fake_tk or not fake_os.has_display()
+    # 组件状态写入临时数据库，不读写用户的状态文件（冷启动子进程继承同一路径）
+    os.environ.setdefault(STATE_PATH_ENV, os.path.join(tempfile.mkdtemp(prefix='focus-bench-'), 'state.db'))
+    if args.cold_start_child:
+        cold_start_child(args.cold_start_child, fake_tk)
+        return
+
+    desktop = fake_os.FakeDesktop()
+    fake_os.install(desktop, fake_tk=fake_tk)
+    # 与实际运行时相同的日志配置（默认INFO级别），但不输出到控制台
+    from app_logging import setup_logging
+    setup_logging('bench', log_dir=tempfile.mkdtemp(prefix='focus-bench-'), console=False)
+
+    scale = 0.2 if args.quick else 1.0
+    results = {}
+    results.update(bench_monitor_tick(desktop, (100, 1000, 5000), (5, 50), ticks=max(10, int(200 * scale))))
+    results.update(bench_key_dispatch(desktop, presses=int(20000 * scale), latency_samples=max(10, int(200 * scale))))
+    results.update(bench_save(desktop, samples_count=max(3, int(10 * scale))))
+    results.update(bench_media_toggle(samples_count=max(50, int(500 * scale))))
+    results.update(bench_status_publish(publishes=max(1000, int(10000 * scale))))
+    results.update(bench_warning_dialog(triggers=max(20, int(100 * scale))))
+    results.update(bench_state_store(samples_count=max(20, int(100 * scale))))
+    results.update(bench_inject(desktop, samples_count=max(100, int(2000 * scale))))
+    results.update(bench_autosave(desktop, batches=max(3, int(10 * scale)), window_count=5))
+    if not args.skip_cold_start:
+        results.update(bench_cold_start(fake_tk, runs=max(1, int(5 * scale))))
+
+    print(f"{'项目':<48} {'平均':>10} {'p50':>10} {'p95':>10}")
+    for name, result in sorted(results.items()):
+        p50 = f"{result['p50'] * 1000:>8.3f}ms" if 'p50' in result else f"{'-':>10}"
+        p95 = f"{result['p95'] * 1000:>8.3f}ms" if 'p95' in result else f"{'-':>10}"
+        print(f"{name:<48} {result['mean'] * 1000:>8.3f}ms {p50} {p95}")
+
+    report = {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'fake_tk': fake_tk,
+            'quick': args.quick,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已保存到 {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n性能回退（超过 {args.tolerance:.0%}）: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\n没有超出容差的性能回退")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""组件启动基准测试：比较子进程模式与进程内宿主模式的冷启动时间和常驻内存
+
+需要在已安装全部依赖的桌面环境（Windows）中运行:
+    python benchmarks/bench_host_startup.py
+
+- 子进程模式：为每个组件启动一个独立解释器，冷启动时间为所有组件窗口就绪的时间，内存为各子进程RSS之和
+- 进程内模式：在一个解释器、一个Tk根窗口下启动全部组件
+
+尚未收集结果：目前的开发和CI环境没有Windows桌面（无法创建Tk窗口，也没有pycaw/pywin32），
+这两种模式的对比数据需要在目标机器上运行本脚本后补充。
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+COMPONENT_NAMES = ['volume', 'hotkey', 'saver']
+
+
+def current_rss():
+    """当前进程的常驻内存（字节）"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def run_child(names, hosted):
+    """在当前解释器中启动组件，窗口就绪后输出一行JSON结果"""
+    start = time.perf_counter()
+    import tkinter as tk
+    from component_host import ComponentHost, COMPONENTS
+    if hosted:
+        root = tk.Tk()
+        root.withdraw()
+        host = ComponentHost(root)
+        for name in names:
+            host.start(name)
+        root.update()
+        apps = list(host.components.values())
+    else:
+        import importlib
+        module_name, class_name = COMPONENTS[names[0]]
+        app = getattr(importlib.import_module(module_name), class_name)()
+        app.root.update()
+        apps = [app]
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'elapsed': elapsed, 'rss': current_rss()}), flush=True)
+    for app in apps:
+        app.stop()
+
+
+def spawn(args):
+    return subprocess.Popen([sys.executable, os.path.abspath(__file__)] + args,
+                            stdout=subprocess.PIPE, text=True, cwd=SRC_DIR)
+
+
+def read_result(process):
+    # 组件会向标准输出打印日志，只取最后一行JSON结果
+    result = None
+    for line in process.stdout:
+        line = line.strip()
+        if line.startswith('{'):
+            result = json.loads(line)
+            break
+    process.kill()
+    process.wait()
+    if result is None:
+        raise RuntimeError("子进程未报告启动结果")
+    return result
+
+
+def measure_subprocess_mode():
+    start = time.perf_counter()
+    processes = [spawn(['--child', name]) for name in COMPONENT_NAMES]
+    results = [read_result(process) for process in processes]
+    return time.perf_counter() - start, sum(result['rss'] for result in results)
+
+
+def measure_in_process_mode():
+    start = time.perf_counter()
+    result = read_result(spawn(['--hosted'] + COMPONENT_NAMES))
+    return time.perf_counter() - start, result['rss']
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == '--child':
+        run_child(sys.argv[2:3], hosted=False)
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == '--hosted':
+        run_child(sys.argv[2:], hosted=True)
+        return
+
+    print(f"{'模式':<10} {'冷启动':>10} {'RSS':>10}")
+    for label, measure in (('子进程', measure_subprocess_mode), ('进程内', measure_in_process_mode)):
+        elapsed, rss = measure()
+        print(f"{label:<10} {elapsed * 1000:>8.0f}ms {rss / 1024 / 1024:>8.1f}MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""按键注入延迟基准测试：在真实桌面上比较原生注入后端与pyautogui（默认PAUSE设置）
+
+每个动作从调用开始计时到函数返回为止，分别测量单个按键和组合键。为了不干扰当前窗口，
+默认发送Shift和Shift+F24，这两个按键几乎不会被任何程序绑定。
+
+    python benchmarks/bench_injection.py --samples 50
+
+需要Windows桌面，或带XTEST扩展的X11会话（python-xlib）；pyautogui未安装时只测量原生后端。
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from input_injector import PyAutoGuiInjector, default_injector
+from lazy_import import module_available
+
+ACTIONS = {
+    'press': ('shift',),
+    'chord': ('shift', 'f24'),
+}
+
+
+def measure(send, samples):
+    values = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        send()
+        values.append(time.perf_counter() - start)
+    values.sort()
+    return statistics.fmean(values), values[len(values) // 2], values[min(len(values) - 1, int(len(values) * 0.95))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按键注入延迟基准测试（真实桌面）")
+    parser.add_argument('--samples', type=int, default=50)
+    args = parser.parse_args()
+
+    native = default_injector()
+    candidates = [(f'{native.name}', native)]
+    if native.name != 'pyautogui' and module_available('pyautogui'):
+        candidates.append(('pyautogui-batched', PyAutoGuiInjector()))
+    rows = []
+    for label, injector in candidates:
+        for action, keys in ACTIONS.items():
+            rows.append((f'{label}/{action}', measure(lambda: injector.hotkey(*keys), args.samples)))
+    if module_available('pyautogui'):
+        # 原来的调用方式：每次调用后固定等待pyautogui.PAUSE（默认0.1秒）
+        import pyautogui
+        rows.append(('pyautogui-default/press', measure(lambda: pyautogui.press(*ACTIONS['press']), args.samples)))
+        rows.append(('pyautogui-default/chord', measure(lambda: pyautogui.hotkey(*ACTIONS['chord']), args.samples)))
+
+    print(f"{'项目':<32} {'平均':>10} {'p50':>10} {'p95':>10}")
+    for name, (mean, p50, p95) in rows:
+        print(f"{name:<32} {mean * 1000:>8.3f}ms {p50 * 1000:>8.3f}ms {p95 * 1000:>8.3f}ms")
+
+
+if __name__ == '__main__':
+    main()
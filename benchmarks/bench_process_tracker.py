@@ -0,0 +1,96 @@
+"""进程跟踪器基准测试：比较每次检测全量扫描进程表与增量刷新的耗时
+
+名称查询次数对应真实环境中的系统调用次数（psutil读取进程信息），
+是两种实现开销差异的主要来源；合成查询本身几乎没有开销。
+
+使用合成进程表，在无Windows环境下也可运行:
+    python benchmarks/bench_process_tracker.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from process_tracker import ProcessTracker
+
+MEDIA_PLAYERS = {'vlc.exe', 'spotify.exe', 'chrome.exe'}
+
+
+class SyntheticProcessTable:
+    """合成进程表：每个tick按比例结束和新建进程"""
+
+    def __init__(self, size, churn=0.01, seed=0):
+        self.random = random.Random(seed)
+        self.next_pid = 1000
+        self.table = {}
+        self.churn = churn
+        for _ in range(size):
+            self._spawn()
+        # 统计名称查询次数，对应真实环境中的系统调用
+        self.lookups = 0
+
+    def _spawn(self):
+        pid = self.next_pid
+        self.next_pid += 1
+        # 不包含媒体播放器，对应最常见的空闲场景（旧实现需要扫描完整个进程表）
+        self.table[pid] = f'proc{pid % 50}.exe'
+
+    def tick(self):
+        count = max(1, int(len(self.table) * self.churn))
+        for pid in self.random.sample(list(self.table), count):
+            del self.table[pid]
+        for _ in range(count):
+            self._spawn()
+
+    def pids(self):
+        return list(self.table)
+
+    def name(self, pid):
+        self.lookups += 1
+        return self.table.get(pid)
+
+
+def full_scan(table):
+    """旧实现：每个tick查询所有进程名称"""
+    for pid in table.pids():
+        name = table.name(pid)
+        if name in MEDIA_PLAYERS:
+            return True
+    return False
+
+
+def measure(size, ticks=50):
+    table = SyntheticProcessTable(size)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        table.tick()
+        full_scan(table)
+    scan_time = (time.perf_counter() - start) / ticks
+    scan_lookups = table.lookups / ticks
+
+    table = SyntheticProcessTable(size)
+    tracker = ProcessTracker(lambda name: name in MEDIA_PLAYERS, pid_source=table.pids, name_lookup=table.name)
+    tracker.refresh()
+    table.lookups = 0
+    start = time.perf_counter()
+    for _ in range(ticks):
+        table.tick()
+        tracker.refresh()
+        tracker.has_match()
+    tracker_time = (time.perf_counter() - start) / ticks
+    tracker_lookups = table.lookups / ticks
+    return scan_time, scan_lookups, tracker_time, tracker_lookups
+
+
+def main():
+    print(f"{'进程数':>8} {'全量扫描/tick':>14} {'名称查询':>8} {'增量刷新/tick':>14} {'名称查询':>8}")
+    for size in (100, 1000, 10000):
+        scan_time, scan_lookups, tracker_time, tracker_lookups = measure(size)
+        print(f"{size:>8} {scan_time * 1e6:>12.1f}us {scan_lookups:>8.0f} "
+              f"{tracker_time * 1e6:>12.1f}us {tracker_lookups:>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
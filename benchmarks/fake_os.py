@@ -0,0 +1,352 @@
+"""基准测试用的内存模拟系统环境
+
+用确定性的模拟模块替换pycaw、psutil、win32gui、win32process、win32com、pynput和pyautogui，
+在没有Windows桌面的Linux机器上也能运行三个功能组件。所有模拟模块读取同一个FakeDesktop的状态：
+进程表、音频会话、前台窗口和系统音量；注入的按键被记录下来，保存快捷键会清除窗口标题中的修改标记。
+
+没有图形界面时（例如无DISPLAY的Linux）还可以替换tkinter，此时窗口创建不计入耗时。
+
+用法：在导入任何组件模块之前调用install(desktop)。
+"""
+import random
+import sys
+import time
+import types
+
+
+class FakeDesktop:
+    """模拟的桌面状态"""
+
+    def __init__(self, seed=0):
+        self.random = random.Random(seed)
+        # pid -> 进程名
+        self.processes = {}
+        self.next_pid = 1000
+        # 音频会话：[pid, 状态, 是否静音, 音量]
+        self.sessions = []
+        self.master_volume = 0.5
+        self.muted = False
+        # 前台窗口（窗口句柄与所属进程的pid相同）
+        self.foreground_pid = 0
+        self.foreground_title = ''
+        # 所有顶层窗口：句柄 -> 标题
+        self.windows = {}
+        # 注入的按键（pyautogui调用记录）
+        self.injected = []
+        # 注入按键时调用的回调，用于测量从按键到注入的延迟
+        self.on_inject = None
+        # 前台窗口或标题变化时调用的回调(hwnd, title, pid)，用于驱动前台窗口跟踪器
+        self.foreground_listeners = []
+
+    def spawn(self, name):
+        pid = self.next_pid
+        self.next_pid += 1
+        self.processes[pid] = name
+        return pid
+
+    def populate(self, process_count, session_count, media_name=None):
+        """生成process_count个进程，其中session_count个拥有音频会话
+
+        media_name为正在出声的媒体播放器进程名；为None时对应最常见的空闲场景。
+        """
+        self.processes.clear()
+        self.sessions = []
+        for index in range(process_count):
+            pid = self.spawn(f'proc{index % 50}.exe')
+            if index < session_count:
+                # 大部分会话静默（系统声音、后台程序）
+                self.sessions.append([pid, 0, False, 1.0])
+        if media_name is not None:
+            pid = self.spawn(media_name)
+            self.sessions.append([pid, 1, False, 1.0])
+
+    def churn(self, fraction=0.01):
+        """结束并新建一部分进程，模拟进程表的变化"""
+        count = max(1, int(len(self.processes) * fraction))
+        session_pids = {session[0] for session in self.sessions}
+        candidates = [pid for pid in self.processes if pid not in session_pids]
+        for pid in self.random.sample(candidates, min(count, len(candidates))):
+            del self.processes[pid]
+            self.spawn(f'proc{pid % 50}.exe')
+
+    def focus(self, process_name, title):
+        """把前台窗口切换到指定进程"""
+        self.foreground_pid = self.spawn(process_name)
+        self.set_title(title)
+
+    def open_window(self, process_name, title):
+        """在后台打开一个窗口，返回窗口句柄"""
+        hwnd = self.spawn(process_name)
+        self.windows[hwnd] = title
+        return hwnd
+
+    def activate(self, hwnd):
+        """SetForegroundWindow：把已有窗口切换到前台"""
+        if hwnd in self.windows and hwnd != self.foreground_pid:
+            self.foreground_pid = hwnd
+            self.set_title(self.windows[hwnd])
+
+    def set_title(self, title):
+        self.foreground_title = title
+        self.windows[self.foreground_pid] = title
+        for listener in self.foreground_listeners:
+            listener(self.foreground_pid, title, self.foreground_pid)
+
+    def inject(self, *keys):
+        self.injected.append(keys)
+        if keys and keys[-1] == 's' and self.foreground_title.startswith('*'):
+            # 编辑器保存后清除标题中的修改标记
+            self.set_title(self.foreground_title[1:])
+        if self.on_inject is not None:
+            self.on_inject(keys)
+
+
+def _module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    return module
+
+
+def _make_psutil(desktop):
+    class Error(Exception):
+        pass
+
+    class NoSuchProcess(Error):
+        pass
+
+    class AccessDenied(Error):
+        pass
+
+    class ZombieProcess(NoSuchProcess):
+        pass
+
+    class Process:
+        def __init__(self, pid=None):
+            self.pid = pid
+            if pid is not None and pid not in desktop.processes:
+                raise NoSuchProcess(pid)
+
+        def name(self):
+            name = desktop.processes.get(self.pid)
+            if name is None:
+                raise NoSuchProcess(self.pid)
+            return name
+
+        def children(self, recursive=False):
+            return []
+
+        def memory_info(self):
+            return types.SimpleNamespace(rss=0)
+
+    def process_iter(attrs=None):
+        for pid, name in list(desktop.processes.items()):
+            process = Process.__new__(Process)
+            process.pid = pid
+            process.info = {'pid': pid, 'name': name}
+            yield process
+
+    return _module('psutil', Process=Process, pids=lambda: list(desktop.processes),
+                   pid_exists=lambda pid: pid in desktop.processes, process_iter=process_iter, Error=Error, NoSuchProcess=NoSuchProcess,
+                   AccessDenied=AccessDenied, ZombieProcess=ZombieProcess)
+
+
+def _make_pycaw(desktop):
+    class EndpointVolume:
+        def GetMasterVolumeLevelScalar(self):
+            return desktop.master_volume
+
+        def GetMute(self):
+            return int(desktop.muted)
+
+        def SetMute(self, muted, context):
+            desktop.muted = bool(muted)
+
+        def SetMasterVolumeLevelScalar(self, level, context):
+            desktop.master_volume = level
+
+    class SimpleAudioVolume:
+        def __init__(self, session):
+            self._session = session
+
+        def GetMute(self):
+            return int(self._session[2])
+
+        def GetMasterVolume(self):
+            return self._session[3]
+
+        def SetMute(self, muted, context):
+            self._session[2] = bool(muted)
+
+    class Session:
+        def __init__(self, session):
+            self._session = session
+            self.State = session[1]
+            self.SimpleAudioVolume = SimpleAudioVolume(session)
+            pid = session[0]
+            self.Process = sys.modules['psutil'].Process(pid) if pid in desktop.processes else None
+
+    class AudioUtilities:
+        @staticmethod
+        def GetSpeakers():
+            return types.SimpleNamespace(EndpointVolume=EndpointVolume())
+
+        @staticmethod
+        def GetAllSessions():
+            return [Session(session) for session in desktop.sessions]
+
+    pycaw_pycaw = _module('pycaw.pycaw', AudioUtilities=AudioUtilities)
+    return _module('pycaw', pycaw=pycaw_pycaw, __path__=[]), pycaw_pycaw
+
+
+def _make_win32(desktop):
+    win32gui = _module(
+        'win32gui',
+        GetForegroundWindow=lambda: desktop.foreground_pid,
+        GetWindowText=lambda hwnd: desktop.windows.get(hwnd, ''),
+        SetForegroundWindow=desktop.activate,
+    )
+    win32process = _module(
+        'win32process',
+        GetWindowThreadProcessId=lambda hwnd: (hwnd, hwnd),
+    )
+
+    class MediaPlayer:
+        playState = 1  # 已停止
+
+    client = _module('win32com.client', Dispatch=lambda name: MediaPlayer())
+    win32com = _module('win32com', client=client, __path__=[])
+    return win32gui, win32process, win32com, client
+
+
+def _make_pyautogui(desktop):
+    return _module(
+        'pyautogui',
+        press=lambda key, **kwargs: desktop.inject(key),
+        hotkey=lambda *keys, **kwargs: desktop.inject(*keys),
+        FAILSAFE=False,
+    )
+
+
+def _make_pynput():
+    class KeyCode:
+        def __init__(self, char):
+            self.char = char
+
+    class Listener:
+        """不安装系统钩子；通过press()模拟按键"""
+        instances = []
+
+        def __init__(self, on_press=None, on_release=None):
+            self.on_press = on_press
+            self.daemon = True
+            Listener.instances.append(self)
+
+        def start(self):
+            pass
+
+        def stop(self):
+            if self in Listener.instances:
+                Listener.instances.remove(self)
+
+        def press(self, char):
+            self.on_press(KeyCode(char))
+
+    keyboard = _module('pynput.keyboard', Listener=Listener, KeyCode=KeyCode)
+    return _module('pynput', keyboard=keyboard, __path__=[]), keyboard
+
+
+class _FakeWidget:
+    """没有图形界面时替代所有Tk控件：方法调用都是空操作，after()不执行回调"""
+
+    def __init__(self, *args, **kwargs):
+        self._title = ''
+        self._value = kwargs.get('value')
+        self._after_id = 0
+
+    def title(self, text=None):
+        if text is None:
+            return self._title
+        self._title = text
+
+    def after(self, ms, func=None, *args):
+        self._after_id += 1
+        return f'after#{self._after_id}'
+
+    def get(self):
+        return self._value
+
+    def winfo_screenwidth(self):
+        return 1920
+
+    def winfo_screenheight(self):
+        return 1080
+
+    def set(self, value):
+        self._value = value
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+def _make_tkinter():
+    def module_getattr(name):
+        # tk.END、tk.LEFT等常量返回对应的小写字符串，其余名称视为控件类
+        if name.isupper():
+            return name.lower()
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return _FakeWidget
+
+    def show_dialog(*args, **kwargs):
+        return False
+
+    tkinter = _module('tkinter', __getattr__=module_getattr, __path__=[], TclError=Exception)
+    ttk = _module('tkinter.ttk', __getattr__=module_getattr)
+    messagebox = _module('tkinter.messagebox', __getattr__=lambda name: show_dialog)
+    scrolledtext = _module('tkinter.scrolledtext', ScrolledText=_FakeWidget)
+    tkinter.ttk = ttk
+    tkinter.messagebox = messagebox
+    tkinter.scrolledtext = scrolledtext
+    return {'tkinter': tkinter, 'tkinter.ttk': ttk, 'tkinter.messagebox': messagebox,
+            'tkinter.scrolledtext': scrolledtext}
+
+
+def install(desktop, fake_tk=False):
+    """把模拟模块放入sys.modules，之后导入的组件都会使用它们"""
+    pycaw, pycaw_pycaw = _make_pycaw(desktop)
+    win32gui, win32process, win32com, win32com_client = _make_win32(desktop)
+    pynput, pynput_keyboard = _make_pynput()
+    modules = {
+        'psutil': _make_psutil(desktop),
+        'pycaw': pycaw,
+        'pycaw.pycaw': pycaw_pycaw,
+        'win32gui': win32gui,
+        'win32process': win32process,
+        'win32com': win32com,
+        'win32com.client': win32com_client,
+        'pyautogui': _make_pyautogui(desktop),
+        'pynput': pynput,
+        'pynput.keyboard': pynput_keyboard,
+    }
+    if fake_tk:
+        modules.update(_make_tkinter())
+    sys.modules.update(modules)
+    return modules
+
+
+def has_display():
+    """当前环境能否创建真实的Tk窗口"""
+    import os
+    if sys.platform.startswith('win') or sys.platform == 'darwin':
+        return True
+    return bool(os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+
+
+def wait_for(predicate, timeout=2.0):
+    """等待后台线程完成，返回是否在超时前满足条件"""
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            return False
+        time.sleep(0.0005)
+    return True
@@ -0,0 +1,126 @@
+"""常驻内存（RSS）对比：每个组件分别以窗口模式和无界面模式（--headless）启动，组件就绪后读取进程RSS
+
+每次测量都在新解释器中进行，结果包括组件就绪时的RSS以及tkinter是否被加载。
+
+    python benchmarks/measure_rss.py               # 使用真实的系统接口
+    python benchmarks/measure_rss.py --fake-os     # 用fake_os替换音频/窗口/键盘依赖，只比较界面部分
+
+RSS在Linux上读取/proc/self/statm，在Windows上调用GetProcessMemoryInfo（不依赖psutil，
+psutil在--fake-os下会被替换）。没有图形界面时（例如无DISPLAY的Linux）跳过窗口模式。
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(BENCH_DIR, '..', 'src')
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import fake_os
+from state_store import STATE_PATH_ENV
+
+ENTRY_POINTS = {
+    'volume_monitor': 'VolumeMonitorApp',
+    'hotkey_controller': 'HotkeyControllerApp',
+    'document_saver': 'DocumentSaverApp',
+}
+MODES = ('gui', 'headless')
+
+
+def current_rss():
+    """返回当前进程的常驻内存（字节）"""
+    if sys.platform.startswith('win'):
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            raise OSError("GetProcessMemoryInfo失败")
+        return counters.WorkingSetSize
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def child(module_name, mode, use_fake_os, settle):
+    """在新解释器中运行：创建组件，等主循环运行一段时间后报告RSS"""
+    if use_fake_os:
+        fake_os.install(fake_os.FakeDesktop())
+    import importlib
+    module = importlib.import_module(module_name)
+    app = getattr(module, ENTRY_POINTS[module_name])(headless=(mode == 'headless'))
+    # 让后台线程和首次刷新完成后再读取
+    app.root.after(int(settle * 1000), app.root.quit)
+    app.root.mainloop()
+    print(json.dumps({'rss': current_rss(), 'tkinter': 'tkinter' in sys.modules}), flush=True)
+    os._exit(0)
+
+
+def measure(module_name, mode, use_fake_os, settle, runs):
+    values = []
+    tkinter_loaded = False
+    for _ in range(runs):
+        args = [sys.executable, os.path.abspath(__file__), '--child', module_name, mode, '--settle', str(settle)]
+        if use_fake_os:
+            args.append('--fake-os')
+        output = subprocess.run(args, capture_output=True, text=True, cwd=SRC_DIR, timeout=60).stdout
+        lines = [line for line in output.splitlines() if line.startswith('{')]
+        if not lines:
+            raise RuntimeError(f"{module_name}/{mode} 未报告内存结果")
+        result = json.loads(lines[-1])
+        values.append(result['rss'])
+        tkinter_loaded = tkinter_loaded or result['tkinter']
+    return statistics.median(values), tkinter_loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="窗口模式与无界面模式的常驻内存对比")
+    parser.add_argument('--fake-os', action='store_true', help="用fake_os替换系统依赖")
+    parser.add_argument('--runs', type=int, default=3, help="每种组合的测量次数（取中位数）")
+    parser.add_argument('--settle', type=float, default=1.0, help="读取RSS前主循环运行的秒数")
+    parser.add_argument('--json', help="把结果写入JSON文件")
+    parser.add_argument('--child', nargs=2, metavar=('MODULE', 'MODE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    # 组件状态写入临时数据库，不读写用户的状态文件（子进程继承同一路径）
+    os.environ.setdefault(STATE_PATH_ENV, os.path.join(tempfile.mkdtemp(prefix='focus-rss-'), 'state.db'))
+
+    if args.child:
+        child(args.child[0], args.child[1], args.fake_os, args.settle)
+        return
+
+    modes = MODES if fake_os.has_display() else ('headless',)
+    if 'gui' not in modes:
+        print("没有图形界面，跳过窗口模式")
+    results = {}
+    print(f"{'组件':<20} {'模式':<10} {'RSS':>10} {'tkinter':>8}")
+    for module_name in ENTRY_POINTS:
+        for mode in modes:
+            start = time.perf_counter()
+            rss, tkinter_loaded = measure(module_name, mode, args.fake_os, args.settle, args.runs)
+            results[f'{module_name}/{mode}'] = {'rss': rss, 'tkinter': tkinter_loaded,
+                                               'seconds': time.perf_counter() - start}
+            print(f"{module_name:<20} {mode:<10} {rss / 2 ** 20:>8.1f}MB {'是' if tkinter_loaded else '否':>8}")
+        if len(modes) == 2:
+            saved = results[f'{module_name}/gui']['rss'] - results[f'{module_name}/headless']['rss']
+            print(f"{module_name:<20} {'节省':<10} {saved / 2 ** 20:>8.1f}MB")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'fake_os': args.fake_os, 'results': results}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
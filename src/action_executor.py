@@ -0,0 +1,153 @@
+import logging
+import queue
+import threading
+import time
+
+from metrics import get_metrics
+
+logger = logging.getLogger('action_executor')
+
+_metrics = get_metrics()
+HOOK_TO_ACTION_SECONDS = _metrics.histogram('focus_hook_to_action_seconds', '从按键提交到动作开始执行的延迟', ('action',))
+ACTION_SECONDS = _metrics.histogram('focus_action_seconds', '动作执行耗时', ('action',))
+SKIPPED_ACTIONS = _metrics.counter('focus_actions_skipped_total', '被合并、限流或丢弃的动作请求', ('action', 'reason'))
+
+
+class TokenBucket:
+    """令牌桶限流：平均每秒最多rate次，允许capacity次的突发"""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, now=None):
+        """尝试取出一个令牌，成功返回True"""
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+    def resume(self, elapsed):
+        """从"上一次取出令牌后已过elapsed秒"的状态继续，例如重启前的最后一次操作"""
+        with self._lock:
+            self.tokens = min(self.capacity, max(0.0, elapsed) * self.rate)
+            self.updated = time.monotonic()
+
+    @classmethod
+    def from_cooldown(cls, cooldown):
+        """按"两次操作最少间隔cooldown秒"创建令牌桶"""
+        return cls(rate=1.0 / cooldown, capacity=1)
+
+
+class ActionExecutor:
+    """动作执行器：在专用线程中执行按键触发的动作，键盘钩子回调立即返回
+
+    - 有界队列：队列满时丢弃新请求，不阻塞钩子线程
+    - 合并：同名动作已在队列中等待时，新的相同请求直接合并
+    - 限流：每个动作可设置独立的令牌桶
+    - 持久化：传入state（StateNamespace）时保存每个动作最近一次执行的时间和执行/跳过次数，
+      重启后令牌桶从上次执行的时间继续计算冷却
+    """
+
+    def __init__(self, max_pending=16, name="action-executor", state=None):
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._pending = set()
+        self._limits = {}
+        self._lock = threading.Lock()
+        self.state = state
+        # 动作名称 -> 最近一次执行的时间戳
+        self.last_run = {}
+        if state is not None:
+            for key, timestamp in state.items('last_run.'):
+                self.last_run[key[len('last_run.'):]] = timestamp
+        # 统计信息
+        self.coalesced = 0
+        self.rate_limited = 0
+        self.dropped = 0
+        self._running = True
+        self._thread = threading.Thread(target=self._worker, name=name, daemon=True)
+        self._thread.start()
+
+    def set_limit(self, action, bucket):
+        """为动作设置令牌桶限流（bucket为None时取消限流）"""
+        last_run = self.last_run.get(action)
+        if bucket is not None and last_run is not None:
+            bucket.resume(time.time() - last_run)
+        self._limits[action] = bucket
+
+    def _skipped(self, action, reason):
+        SKIPPED_ACTIONS.labels(action, reason).inc()
+        if self.state is not None:
+            self.state.incr(f'skipped.{action}.{reason}')
+
+    def submit(self, action, func):
+        """提交动作，返回是否进入队列（被合并、限流或丢弃时返回False）"""
+        if not self._running:
+            return False
+        with self._lock:
+            if action in self._pending:
+                self.coalesced += 1
+                self._skipped(action, 'coalesced')
+                return False
+            bucket = self._limits.get(action)
+            if bucket is not None and not bucket.try_acquire():
+                self.rate_limited += 1
+                self._skipped(action, 'rate_limited')
+                return False
+            try:
+                self._queue.put_nowait((action, func, time.perf_counter()))
+            except queue.Full:
+                self.dropped += 1
+                self._skipped(action, 'dropped')
+                logger.warning("动作队列已满，丢弃请求: %s", action)
+                return False
+            self._pending.add(action)
+        return True
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            action, func, submitted = item
+            with self._lock:
+                self._pending.discard(action)
+            self.last_run[action] = time.time()
+            if self.state is not None:
+                self.state.set(f'last_run.{action}', self.last_run[action])
+                self.state.incr(f'runs.{action}')
+            start = time.perf_counter()
+            HOOK_TO_ACTION_SECONDS.labels(action).observe(start - submitted)
+            try:
+                func()
+            except Exception as e:
+                logger.warning("执行动作 %s 时出错: %s", action, e)
+            ACTION_SECONDS.labels(action).observe(time.perf_counter() - start)
+
+    def stop(self, timeout=1.0):
+        """停止接收新动作，等待当前动作完成（最多timeout秒）"""
+        if not self._running:
+            return
+        self._running = False
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            # 队列已满时丢弃积压的动作再发送结束标记
+            with self._lock:
+                while True:
+                    try:
+                        self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                self._pending.clear()
+            self._queue.put_nowait(None)
+        if threading.current_thread() is not self._thread:
+            self._thread.join(timeout)
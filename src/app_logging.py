@@ -0,0 +1,171 @@
+# 日志配置：异步、分级、结构化
+# 各模块使用 logging.getLogger(模块名) 记录日志，入口脚本调用一次setup_logging()：
+# - 记录先经过去重过滤器，再由QueueHandler放入有界队列，写控制台/文件都在后台线程中完成，不阻塞检测循环和按键处理
+# - 控制台输出简短文本（子进程的stdout会显示在主程序的日志面板中），文件输出JSON行并按大小轮转
+# - 日志级别由环境变量FOCUS_ASSISTANT_LOG_LEVEL控制（默认INFO），未启用的DEBUG日志只有一次级别判断的开销
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+LEVEL_ENV = 'FOCUS_ASSISTANT_LOG_LEVEL'
+LOG_DIR_ENV = 'FOCUS_ASSISTANT_LOG_DIR'
+
+_listener = None
+
+
+class DedupFilter(logging.Filter):
+    """重复日志抑制：同一条消息在window秒内只输出一次
+
+    被抑制的次数记在下一次输出的记录上（record.repeated）。
+    """
+
+    def __init__(self, window=60.0, max_keys=1000, clock=time.monotonic):
+        super().__init__()
+        self.window = window
+        self.max_keys = max_keys
+        self._clock = clock
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        key = (record.name, record.levelno, record.getMessage())
+        now = self._clock()
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry is not None and now - entry[0] < self.window:
+                entry[1] += 1
+                return False
+            repeated = entry[1] if entry is not None else 0
+            self._seen[key] = [now, 0]
+            if len(self._seen) > self.max_keys:
+                self._prune(now)
+        if repeated:
+            record.repeated = repeated
+        return True
+
+    def _prune(self, now):
+        expired = [key for key, (first, _) in self._seen.items() if now - first >= self.window]
+        for key in expired:
+            del self._seen[key]
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """队列已满时丢弃日志并计数，不阻塞调用线程"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record):
+        # 在调用线程中完成消息格式化，异常堆栈单独保存，便于结构化输出
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """每条日志输出为一行JSON"""
+
+    def __init__(self, component=None):
+        super().__init__()
+        self.component = component
+
+    def format(self, record):
+        entry = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(record.created)) + f'.{int(record.msecs):03d}',
+            'level': record.levelname,
+            'component': self.component,
+            'logger': record.name,
+            'thread': record.threadName,
+            'msg': record.getMessage(),
+        }
+        repeated = getattr(record, 'repeated', 0)
+        if repeated:
+            entry['repeated'] = repeated
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """控制台的简短文本格式，附带被抑制的重复次数"""
+
+    def __init__(self):
+        super().__init__('[%(levelname)s] %(message)s')
+
+    def format(self, record):
+        text = super().format(record)
+        repeated = getattr(record, 'repeated', 0)
+        if repeated:
+            text += f" (此前重复 {repeated} 次)"
+        return text
+
+
+def default_log_dir():
+    base = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.local', 'state')
+    return os.path.join(base, 'FocusAssistant', 'logs')
+
+
+def setup_logging(component, level=None, log_dir=None, console=True,
+                  max_bytes=1024 * 1024, backup_count=3, dedup_window=60.0, queue_size=10000):
+    """配置根日志记录器，返回后台的QueueListener；重复调用时直接返回已有的配置"""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    level = level or os.environ.get(LEVEL_ENV, 'INFO')
+    handlers = []
+    if console:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(ConsoleFormatter())
+        handlers.append(console_handler)
+
+    log_dir = log_dir or os.environ.get(LOG_DIR_ENV) or default_log_dir()
+    try:
+        os.makedirs(log_dir, exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            os.path.join(log_dir, f'{component}.jsonl'),
+            maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        file_handler.setFormatter(JsonFormatter(component))
+        handlers.append(file_handler)
+    except OSError as e:
+        print(f"无法创建日志文件，仅输出到控制台: {e}", file=sys.stderr)
+
+    queue_handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+    queue_handler.addFilter(DedupFilter(window=dedup_window))
+
+    root = logging.getLogger()
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging():
+    """写出队列中剩余的日志并停止后台线程"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
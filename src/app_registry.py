@@ -0,0 +1,190 @@
+import fnmatch
+import re
+import threading
+from collections import deque
+
+# 应用程序类别
+CATEGORY_MEDIA = 'media'        # 音视频播放器
+CATEGORY_BROWSER = 'browser'    # 浏览器
+CATEGORY_DOCUMENT = 'document'  # 文档编辑器（Office、文本编辑器、设计软件）
+CATEGORY_IDE = 'ide'            # 集成开发环境
+
+# 精确匹配的进程名（小写；Windows含扩展名，Linux为可执行文件名）
+# 媒体播放器和浏览器只按精确名称匹配：msedgewebview2.exe、chromedriver.exe等后台进程
+# 名称中也含有浏览器关键字，子串匹配会把它们当成正在播放的媒体
+EXACT_NAMES = {
+    CATEGORY_MEDIA: [
+        # 视频播放器
+        'vlc.exe', 'potplayermini64.exe', 'potplayer64.exe', 'mpc-hc.exe', 'mpc-hc64.exe',
+        'wmplayer.exe', 'mplayer2.exe', 'kodi.exe', 'plexmediaplayer.exe', 'mxplayer.exe',
+        # 音乐播放器
+        'spotify.exe', 'itunes.exe', 'qqmusic.exe', 'neteasemusic.exe', 'kuwo.exe',
+        'foobar2000.exe', 'winamp.exe', 'groove.exe', 'musicbee.exe', 'aimp.exe',
+        'vlc', 'spotify',
+    ],
+    CATEGORY_BROWSER: [
+        'chrome.exe', 'firefox.exe', 'edge.exe', 'msedge.exe', 'opera.exe', 'brave.exe', 'safari.exe',
+        'chrome', 'chromium', 'firefox', 'firefox-esr', 'opera', 'brave',
+    ],
+    CATEGORY_DOCUMENT: [
+        # Microsoft Office（短名称的子串会误匹配1password.exe、wordpad.exe等，只用精确名称）
+        'winword.exe', 'excel.exe', 'powerpnt.exe', 'outlook.exe', 'notepad.exe', 'atom.exe',
+    ],
+    CATEGORY_IDE: [
+        'code.exe', 'devenv.exe',
+    ],
+}
+
+# 子串匹配的关键字（进程名包含即可，兼容不同版本和平台的命名）
+SUBSTRING_PATTERNS = {
+    CATEGORY_DOCUMENT: [
+        'notepad++', 'sublime_text',  # 文本编辑器
+        'photoshop', 'illustrator', 'indesign',  # Adobe Creative Suite
+    ],
+    CATEGORY_IDE: ['vscode', 'pycharm', 'intellij', 'eclipse', 'visualstudio'],
+}
+
+# 通配符模式
+GLOB_PATTERNS = {
+    CATEGORY_IDE: ['idea*.exe', 'webstorm*.exe', 'clion*.exe'],
+}
+
+
+class AhoCorasick:
+    """多模式子串匹配自动机，一次扫描找出文本中出现的所有关键字"""
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        # 每个状态命中的值集合
+        self._output = [set()]
+        self._built = False
+
+    def add(self, pattern, value):
+        """添加模式及其关联值，必须在build()之前调用"""
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(set())
+            state = next_state
+        self._output[state].add(value)
+        self._built = False
+
+    def build(self):
+        """按广度优先计算失败指针"""
+        queue = deque()
+        for next_state in self._goto[0].values():
+            self._fail[next_state] = 0
+            queue.append(next_state)
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] |= self._output[self._fail[next_state]]
+        self._built = True
+
+    def search(self, text):
+        """返回文本中出现的所有模式关联值"""
+        if not self._built:
+            self.build()
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            if self._output[state]:
+                found |= self._output[state]
+        return found
+
+
+class AppRegistry:
+    """应用程序分类注册表
+
+    - 精确进程名使用frozenset做O(1)查找
+    - 子串关键字编译为一个Aho-Corasick自动机，一次扫描完成所有匹配
+    - 通配符模式合并为一个正则表达式
+    - 分类结果按进程名缓存，重复查询不再计算
+    """
+
+    def __init__(self, exact=None, substrings=None, globs=None):
+        exact = EXACT_NAMES if exact is None else exact
+        substrings = SUBSTRING_PATTERNS if substrings is None else substrings
+        globs = GLOB_PATTERNS if globs is None else globs
+
+        self._exact = {category: frozenset(name.lower() for name in names)
+                       for category, names in exact.items()}
+        self._automaton = AhoCorasick()
+        for category, patterns in substrings.items():
+            for pattern in patterns:
+                self._automaton.add(pattern.lower(), category)
+        self._automaton.build()
+        self._globs = []
+        for category, patterns in globs.items():
+            if patterns:
+                regex = '|'.join(fnmatch.translate(pattern.lower()) for pattern in patterns)
+                self._globs.append((category, re.compile(regex)))
+        self.categories = frozenset(self._exact) | frozenset(substrings) | frozenset(globs)
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+
+    def classify(self, process_name):
+        """返回进程名所属的类别集合（frozenset）"""
+        if not process_name:
+            return frozenset()
+        categories = self._cache.get(process_name)
+        if categories is not None:
+            return categories
+        name = process_name.lower()
+        found = {category for category, names in self._exact.items() if name in names}
+        found |= self._automaton.search(name)
+        for category, regex in self._globs:
+            if regex.match(name):
+                found.add(category)
+        categories = frozenset(found)
+        with self._cache_lock:
+            self._cache[process_name] = categories
+        return categories
+
+    def is_category(self, process_name, *categories):
+        """进程名是否属于给定类别之一"""
+        return not self.classify(process_name).isdisjoint(categories)
+
+    def is_media(self, process_name):
+        """媒体播放器或浏览器（浏览器可能正在播放视频）"""
+        return self.is_category(process_name, CATEGORY_MEDIA, CATEGORY_BROWSER)
+
+    def is_document(self, process_name):
+        """文档类应用程序（文档编辑器、IDE或浏览器）"""
+        return self.is_category(process_name, CATEGORY_DOCUMENT, CATEGORY_IDE, CATEGORY_BROWSER)
+
+    def is_editor(self, process_name):
+        """文本输入为主的编辑类应用（文档编辑器或IDE）"""
+        return self.is_category(process_name, CATEGORY_DOCUMENT, CATEGORY_IDE)
+
+    def names(self, category):
+        """返回某类别的精确进程名集合"""
+        return self._exact.get(category, frozenset())
+
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """返回进程内共享的默认注册表"""
+    global _default_registry
+    if _default_registry is None:
+        with _default_registry_lock:
+            if _default_registry is None:
+                _default_registry = AppRegistry()
+    return _default_registry
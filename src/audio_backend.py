@@ -0,0 +1,404 @@
+import logging
+import threading
+import time
+
+# 音频事件类型
+EVENT_VOLUME = 'volume'                # 主音量变化
+EVENT_MUTE = 'mute'                    # 主静音状态变化
+EVENT_SESSION_STATE = 'session_state'  # 音频会话状态变化（开始/停止播放）
+EVENT_SESSION_CREATED = 'session_created'  # 新建音频会话
+EVENT_DEVICE_CHANGED = 'device_changed'    # 默认输出设备变化
+
+# 音频会话状态（与Windows AudioSessionState取值一致）
+SESSION_INACTIVE = 0
+SESSION_ACTIVE = 1
+SESSION_EXPIRED = 2
+
+logger = logging.getLogger('audio_backend')
+
+
+class AudioEvent:
+    """音频状态变化事件"""
+    __slots__ = ('kind', 'volume', 'muted', 'session', 'state', 'timestamp')
+
+    def __init__(self, kind, volume=None, muted=None, session=None, state=None):
+        self.kind = kind
+        self.volume = volume
+        self.muted = muted
+        self.session = session
+        self.state = state
+        self.timestamp = time.time()
+
+    def __repr__(self):
+        return (f"AudioEvent(kind={self.kind!r}, volume={self.volume!r}, muted={self.muted!r}, "
+                f"session={self.session!r}, state={self.state!r})")
+
+
+class AudioBackend:
+    """音频后端接口：推送音量、静音和会话状态变化通知
+
+    supports_events为True时表示后端能够主动推送变化事件，
+    监控线程只需在收到事件时检测；否则需要退回到定时轮询。
+    """
+    supports_events = False
+
+    def __init__(self):
+        self._listeners = []
+        self._listeners_lock = threading.Lock()
+
+    def add_listener(self, callback):
+        """注册变化回调，回调参数为AudioEvent"""
+        with self._listeners_lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        """注销变化回调"""
+        with self._listeners_lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def _emit(self, event):
+        """向所有监听者分发事件，单个回调出错不影响其他回调"""
+        with self._listeners_lock:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.warning("音频事件回调出错: %s", e)
+
+    def start(self):
+        """开始接收系统通知，返回是否成功启用事件模式"""
+        return self.supports_events
+
+    def stop(self):
+        """停止接收系统通知并释放资源"""
+        pass
+
+
+class PycawAudioBackend(AudioBackend):
+    """基于pycaw的Windows音频后端
+
+    通过IAudioEndpointVolume的控制变化通知获取主音量/静音变化，
+    通过音频会话通知获取会话创建和播放状态变化。
+    默认输出设备切换后，在后台线程中把端点和会话通知重新注册到新的默认设备上。
+    任何注册步骤失败时supports_events保持为False，由调用方退回轮询。
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._endpoint_volume = None
+        self._endpoint_callback = None
+        self._session_manager = None
+        self._session_notification = None
+        self._device_enumerator = None
+        self._device_notification = None
+        # 已注册回调的会话，键为会话实例标识，值为(会话, 回调)
+        self._session_callbacks = {}
+        self._sessions_lock = threading.Lock()
+        # 与默认设备绑定的注册（端点音量、会话管理器）在设备切换时整体重建
+        self._device_lock = threading.Lock()
+        self._audio_utilities = None
+        self._callback_classes = None
+        self._stopped = False
+
+    def start(self):
+        """注册设备变化通知，以及当前默认设备上的端点音量通知和会话通知"""
+        try:
+            from pycaw.pycaw import AudioUtilities
+            from pycaw.callbacks import (AudioEndpointVolumeCallback, AudioSessionEvents,
+                                         AudioSessionNotification, MMNotificationClient)
+        except Exception as e:
+            logger.warning("pycaw事件通知不可用，将使用轮询: %s", e)
+            self.supports_events = False
+            return False
+
+        backend = self
+
+        class _EndpointCallback(AudioEndpointVolumeCallback):
+            def on_notify(self, new_volume, new_mute, event_context, channels, channel_volumes):
+                backend._emit(AudioEvent(EVENT_VOLUME, volume=new_volume, muted=bool(new_mute)))
+
+        class _SessionCallback(AudioSessionEvents):
+            def __init__(self, session_name):
+                super().__init__()
+                self.session_name = session_name
+
+            def on_state_changed(self, new_state, new_state_id):
+                backend._emit(AudioEvent(EVENT_SESSION_STATE, session=self.session_name, state=new_state_id))
+                if new_state_id == SESSION_EXPIRED:
+                    # 会话已结束：在后台线程中注销它的通知，避免回调随会话增减不断累积
+                    backend._spawn(backend._prune_sessions, "audio-session-prune")
+
+            def on_simple_volume_changed(self, new_volume, new_mute, event_context):
+                backend._emit(AudioEvent(EVENT_VOLUME, volume=new_volume, muted=bool(new_mute),
+                                         session=self.session_name))
+
+        class _SessionNotification(AudioSessionNotification):
+            def on_session_created(self, new_session):
+                # 通知回调中不能注册通知，在后台线程中为新会话注册后再通知监听者
+                backend._spawn(backend._on_session_created, "audio-session-register")
+
+        class _DeviceNotification(MMNotificationClient):
+            def on_default_device_changed(self, flow, flow_id, role, role_id, default_device_id):
+                # 通知回调中不能注册/注销通知，改在后台线程中重新绑定
+                backend._spawn(backend._reattach, "audio-reattach")
+
+        self._audio_utilities = AudioUtilities
+        self._callback_classes = (_EndpointCallback, _SessionNotification, _SessionCallback)
+        self._stopped = False
+        try:
+            # 默认设备变化通知，设备变化后需要重新获取端点句柄
+            self._device_enumerator = AudioUtilities.GetDeviceEnumerator()
+            self._device_notification = _DeviceNotification()
+            self._device_enumerator.RegisterEndpointNotificationCallback(self._device_notification)
+
+            with self._device_lock:
+                self._attach_default_device()
+
+            self.supports_events = True
+            logger.info("已启用pycaw音频事件通知")
+        except Exception as e:
+            logger.warning("注册pycaw音频事件通知失败，将使用轮询: %s", e)
+            self.stop()
+            self.supports_events = False
+        return self.supports_events
+
+    def _attach_default_device(self):
+        """在当前默认输出设备上注册端点音量通知和会话通知（调用方持有_device_lock）"""
+        endpoint_class, notification_class, session_class = self._callback_classes
+        audio_utilities = self._audio_utilities
+
+        # 主音量/静音通知
+        device = audio_utilities.GetSpeakers()
+        self._endpoint_volume = device.EndpointVolume
+        self._endpoint_callback = endpoint_class()
+        self._endpoint_volume.RegisterControlChangeNotify(self._endpoint_callback)
+
+        # 会话创建通知（需要先枚举一次会话，系统才会开始推送通知）
+        self._session_manager = audio_utilities.GetAudioSessionManager()
+        self._session_notification = notification_class()
+        self._session_manager.RegisterSessionNotification(self._session_notification)
+        self._session_manager.GetSessionEnumerator()
+
+        # 已有会话的状态通知
+        self._register_sessions(audio_utilities, session_class)
+
+    def _detach_device(self):
+        """注销与默认设备绑定的端点和会话通知（调用方持有_device_lock）"""
+        if self._endpoint_volume is not None and self._endpoint_callback is not None:
+            try:
+                self._endpoint_volume.UnregisterControlChangeNotify(self._endpoint_callback)
+            except Exception as e:
+                logger.warning("注销端点音量通知失败: %s", e)
+        if self._session_manager is not None and self._session_notification is not None:
+            try:
+                self._session_manager.UnregisterSessionNotification(self._session_notification)
+            except Exception as e:
+                logger.warning("注销会话通知失败: %s", e)
+        with self._sessions_lock:
+            for session, _ in self._session_callbacks.values():
+                try:
+                    session.unregister_notification()
+                except Exception:
+                    pass
+            self._session_callbacks.clear()
+        self._endpoint_volume = None
+        self._endpoint_callback = None
+        self._session_manager = None
+        self._session_notification = None
+
+    @staticmethod
+    def _spawn(target, name):
+        """在初始化了COM的后台线程中执行target（COM通知回调中不能注册或注销通知）"""
+        def run():
+            try:
+                import comtypes
+                comtypes.CoInitialize()
+            except Exception:
+                comtypes = None
+            try:
+                target()
+            except Exception as e:
+                logger.warning("音频通知后台任务出错: %s", e)
+            finally:
+                if comtypes is not None:
+                    comtypes.CoUninitialize()
+
+        threading.Thread(target=run, name=name, daemon=True).start()
+
+    def _reattach(self):
+        """默认设备切换后把端点和会话通知移到新设备上，然后通知监听者"""
+        with self._device_lock:
+            if self._stopped:
+                return
+            self._detach_device()
+            try:
+                self._attach_default_device()
+                logger.info("默认输出设备已切换，已重新注册音频通知")
+            except Exception as e:
+                # 新设备上注册失败时监控线程仍会按兜底间隔轮询
+                logger.warning("在新的默认设备上注册音频通知失败: %s", e)
+                self._detach_device()
+        self._emit(AudioEvent(EVENT_DEVICE_CHANGED))
+
+    def _on_session_created(self):
+        """新建会话：注册它的状态通知，然后通知监听者"""
+        with self._device_lock:
+            if self._stopped:
+                return
+            _, _, session_class = self._callback_classes
+            self._register_sessions(self._audio_utilities, session_class)
+        self._emit(AudioEvent(EVENT_SESSION_CREATED))
+
+    def _prune_sessions(self):
+        """注销已结束会话的状态通知"""
+        with self._device_lock:
+            if self._stopped:
+                return
+            self._register_sessions(self._audio_utilities, None)
+
+    def _register_sessions(self, audio_utilities, callback_class):
+        """同步会话通知：为尚未注册的会话添加状态通知，注销已结束或已消失的会话
+
+        callback_class为None时只注销，不注册新会话。
+        """
+        try:
+            sessions = audio_utilities.GetAllSessions()
+        except Exception as e:
+            logger.warning("枚举音频会话失败: %s", e)
+            return
+        with self._sessions_lock:
+            live = set()
+            for session in sessions:
+                try:
+                    if session.State == SESSION_EXPIRED:
+                        continue
+                    key = session.InstanceIdentifier
+                    live.add(key)
+                    if key in self._session_callbacks or callback_class is None:
+                        continue
+                    name = session.Process.name().lower() if session.Process else None
+                    callback = callback_class(name)
+                    session.register_notification(callback)
+                    self._session_callbacks[key] = (session, callback)
+                except Exception as e:
+                    logger.warning("注册音频会话通知失败: %s", e)
+            for key in [key for key in self._session_callbacks if key not in live]:
+                session, _ = self._session_callbacks.pop(key)
+                try:
+                    session.unregister_notification()
+                except Exception as e:
+                    logger.debug("注销已结束会话的通知失败: %s", e)
+
+    def stop(self):
+        """注销所有系统通知"""
+        with self._device_lock:
+            self._stopped = True
+            self._detach_device()
+        if self._device_enumerator is not None and self._device_notification is not None:
+            try:
+                self._device_enumerator.UnregisterEndpointNotificationCallback(self._device_notification)
+            except Exception as e:
+                logger.warning("注销设备变化通知失败: %s", e)
+        self._device_enumerator = None
+        self._device_notification = None
+
+
+class FakeAudioBackend(AudioBackend):
+    """内存中的模拟音频后端，用于在无声卡/非Windows环境下驱动事件路径"""
+    supports_events = True
+
+    def __init__(self, volume=0.0, muted=False):
+        super().__init__()
+        self.volume = volume
+        self.muted = muted
+        # 会话名称 -> 会话状态
+        self.sessions = {}
+        self.started = False
+        # 当前默认输出设备，以及在设备上注册通知的次数（与PycawAudioBackend切换设备时重新注册对应）
+        self.device = 'default'
+        self.attachments = 0
+
+    def _attach(self):
+        self.attachments += 1
+
+    def start(self):
+        self.started = True
+        self._attach()
+        return True
+
+    def stop(self):
+        self.started = False
+
+    def set_volume(self, volume):
+        """模拟主音量变化"""
+        self.volume = volume
+        self._emit(AudioEvent(EVENT_VOLUME, volume=volume, muted=self.muted))
+
+    def set_mute(self, muted):
+        """模拟主静音状态变化"""
+        self.muted = bool(muted)
+        self._emit(AudioEvent(EVENT_MUTE, volume=self.volume, muted=self.muted))
+
+    def set_session_state(self, name, state):
+        """模拟会话状态变化，不存在的会话会被新建"""
+        if name not in self.sessions:
+            self.sessions[name] = state
+            self._emit(AudioEvent(EVENT_SESSION_CREATED, session=name, state=state))
+        else:
+            self.sessions[name] = state
+        self._emit(AudioEvent(EVENT_SESSION_STATE, session=name, state=state))
+
+    def change_device(self, device='default'):
+        """模拟默认输出设备切换：在新设备上重新注册后发出通知"""
+        self.device = device
+        if self.started:
+            self._attach()
+        self._emit(AudioEvent(EVENT_DEVICE_CHANGED))
+
+    def has_sound(self):
+        """主音量大于0且非静音"""
+        return self.volume > 0.01 and not self.muted
+
+    def active_sessions(self):
+        """返回处于活动状态的会话名称列表"""
+        return [name for name, state in self.sessions.items() if state == SESSION_ACTIVE]
+
+
+class AudioChangeWaiter:
+    """把后端推送的事件合并成一个"有变化"信号，供监控线程等待
+
+    在等待期间到达的多个事件只会唤醒一次，wait返回期间收到的事件列表。
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._changed = threading.Event()
+        self._pending = []
+        self._lock = threading.Lock()
+        backend.add_listener(self._on_event)
+
+    def _on_event(self, event):
+        with self._lock:
+            self._pending.append(event)
+        self._changed.set()
+
+    def wake(self):
+        """不携带事件地唤醒等待者（例如退出时）"""
+        self._changed.set()
+
+    def wait(self, timeout=None):
+        """等待下一次变化，返回期间累计的事件列表；超时返回空列表"""
+        self._changed.wait(timeout)
+        with self._lock:
+            self._changed.clear()
+            events = self._pending
+            self._pending = []
+        return events
+
+    def close(self):
+        """解除与后端的关联"""
+        self.backend.remove_listener(self._on_event)
+        self.wake()
@@ -0,0 +1,340 @@
+import logging
+import threading
+import time
+
+from audio_snapshot import AudioSnapshot, read_pycaw_sessions
+from metrics import get_metrics
+
+# 解析器支持的操作
+OP_VOLUME = 'volume'   # 检测是否有声音（音量不为0且非静音）
+OP_MUTE = 'mute'       # 设置系统静音
+OP_UNMUTE = 'unmute'   # 取消系统静音
+
+logger = logging.getLogger('audio_resolver')
+
+_metrics = get_metrics()
+STAGE_SECONDS = _metrics.histogram('focus_audio_stage_seconds', '各音频后端阶段执行一次操作的耗时',
+                                   ('stage', 'operation'))
+STAGE_FAILURES = _metrics.counter('focus_audio_stage_failures_total', '音频后端阶段执行失败的次数',
+                                  ('stage', 'operation'))
+
+
+class AllStagesFailedError(Exception):
+    """所有可用阶段都失败或处于熔断状态"""
+    pass
+
+
+class CircuitBreaker:
+    """单个阶段的熔断器：连续失败后按指数退避暂停重试"""
+
+    def __init__(self, base_delay=2.0, max_delay=300.0):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failures = 0
+        self.open_until = 0
+
+    def allow(self, now=None):
+        """熔断器关闭，或退避时间已过（半开试探）时允许调用"""
+        if now is None:
+            now = time.monotonic()
+        return now >= self.open_until
+
+    def record_success(self):
+        """调用成功，关闭熔断器"""
+        self.failures = 0
+        self.open_until = 0
+
+    def record_failure(self, now=None):
+        """调用失败，按失败次数指数增加退避时间"""
+        if now is None:
+            now = time.monotonic()
+        self.failures += 1
+        delay = min(self.base_delay * (2 ** (self.failures - 1)), self.max_delay)
+        self.open_until = now + delay
+        return delay
+
+
+class AudioStage:
+    """音频控制链中的一个阶段，不支持的操作抛出NotImplementedError"""
+    name = 'stage'
+    operations = frozenset()
+
+    def get_volume(self):
+        """返回是否有声音"""
+        raise NotImplementedError
+
+    def mute(self):
+        raise NotImplementedError
+
+    def unmute(self):
+        raise NotImplementedError
+
+    def reset(self):
+        """丢弃缓存的系统句柄（例如默认设备变化时）"""
+        pass
+
+
+class PycawEndpointStage(AudioStage):
+    """通过pycaw的IAudioEndpointVolume控制默认输出设备，端点句柄在多次调用之间复用"""
+    name = 'pycaw'
+    operations = frozenset([OP_VOLUME, OP_MUTE, OP_UNMUTE])
+
+    def __init__(self):
+        self._audio_utilities = None
+        self._endpoint = None
+        self._lock = threading.Lock()
+
+    def _get_endpoint(self):
+        with self._lock:
+            if self._endpoint is None:
+                if self._audio_utilities is None:
+                    from pycaw.pycaw import AudioUtilities
+                    self._audio_utilities = AudioUtilities
+                devices = self._audio_utilities.GetSpeakers()
+                self._endpoint = devices.EndpointVolume
+                logger.debug("已获取默认音频端点")
+            return self._endpoint
+
+    def _call(self, func):
+        try:
+            return func(self._get_endpoint())
+        except Exception:
+            # 句柄可能已失效（设备被移除等），下次调用时重新获取
+            self.reset()
+            raise
+
+    def get_volume(self):
+        def read(volume):
+            current_volume = volume.GetMasterVolumeLevelScalar()
+            is_muted = volume.GetMute()
+            has_sound = current_volume > 0.01 and not is_muted
+            logger.debug("音量检测 (pycaw): 级别=%.2f, 静音=%s, 有声音=%s", current_volume, is_muted, has_sound)
+            return has_sound
+        return self._call(read)
+
+    def mute(self):
+        self._call(lambda volume: volume.SetMute(1, None))
+        logger.info("已设置系统为静音 (pycaw方法)")
+        return True
+
+    def unmute(self):
+        def write(volume):
+            volume.SetMute(0, None)
+            # 设置一个合适的音量级别
+            volume.SetMasterVolumeLevelScalar(0.3, None)  # 30%音量
+        self._call(write)
+        logger.info("已取消系统静音并设置音量 (pycaw方法)")
+        return True
+
+    def reset(self):
+        with self._lock:
+            self._endpoint = None
+
+
+class PycawSessionStage(AudioStage):
+    """端点接口不可用时，通过音频会话快照判断和控制声音"""
+    name = 'pycaw_sessions'
+    operations = frozenset([OP_VOLUME, OP_MUTE, OP_UNMUTE])
+
+    def __init__(self, is_media_process=None, snapshot_provider=None):
+        # 判断进程名是否为媒体播放器，仅用于日志输出
+        self.is_media_process = is_media_process
+        # 返回当前检测周期的AudioSnapshot，未提供时每次调用单独枚举会话
+        self.snapshot_provider = snapshot_provider
+
+    def _snapshot(self):
+        if self.snapshot_provider is not None:
+            return self.snapshot_provider()
+        return AudioSnapshot(read_pycaw_sessions())
+
+    def get_volume(self):
+        audible = self._snapshot().audible()
+        # 只对媒体播放器进程输出日志
+        for record in audible:
+            if record.name and self.is_media_process and self.is_media_process(record.name):
+                logger.debug("检测到活动音频会话: %s", record.name)
+        has_active_sound = len(audible) > 0
+        logger.debug("音频会话检测: 有声音=%s", has_active_sound)
+        return has_active_sound
+
+    def _set_mute(self, muted):
+        for record in self._snapshot().active():
+            volume = record.control.SimpleAudioVolume if record.control is not None else None
+            if volume:
+                volume.SetMute(muted, None)
+
+    def mute(self):
+        self._set_mute(1)
+        logger.info("已设置所有活动音频会话为静音 (会话方法)")
+        return True
+
+    def unmute(self):
+        self._set_mute(0)
+        logger.info("已取消所有活动音频会话静音 (会话方法)")
+        return True
+
+
+class KeyboardShortcutStage(AudioStage):
+    """模拟静音快捷键 (Windows + F3)，只能切换静音状态"""
+    name = 'win32_keys'
+    operations = frozenset([OP_MUTE, OP_UNMUTE])
+
+    VK_LWIN = 0x5B
+    VK_F3 = 0x72
+
+    def _toggle(self):
+        import ctypes
+        user32 = ctypes.windll.user32
+        user32.keybd_event(self.VK_LWIN, 0, 0, 0)
+        user32.keybd_event(self.VK_F3, 0, 0, 0)
+        user32.keybd_event(self.VK_F3, 0, 0x0002, 0)
+        user32.keybd_event(self.VK_LWIN, 0, 0x0002, 0)
+
+    def mute(self):
+        self._toggle()
+        logger.info("已模拟静音快捷键 (Windows + F3)")
+        return True
+
+    def unmute(self):
+        self._toggle()
+        logger.info("已模拟取消静音快捷键 (Windows + F3)")
+        return True
+
+
+class PowerShellStage(AudioStage):
+    """通过PowerShell命令读取音量或切换静音，每次调用都会启动子进程"""
+    name = 'powershell'
+    operations = frozenset([OP_VOLUME, OP_MUTE, OP_UNMUTE])
+
+    def _run(self, ps_command):
+        import subprocess
+        return subprocess.run(["powershell", "-Command", ps_command],
+                              capture_output=True, text=True, timeout=2)
+
+    def get_volume(self):
+        # 注意：Get-SoundVolume可能需要安装额外模块
+        result = self._run("(Get-SoundVolume).MasterVolumeLevelPercentage")
+        if result.returncode != 0 or not result.stdout.strip():
+            raise RuntimeError(f"PowerShell命令失败: {result.stderr}")
+        volume_percent = float(result.stdout.strip())
+        has_sound = volume_percent > 1.0  # 音量大于1%认为有声音
+        logger.debug("PowerShell音量检测: 级别=%.2f%%, 有声音=%s", volume_percent, has_sound)
+        return has_sound
+
+    def _toggle(self):
+        result = self._run("(New-Object -ComObject WScript.Shell).SendKeys([char]173)")
+        if result.returncode != 0:
+            raise RuntimeError(f"PowerShell命令失败: {result.stderr}")
+
+    def mute(self):
+        self._toggle()
+        logger.info("已通过PowerShell设置系统静音")
+        return True
+
+    def unmute(self):
+        self._toggle()
+        logger.info("已通过PowerShell取消系统静音")
+        return True
+
+
+class WinmmStage(AudioStage):
+    """通过winmm读取波形输出音量（不够准确，仅作为最后的备用方案）"""
+    name = 'winmm'
+    operations = frozenset([OP_VOLUME])
+
+    def get_volume(self):
+        from ctypes import windll, byref, c_uint
+        volume = c_uint(0)
+        result = windll.winmm.waveOutGetVolume(0, byref(volume))
+        if result != 0:
+            raise RuntimeError(f"winmm音量获取失败，错误代码: {result}")
+        # 分离左右声道音量并计算平均音量（0-1范围）
+        left_volume = volume.value & 0xFFFF
+        right_volume = (volume.value >> 16) & 0xFFFF
+        average_volume = ((left_volume + right_volume) / 2) / 65535.0
+        # 由于winmm可能不准确，我们将阈值提高到20%，避免误判
+        has_sound = average_volume > 0.20
+        logger.debug("winmm音量检测: 级别=%.2f, 有声音=%s", average_volume, has_sound)
+        return has_sound
+
+
+def default_stages(is_media_process=None, snapshot_provider=None):
+    """按优先级排列的默认阶段链"""
+    return [
+        PycawEndpointStage(),
+        PycawSessionStage(is_media_process, snapshot_provider),
+        KeyboardShortcutStage(),
+        PowerShellStage(),
+        WinmmStage(),
+    ]
+
+
+class AudioBackendResolver:
+    """在音量检测、静音和取消静音之间共享的后端解析器
+
+    - 总是按链上的优先级尝试，跳过该操作熔断中的阶段；高优先级阶段的退避时间一过就先试探它，
+      试探成功即恢复使用，失败则按指数退避继续熔断，不会一直停留在低优先级阶段
+    - 各阶段缓存自己的系统句柄，只有设备变化时才通过invalidate()丢弃
+    - 记录每种操作当前使用的阶段，仅用于日志和查询，不影响尝试顺序
+    """
+
+    def __init__(self, stages=None, base_delay=2.0, max_delay=300.0):
+        self.stages = stages if stages is not None else default_stages()
+        # 每个阶段的每种操作各有一个熔断器：PowerShell读取音量失败（Get-SoundVolume未安装）时不影响它的静音操作
+        self.breakers = {(stage.name, operation): CircuitBreaker(base_delay, max_delay)
+                         for stage in self.stages for operation in stage.operations}
+        # 操作 -> 上次成功的阶段
+        self._preferred = {}
+        self._lock = threading.Lock()
+
+    def _candidates(self, operation, now=None):
+        """按链上顺序返回支持该操作且熔断器允许调用（关闭或半开试探）的阶段"""
+        if now is None:
+            now = time.monotonic()
+        return [stage for stage in self.stages
+                if operation in stage.operations and self.breakers[(stage.name, operation)].allow(now)]
+
+    def preferred(self, operation):
+        """该操作上次成功的阶段名称，没有时返回None"""
+        stage = self._preferred.get(operation)
+        return stage.name if stage is not None else None
+
+    def run(self, operation):
+        """依次尝试可用阶段执行操作，返回第一个成功阶段的结果"""
+        last_error = None
+        for stage in self._candidates(operation):
+            breaker = self.breakers[(stage.name, operation)]
+            start = time.perf_counter()
+            try:
+                if operation == OP_VOLUME:
+                    result = stage.get_volume()
+                elif operation == OP_MUTE:
+                    result = stage.mute()
+                else:
+                    result = stage.unmute()
+            except Exception as e:
+                STAGE_SECONDS.labels(stage.name, operation).observe(time.perf_counter() - start)
+                STAGE_FAILURES.labels(stage.name, operation).inc()
+                delay = breaker.record_failure()
+                logger.warning("%s阶段执行%s失败，%.0f秒内不再尝试: %s", stage.name, operation, delay, e)
+                last_error = e
+                continue
+            STAGE_SECONDS.labels(stage.name, operation).observe(time.perf_counter() - start)
+            breaker.record_success()
+            with self._lock:
+                previous = self._preferred.get(operation)
+                self._preferred[operation] = stage
+            if previous is not None and previous is not stage:
+                logger.info("%s操作改用%s阶段（此前为%s）", operation, stage.name, previous.name)
+            return result
+        raise AllStagesFailedError(f"没有可用的{operation}阶段: {last_error}")
+
+    def invalidate(self):
+        """默认设备变化：丢弃缓存句柄并重新从链首开始解析"""
+        with self._lock:
+            self._preferred.clear()
+        for stage in self.stages:
+            stage.reset()
+        for breaker in self.breakers.values():
+            breaker.record_success()
+        logger.info("音频设备已变化，已重置后端解析缓存")
@@ -0,0 +1,152 @@
+import logging
+import threading
+import time
+
+from audio_backend import SESSION_ACTIVE
+
+logger = logging.getLogger('audio_snapshot')
+
+
+class SessionRecord:
+    """单个音频会话在某一时刻的状态，所有COM属性只读取一次"""
+    __slots__ = ('pid', 'name', 'state', 'muted', 'volume', 'control')
+
+    def __init__(self, pid, name, state, muted, volume, control=None):
+        self.pid = pid
+        self.name = name
+        self.state = state
+        self.muted = muted
+        self.volume = volume
+        # 原始会话对象，仅在需要写操作（如设置静音）时使用
+        self.control = control
+
+    @property
+    def key(self):
+        return (self.pid, self.name)
+
+    @property
+    def audible(self):
+        """会话处于活动状态、未静音且音量大于0"""
+        return self.state == SESSION_ACTIVE and not self.muted and self.volume > 0.0
+
+    def same_state(self, other):
+        return self.state == other.state and self.muted == other.muted and self.volume == other.volume
+
+    def __repr__(self):
+        return (f"SessionRecord(pid={self.pid!r}, name={self.name!r}, state={self.state!r}, "
+                f"muted={self.muted!r}, volume={self.volume!r})")
+
+
+class SnapshotDiff:
+    """两次快照之间的差异"""
+    __slots__ = ('added', 'removed', 'changed')
+
+    def __init__(self, added, removed, changed):
+        self.added = added
+        self.removed = removed
+        # (旧记录, 新记录) 列表
+        self.changed = changed
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def describe(self):
+        """生成便于日志输出的简短描述"""
+        parts = []
+        if self.added:
+            parts.append("新增 " + ", ".join(record.name or str(record.pid) for record in self.added))
+        if self.removed:
+            parts.append("移除 " + ", ".join(record.name or str(record.pid) for record in self.removed))
+        if self.changed:
+            parts.append("变化 " + ", ".join(new.name or str(new.pid) for _, new in self.changed))
+        return "; ".join(parts)
+
+
+class AudioSnapshot:
+    """某一检测周期内所有音频会话的紧凑快照"""
+    __slots__ = ('records', 'timestamp', '_by_key')
+
+    def __init__(self, records, timestamp=None):
+        self.records = tuple(records)
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self._by_key = {record.key: record for record in self.records}
+
+    def audible(self):
+        """返回所有正在出声的会话"""
+        return [record for record in self.records if record.audible]
+
+    def audible_names(self):
+        return {record.name for record in self.records if record.audible and record.name}
+
+    def active(self):
+        """返回所有处于活动状态的会话（不论音量）"""
+        return [record for record in self.records if record.state == SESSION_ACTIVE]
+
+    def diff(self, previous):
+        """计算相对于previous快照的变化，previous为None时所有会话都视为新增"""
+        if previous is None:
+            return SnapshotDiff(list(self.records), [], [])
+        added = []
+        changed = []
+        for record in self.records:
+            old = previous._by_key.get(record.key)
+            if old is None:
+                added.append(record)
+            elif not old.same_state(record):
+                changed.append((old, record))
+        removed = [record for record in previous.records if record.key not in self._by_key]
+        return SnapshotDiff(added, removed, changed)
+
+
+def read_pycaw_sessions():
+    """枚举pycaw音频会话，每个会话的属性只查询一次"""
+    from pycaw.pycaw import AudioUtilities
+    records = []
+    for session in AudioUtilities.GetAllSessions():
+        try:
+            state = session.State
+            volume = session.SimpleAudioVolume
+            muted = bool(volume.GetMute()) if volume else True
+            level = volume.GetMasterVolume() if volume else 0.0
+            process = session.Process
+            pid = process.pid if process else 0
+            name = process.name().lower() if process else None
+            records.append(SessionRecord(pid, name, state, muted, level, session))
+        except Exception as e:
+            logger.warning("读取音频会话信息失败: %s", e)
+    return records
+
+
+class AudioSnapshotSource:
+    """按检测周期缓存音频会话快照
+
+    同一周期内第一次调用get()时枚举会话，之后的调用共享同一快照；
+    next_tick()开始新周期，diff()返回本周期相对上一周期的变化。
+    """
+
+    def __init__(self, reader=None):
+        self._reader = reader or read_pycaw_sessions
+        self._current = None
+        self._previous = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """返回本周期的快照，必要时创建；枚举失败时抛出异常"""
+        with self._lock:
+            if self._current is None:
+                self._current = AudioSnapshot(self._reader())
+            return self._current
+
+    def next_tick(self):
+        """结束当前周期，保留本周期快照作为比较基准"""
+        with self._lock:
+            if self._current is not None:
+                self._previous = self._current
+            self._current = None
+
+    def diff(self):
+        """本周期快照相对上一周期的变化，本周期尚未取快照时返回None"""
+        with self._lock:
+            if self._current is None:
+                return None
+            return self._current.diff(self._previous)
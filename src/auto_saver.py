@@ -0,0 +1,351 @@
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+from metrics import get_metrics
+
+logger = logging.getLogger('auto_saver')
+
+_metrics = get_metrics()
+BATCH_SECONDS = _metrics.histogram('focus_autosave_batch_seconds', '一批定时自动保存的总耗时（含保存间隔）')
+AUTO_SAVES = _metrics.counter('focus_autosave_documents_total', '定时自动保存的文档', ('result',))
+DEFERRED = _metrics.counter('focus_autosave_deferred_total', '因用户正在输入而推迟的自动保存', ('reason',))
+
+# 自动保存间隔的环境变量（秒），未设置或为0时启动时不启用
+AUTOSAVE_INTERVAL_ENV = 'FOCUS_ASSISTANT_AUTOSAVE_INTERVAL'
+DEFAULT_INTERVAL = 300.0
+
+# 保存来源
+SOURCE_MANUAL = 'manual'
+SOURCE_AUTO = 'auto'
+
+# 空闲时间来源的计时精度（GetTickCount约16ms），最近一次输入不晚于注入时间加上该值时视为自己注入的
+INJECTION_SLACK = 0.1
+
+
+class DocumentWindow:
+    """一个顶层窗口"""
+    __slots__ = ('hwnd', 'title', 'pid', 'process_name')
+
+    def __init__(self, hwnd, title, pid, process_name=None):
+        self.hwnd = hwnd
+        self.title = title
+        self.pid = pid
+        self.process_name = process_name
+
+    def __repr__(self):
+        return f"<DocumentWindow {self.process_name}({self.pid}) '{self.title}'>"
+
+
+# ---- 顶层窗口枚举：返回 [(hwnd, title, pid)] ----
+
+def _win32_windows():
+    import win32gui
+    import win32process
+    windows = []
+
+    def collect(hwnd, _):
+        if not win32gui.IsWindowVisible(hwnd):
+            return True
+        title = win32gui.GetWindowText(hwnd)
+        if title:
+            _, pid = win32process.GetWindowThreadProcessId(hwnd)
+            windows.append((hwnd, title, pid))
+        return True
+
+    win32gui.EnumWindows(collect, None)
+    return windows
+
+
+def _x11_windows():
+    from Xlib import X, display
+    d = display.Display()
+    try:
+        root = d.screen().root
+        client_list = d.intern_atom('_NET_CLIENT_LIST')
+        net_name = d.intern_atom('_NET_WM_NAME')
+        net_pid = d.intern_atom('_NET_WM_PID')
+        utf8 = d.intern_atom('UTF8_STRING')
+        prop = root.get_full_property(client_list, X.AnyPropertyType)
+        windows = []
+        for window_id in (prop.value if prop is not None else ()):
+            window = d.create_resource_object('window', int(window_id))
+            try:
+                name = window.get_full_property(net_name, utf8)
+                pid = window.get_full_property(net_pid, X.AnyPropertyType)
+            except Exception:
+                continue
+            title = name.value if name is not None else b''
+            if isinstance(title, bytes):
+                title = title.decode('utf-8', 'replace')
+            if title:
+                windows.append((int(window_id), title, int(pid.value[0]) if pid is not None and len(pid.value) else 0))
+        return windows
+    finally:
+        d.close()
+
+
+def default_window_source(tracker=None):
+    """按平台选择窗口枚举方式；都不可用时只检查前台窗口"""
+    from lazy_import import module_available
+    if sys.platform.startswith('win'):
+        return _win32_windows
+    if os.environ.get('DISPLAY') and module_available('Xlib'):
+        return _x11_windows
+
+    def foreground_only():
+        info = tracker.current if tracker is not None else None
+        return [(info.hwnd, info.title, info.pid)] if info is not None and info.hwnd else []
+    return foreground_only
+
+
+# ---- 用户空闲时间：返回距离最近一次键盘/鼠标输入的秒数 ----
+
+def _win32_idle_seconds():
+    import ctypes
+    from ctypes import wintypes
+
+    class LASTINPUTINFO(ctypes.Structure):
+        _fields_ = [('cbSize', wintypes.UINT), ('dwTime', wintypes.DWORD)]
+
+    info = LASTINPUTINFO()
+    info.cbSize = ctypes.sizeof(info)
+    if not ctypes.windll.user32.GetLastInputInfo(ctypes.byref(info)):
+        return 0.0
+    # GetTickCount约49天回绕一次，按32位无符号差值计算
+    elapsed = (ctypes.windll.kernel32.GetTickCount() - info.dwTime) & 0xFFFFFFFF
+    return elapsed / 1000.0
+
+
+def _x11_idle_seconds():
+    from Xlib import display
+    d = display.Display()
+    try:
+        return d.screen().root.screensaver_query_info().idle / 1000.0
+    finally:
+        d.close()
+
+
+def default_idle_source(tracker=None):
+    """按平台选择空闲时间来源；都不可用时以前台窗口最近一次变化的时间近似"""
+    from lazy_import import module_available
+    if sys.platform.startswith('win'):
+        return _win32_idle_seconds
+    if os.environ.get('DISPLAY') and module_available('Xlib'):
+        return _x11_idle_seconds
+
+    def since_foreground_change():
+        updated = tracker.current.updated if tracker is not None else 0.0
+        return time.monotonic() - updated if updated else float('inf')
+    return since_foreground_change
+
+
+class SaveHistory:
+    """每个文档的保存记录：文档 -> 最近若干次 (时间, 来源, 结果)"""
+
+    def __init__(self, max_entries=20):
+        self.max_entries = max_entries
+        self._records = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(process_name, document):
+        return ((process_name or '').lower(), document)
+
+    def record(self, process_name, document, source, status, timestamp=None):
+        entry = (timestamp if timestamp is not None else time.time(), source, status)
+        key = self.key(process_name, document)
+        with self._lock:
+            records = self._records.get(key)
+            if records is None:
+                records = self._records[key] = deque(maxlen=self.max_entries)
+            records.append(entry)
+
+    def last_saved(self, process_name, document):
+        """最近一次保存的时间，没有记录时返回None"""
+        records = self._records.get(self.key(process_name, document))
+        return records[-1][0] if records else None
+
+    def history(self, process_name, document):
+        with self._lock:
+            return list(self._records.get(self.key(process_name, document), ()))
+
+    def documents(self):
+        """所有文档及最近一次保存记录，按时间倒序"""
+        with self._lock:
+            latest = [(key, records[-1]) for key, records in self._records.items() if records]
+        return sorted(latest, key=lambda item: item[1][0], reverse=True)
+
+    def __len__(self):
+        return len(self._records)
+
+
+class AutoSaver:
+    """定时自动保存：每隔interval秒找出所有带修改标记的文档窗口，逐个保存
+
+    - 用户在idle_threshold秒内有输入时推迟，等到空闲后再保存，不会打断正在输入的内容
+    - 同一批的保存之间间隔spacing秒，避免多个大文件同时写盘；期间用户恢复输入时中止本批
+    - 只保存修改规则能确定有未保存修改的窗口（DIRTY），无法判断的窗口可能弹出另存为对话框，不自动保存
+    - 最久未保存的文档优先；保存完成后恢复原来的前台窗口
+    """
+
+    def __init__(self, save_window, activate_window=None, window_source=None, idle_source=None,
+                 process_names=None, is_candidate=None, dirty_rules=None, history=None,
+                 interval=DEFAULT_INTERVAL, idle_threshold=5.0, spacing=1.0, current_window=None):
+        # save_window(window, rule) 保存一个文档窗口，返回结果状态
+        self.save_window = save_window
+        # activate_window(hwnd) 把窗口切换到前台
+        self.activate_window = activate_window
+        self.window_source = window_source
+        self.idle_source = idle_source
+        # process_names(pid) 返回进程名
+        self.process_names = process_names
+        # is_candidate(process_name) 是否为需要自动保存的应用
+        self.is_candidate = is_candidate or (lambda name: True)
+        if dirty_rules is None:
+            from dirty_rules import get_dirty_rules
+            dirty_rules = get_dirty_rules()
+        self.dirty_rules = dirty_rules
+        self.history = history if history is not None else SaveHistory()
+        self.interval = interval
+        self.idle_threshold = idle_threshold
+        self.spacing = spacing
+        # current_window() 返回当前前台窗口句柄，用于保存后恢复
+        self.current_window = current_window
+        self.batches = 0
+        # 最近一次注入保存快捷键或切换窗口的时间（time.monotonic）；这些操作本身会重置系统空闲计时
+        self._injected_at = None
+        # 第一次注入前用户最近一次输入的时间（time.monotonic）
+        self._user_input_at = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and not self._stop_event.is_set()
+
+    def _read_idle(self):
+        try:
+            return self.idle_source()
+        except Exception as e:
+            logger.debug("读取空闲时间失败: %s", e)
+            return float('inf')
+
+    def idle_seconds(self):
+        """距离用户最近一次输入的秒数；自动保存自己注入的按键和窗口切换不算用户输入"""
+        idle = self._read_idle()
+        if self._injected_at is not None:
+            now = time.monotonic()
+            if idle >= now - self._injected_at - INJECTION_SLACK:
+                # 注入之后没有真实输入：按注入前记录的用户最近一次输入计算
+                return now - self._user_input_at
+        return idle
+
+    def _inject(self, action, *args):
+        """执行会产生输入的操作（保存快捷键、切换窗口），记录时间以便从空闲时间中排除"""
+        self._user_input_at = time.monotonic() - self.idle_seconds()
+        try:
+            return action(*args)
+        finally:
+            self._injected_at = time.monotonic()
+
+    def dirty_windows(self):
+        """找出所有有未保存修改的文档窗口，最久未保存的在前"""
+        found = []
+        for hwnd, title, pid in self.window_source():
+            process_name = self.process_names(pid) if pid else None
+            if not process_name or 'python' in process_name or not self.is_candidate(process_name):
+                continue
+            rule = self.dirty_rules.rule_for(process_name)
+            if rule.is_dirty(title):
+                found.append((DocumentWindow(hwnd, title, pid, process_name), rule))
+        found.sort(key=lambda item: self.history.last_saved(
+            item[0].process_name, item[1].strip(item[0].title)) or 0.0)
+        return found
+
+    def run_batch(self):
+        """保存一批文档，返回 [(窗口, 结果)]；用户恢复输入或停止时中止"""
+        start = time.perf_counter()
+        windows = self.dirty_windows()
+        if not windows:
+            return []
+        original = self.current_window() if self.current_window is not None else None
+        results = []
+        try:
+            for index, (window, rule) in enumerate(windows):
+                if index:
+                    if self._stop_event.wait(self.spacing):
+                        break
+                    if self.idle_seconds() < self.idle_threshold:
+                        DEFERRED.labels('batch_interrupted').inc()
+                        logger.info("用户恢复输入，本批剩余 %d 个文档推迟保存", len(windows) - index)
+                        break
+                try:
+                    status = self._inject(self.save_window, window, rule)
+                except Exception as e:
+                    logger.warning("自动保存 %s 时出错: %s", window.title, e)
+                    status = 'error'
+                AUTO_SAVES.labels(status).inc()
+                self.history.record(window.process_name, rule.strip(window.title), SOURCE_AUTO, status)
+                results.append((window, status))
+        finally:
+            if original and self.activate_window is not None and results:
+                try:
+                    self._inject(self.activate_window, original)
+                except Exception as e:
+                    logger.debug("恢复前台窗口失败: %s", e)
+            self.batches += 1
+            BATCH_SECONDS.observe(time.perf_counter() - start)
+        return results
+
+    def _run(self):
+        delay = self.interval
+        while not self._stop_event.wait(delay):
+            idle = self.idle_seconds()
+            if idle < self.idle_threshold:
+                # 用户仍在输入：等到预计空闲时再检查
+                DEFERRED.labels('typing').inc()
+                delay = max(0.5, self.idle_threshold - idle)
+                continue
+            try:
+                results = self.run_batch()
+                if results:
+                    logger.info("自动保存了 %d 个文档", len(results))
+            except Exception as e:
+                logger.warning("自动保存出错: %s", e)
+            delay = self.interval
+
+    def start(self):
+        """启动定时线程（已启动时忽略）"""
+        if self.running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="auto-saver", daemon=True)
+        self._thread.start()
+        logger.info("定时自动保存已启动：间隔 %.0f秒，空闲 %.1f秒后保存", self.interval, self.idle_threshold)
+
+    def stop(self):
+        """停止定时线程，正在进行的一批在当前文档保存完成后中止"""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        if threading.current_thread() is not self._thread:
+            self._thread.join(2.0)
+        self._thread = None
+        logger.info("定时自动保存已停止")
+
+
+def interval_from_env(default=None):
+    """读取自动保存间隔环境变量，未设置或无效时返回default"""
+    value = os.environ.get(AUTOSAVE_INTERVAL_ENV)
+    if not value:
+        return default
+    try:
+        interval = float(value)
+    except ValueError:
+        logger.warning("无效的自动保存间隔: %s", value)
+        return default
+    return interval if interval > 0 else None
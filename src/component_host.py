@@ -0,0 +1,75 @@
+import importlib
+import logging
+import time
+
+# 组件名称 -> (模块名, 应用类名)
+COMPONENTS = {
+    'volume': ('volume_monitor', 'VolumeMonitorApp'),
+    'hotkey': ('hotkey_controller', 'HotkeyControllerApp'),
+    'saver': ('document_saver', 'DocumentSaverApp'),
+}
+
+logger = logging.getLogger('component_host')
+
+
+class ComponentHost:
+    """进程内组件宿主：在同一个解释器和同一个Tk根窗口下运行多个功能组件
+
+    每个组件以根窗口的Toplevel子窗口运行，可以单独启动和停止；
+    组件模块只在第一次启动时导入，之后重复启动复用已导入的模块。
+    """
+
+    def __init__(self, root, on_change=None):
+        self.root = root
+        # 组件启动/停止后的回调，参数为组件名称
+        self.on_change = on_change
+        self.components = {}
+        # 组件名称 -> 启动耗时（秒）
+        self.start_times = {}
+
+    def start(self, name):
+        """启动组件，已在运行时直接返回该组件实例"""
+        if name in self.components:
+            return self.components[name]
+        module_name, class_name = COMPONENTS[name]
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        app = getattr(module, class_name)(master=self.root)
+        app.on_quit = lambda: self._on_component_quit(name)
+        self.components[name] = app
+        self.start_times[name] = time.perf_counter() - start
+        logger.info("已在进程内启动组件: %s (%.0fms)", name, self.start_times[name] * 1000)
+        self._notify(name)
+        return app
+
+    def stop(self, name):
+        """停止组件并关闭其窗口"""
+        app = self.components.get(name)
+        if app is None:
+            return
+        try:
+            app.quit_program()
+        except Exception as e:
+            logger.warning("停止组件 %s 时出错: %s", name, e)
+        # quit_program通过on_quit回调移除组件，这里再确保一次
+        self.components.pop(name, None)
+
+    def stop_all(self):
+        """停止所有组件"""
+        for name in list(self.components):
+            self.stop(name)
+
+    def is_running(self, name):
+        return name in self.components
+
+    def _on_component_quit(self, name):
+        """组件自行退出（按Q键或关闭窗口）时从宿主中移除"""
+        self.components.pop(name, None)
+        self._notify(name)
+
+    def _notify(self, name):
+        if self.on_change:
+            try:
+                self.on_change(name)
+            except Exception as e:
+                logger.warning("组件状态回调出错: %s", e)
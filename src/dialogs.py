@@ -0,0 +1,169 @@
+import logging
+
+from lazy_import import LazyModule
+from metrics import get_metrics
+
+# 第一次显示时才导入tkinter
+tk = LazyModule('tkinter')
+
+logger = logging.getLogger('dialogs')
+
+_metrics = get_metrics()
+WARNINGS_SHOWN = _metrics.counter('focus_warning_dialog_shows_total', '提醒窗口的显示次数', ('result',))
+
+# show()的结果
+SHOWN = 'shown'          # 窗口从隐藏状态重新显示
+COALESCED = 'coalesced'  # 窗口仍在显示，只更新触发次数
+
+
+def _center(window, width, height):
+    """把窗口放在屏幕中间"""
+    x = (window.winfo_screenwidth() // 2) - (width // 2)
+    y = (window.winfo_screenheight() // 2) - (height // 2)
+    window.geometry('{}x{}+{}+{}'.format(width, height, x, y))
+
+
+class WarningDialog:
+    """可复用的提醒窗口：第一次显示时创建，关闭时只隐藏，之后每次触发重新显示同一个窗口
+
+    - 窗口仍在显示时再次触发不会叠加新窗口，只在窗口中显示连续触发的次数
+    - 用户点击按钮或关闭窗口后计数清零
+    - 非模态（不调用grab_set），只保持在最上层，不会阻塞组件主窗口
+    必须在Tk线程中调用。
+    """
+
+    def __init__(self, master, title, message, actions=(), width=350, height=180):
+        self.master = master
+        self.title = title
+        self.message = message
+        # [(按钮文字, 回调, 按钮宽度)]；回调执行前窗口已隐藏
+        self.actions = list(actions)
+        self.width = width
+        self.height = height
+        self.window = None
+        self.visible = False
+        # 本次显示期间的触发次数
+        self.count = 0
+        # 创建窗口的次数（正常情况下始终为1）
+        self.builds = 0
+
+    def _build(self):
+        window = tk.Toplevel(self.master)
+        window.withdraw()
+        window.title(self.title)
+        window.resizable(False, False)
+        window.attributes('-topmost', True)
+        window.protocol("WM_DELETE_WINDOW", self.hide)
+        self._message_label = tk.Label(window, text=self.message, wraplength=self.width - 20, pady=20)
+        self._message_label.pack()
+        self._count_label = tk.Label(window, text="")
+        self._count_label.pack()
+        button_frame = tk.Frame(window)
+        button_frame.pack(pady=10)
+        tk.Button(button_frame, text="确定", width=10, command=self.hide).pack(side=tk.LEFT, padx=5)
+        for text, callback, width in self.actions:
+            tk.Button(button_frame, text=text, width=width,
+                      command=lambda callback=callback: self._run_action(callback)).pack(side=tk.LEFT, padx=5)
+        # 只在创建时计算一次位置
+        _center(window, self.width, self.height)
+        self.window = window
+        self.builds += 1
+
+    def show(self, message=None):
+        """显示提醒，返回SHOWN或COALESCED"""
+        if self.window is None:
+            self._build()
+        if message is not None and message != self.message:
+            self.message = message
+            self._message_label.config(text=message)
+        self.count += 1
+        if self.visible:
+            self._count_label.config(text=f"（已连续触发 {self.count} 次）")
+            result = COALESCED
+        else:
+            self._count_label.config(text="")
+            self.window.deiconify()
+            self.visible = True
+            result = SHOWN
+        self.window.lift()
+        WARNINGS_SHOWN.labels(result).inc()
+        return result
+
+    def hide(self):
+        """隐藏窗口并清零触发次数"""
+        self.count = 0
+        if self.window is not None and self.visible:
+            self.window.withdraw()
+        self.visible = False
+
+    def _run_action(self, callback):
+        self.hide()
+        try:
+            callback()
+        except Exception as e:
+            logger.warning("处理提醒窗口按钮时出错: %s", e)
+
+    def destroy(self):
+        if self.window is not None:
+            try:
+                self.window.destroy()
+            except Exception as e:
+                logger.debug("销毁提醒窗口时出错: %s", e)
+        self.window = None
+        self.visible = False
+
+
+class Toast:
+    """短暂显示后自动关闭的非模态提示，不抢占焦点；窗口创建一次后复用
+
+    再次显示时替换文字并重新计时。必须在Tk线程中调用。
+    """
+
+    def __init__(self, master, duration=2500, width=320, height=60):
+        self.master = master
+        # 显示时长（毫秒）
+        self.duration = duration
+        self.width = width
+        self.height = height
+        self.window = None
+        self._hide_timer = None
+
+    def _build(self):
+        window = tk.Toplevel(self.master)
+        window.withdraw()
+        # 无标题栏，不出现在任务栏
+        window.overrideredirect(True)
+        window.attributes('-topmost', True)
+        self._label = tk.Label(window, text="", wraplength=self.width - 20, padx=10, pady=10,
+                               relief=tk.SOLID, borderwidth=1)
+        self._label.pack(fill=tk.BOTH, expand=True)
+        # 点击提示立即关闭
+        self._label.bind('<Button-1>', lambda event: self.hide())
+        _center(window, self.width, self.height)
+        self.window = window
+
+    def show(self, text):
+        if self.window is None:
+            self._build()
+        self._label.config(text=text)
+        self.window.deiconify()
+        self.window.lift()
+        if self._hide_timer is not None:
+            self.window.after_cancel(self._hide_timer)
+        self._hide_timer = self.window.after(self.duration, self.hide)
+
+    def hide(self):
+        self._hide_timer = None
+        if self.window is not None:
+            self.window.withdraw()
+
+    def destroy(self):
+        if self.window is not None:
+            try:
+                if self._hide_timer is not None:
+                    self.window.after_cancel(self._hide_timer)
+                self.window.destroy()
+            except Exception as e:
+                logger.debug("销毁提示窗口时出错: %s", e)
+        self.window = None
+        self._hide_timer = None
@@ -0,0 +1,134 @@
+import fnmatch
+import threading
+
+# 文档状态
+DIRTY = 'dirty'      # 有未保存的修改
+CLEAN = 'clean'      # 没有未保存的修改，无需发送保存快捷键
+UNKNOWN = 'unknown'  # 无法从标题判断，照常保存
+
+# 标记位置
+MARKER_PREFIX = 'prefix'      # "*无标题 - 记事本"
+MARKER_SUFFIX = 'suffix'      # "报告.psd @ 100% (RGB/8) *"
+MARKER_ANYWHERE = 'anywhere'  # "notes.txt • - Sublime Text"
+
+# 规则表：(进程名通配符列表, 修改标记, 标记位置)
+# 这些编辑器在有未保存修改时一定会在标题中显示标记，因此标题没有标记即可认为文档已保存。
+# 标记为None的应用（Office等）标题不反映修改状态，总是发送保存快捷键。
+DIRTY_RULES = [
+    (['notepad.exe', 'notepad++.exe', 'gedit', 'mousepad', 'kate'], '*', MARKER_PREFIX),
+    (['code.exe', 'code', 'code - insiders.exe', 'cursor.exe'], '●', MARKER_PREFIX),
+    (['sublime_text.exe', 'sublime_text'], '•', MARKER_ANYWHERE),
+    (['photoshop.exe', 'illustrator.exe'], '*', MARKER_SUFFIX),
+    (['winword.exe', 'excel.exe', 'powerpnt.exe', 'outlook.exe', 'wps.exe', 'et.exe', 'wpp.exe'], None, None),
+]
+
+# 没有规则的应用：标题带有常见标记时认为有修改，否则无法判断
+DEFAULT_MARKERS = ('*', '●', '•')
+
+
+class DirtyRule:
+    """单个应用的修改状态判断规则"""
+    __slots__ = ('marker', 'position', 'trusted')
+
+    def __init__(self, marker=None, position=None, trusted=True):
+        self.marker = marker
+        self.position = position
+        # trusted为True时，标题没有标记即认为文档已保存
+        self.trusted = trusted and marker is not None
+
+    def is_dirty(self, title):
+        if not title or self.marker is None:
+            return False
+        title = title.strip()
+        if self.position == MARKER_PREFIX:
+            return title.startswith(self.marker)
+        if self.position == MARKER_SUFFIX:
+            return title.endswith(self.marker)
+        return self.marker in title
+
+    def strip(self, title):
+        """去掉修改标记后的标题，用于在保存前后识别同一个文档"""
+        if not title:
+            return ''
+        title = title.strip()
+        if self.marker is None:
+            return title
+        if self.position == MARKER_PREFIX and title.startswith(self.marker):
+            return title[len(self.marker):].strip()
+        if self.position == MARKER_SUFFIX and title.endswith(self.marker):
+            return title[:-len(self.marker)].strip()
+        if self.position not in (MARKER_PREFIX, MARKER_SUFFIX):
+            return ' '.join(title.replace(self.marker, ' ').split())
+        return title
+
+    def state(self, title):
+        if self.is_dirty(title):
+            return DIRTY
+        return CLEAN if self.trusted else UNKNOWN
+
+
+class DefaultDirtyRule(DirtyRule):
+    """未登记应用的规则：识别常见标记，但没有标记时不能断定已保存"""
+    __slots__ = ()
+
+    def __init__(self, markers=DEFAULT_MARKERS):
+        super().__init__(markers, None, trusted=False)
+
+    def is_dirty(self, title):
+        if not title:
+            return False
+        title = title.strip()
+        return any(title.startswith(marker) or title.endswith(marker) for marker in self.marker)
+
+    def strip(self, title):
+        if not title:
+            return ''
+        return title.strip().strip(''.join(self.marker)).strip()
+
+
+class DirtyRules:
+    """按进程名查找修改状态规则，查找结果按进程名缓存"""
+
+    def __init__(self, rules=None, default=None):
+        self._rules = []
+        for patterns, marker, position in (rules if rules is not None else DIRTY_RULES):
+            rule = DirtyRule(marker, position)
+            for pattern in patterns:
+                self._rules.append((pattern.lower(), rule))
+        self.default = default or DefaultDirtyRule()
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def rule_for(self, process_name):
+        """返回进程对应的规则"""
+        if not process_name:
+            return self.default
+        key = process_name.lower()
+        rule = self._cache.get(key)
+        if rule is None:
+            rule = self.default
+            for pattern, candidate in self._rules:
+                if key == pattern or fnmatch.fnmatchcase(key, pattern):
+                    rule = candidate
+                    break
+            with self._lock:
+                self._cache[key] = rule
+        return rule
+
+    def state(self, process_name, title):
+        """判断窗口中的文档是否有未保存的修改"""
+        return self.rule_for(process_name).state(title)
+
+
+_default_rules = None
+_rules_lock = threading.Lock()
+
+
+def get_dirty_rules():
+    """返回进程内共享的规则表"""
+    global _default_rules
+    if _default_rules is None:
+        with _rules_lock:
+            if _default_rules is None:
+                _default_rules = DirtyRules()
+    return _default_rules
@@ -1,28 +1,147 @@
-import tkinter as tk
-from pynput import keyboard
-import pyautogui
+import startup_profiler
+startup_profiler.enable_from_argv()
+
+import logging
 import sys
 import threading
 import time
-import win32gui
-import win32process
-import psutil
+from lazy_import import LazyModule
+from app_registry import get_registry
+from action_executor import ActionExecutor, TokenBucket
+from keyboard_bus import get_default_bus, KeyBindingConflict
+from process_supervisor import start_heartbeat, is_supervised
+from app_logging import setup_logging
+from ui_updates import StatusLine
+from headless import HeadlessLoop, HEADLESS_FLAG
+from notifications import get_notifier
+from state_store import get_state_store
+from metrics import get_metrics, setup_metrics
+from save_verifier import SaveVerifier, SAVE_CONFIRMED, SAVE_NOT_DIRTY, SAVE_UNVERIFIED
+from foreground_tracker import get_default_tracker
+from dirty_rules import get_dirty_rules, CLEAN
+from auto_saver import AutoSaver, SaveHistory, default_window_source, default_idle_source, interval_from_env
+from auto_saver import DEFAULT_INTERVAL, SOURCE_MANUAL
+from input_injector import get_default_injector
+
+# 重量级依赖在第一次使用时才导入
+win32gui = LazyModule('win32gui')
+
+# 只有显示窗口时才导入tkinter，无界面模式不加载
+tk = LazyModule('tkinter')
+
+logger = logging.getLogger('document_saver')
+
+_metrics = get_metrics()
+SAVE_VERIFY_SECONDS = _metrics.histogram('focus_save_verify_seconds', '发送保存快捷键后确认保存结果的耗时')
+SAVE_RESULTS = _metrics.counter('focus_save_results_total', '保存确认结果', ('result',))
+
+# 自动保存时等待目标窗口切换到前台的最长时间
+ACTIVATE_TIMEOUT = 0.5
 
 class DocumentSaverApp:
-    def __init__(self):
-        # 创建主窗口
-        self.root = tk.Tk()
+    def __init__(self, master=None, keyboard_bus=None, foreground_tracker=None, auto_save_interval=None,
+                 window_source=None, idle_source=None, input_injector=None, headless=False, notifier=None,
+                 state_store=None):
+        self.hosted = master is not None
+        # 无界面模式：轻量主循环代替Tk窗口，状态输出到通知目标（进程内宿主模式总是显示窗口）
+        self.headless = headless and not self.hosted
+        # 组件退出时的回调，由宿主设置
+        self.on_quit = None
+        self.stopped = False
+        if self.headless:
+            self.root = HeadlessLoop("文档自动保存助手")
+            self.notifier = notifier or get_notifier()
+        else:
+            self.build_window(master)
+        
+        # 动作执行器：键盘钩子只负责提交请求，保存操作在执行器线程中运行
+        # 保存动作使用令牌桶限流，避免频繁操作；连续的保存请求会被合并为一次
+        self.cooldown_time = 0.5  # 冷却时间，单位秒
+        # 最近一次执行时间和计数保存在共享的状态存储中，重启后冷却时间照常生效
+        self.state = (state_store or get_state_store()).namespace('document_saver')
+        self.executor = ActionExecutor(name="save-actions", state=self.state)
+        self.executor.set_limit('save_document', TokenBucket.from_cooldown(self.cooldown_time))
+        
+        # 通过共享键盘总线注册全局快捷键，同一进程内的组件共用一个键盘钩子
+        self.keyboard_bus = keyboard_bus or get_default_bus()
+        self.register_hotkeys()
+        
+        # 设置窗口关闭事件
+        self.root.protocol("WM_DELETE_WINDOW", self.quit_program)
+        
+        # 应用程序特定的保存快捷键映射
+        self.save_hotkeys = {
+            # 通用保存快捷键
+            'default': ['ctrl', 's'],
+            # 可以根据需要添加特定应用程序的保存快捷键
+        }
+        
+        # 应用程序分类注册表（文档编辑器、IDE、浏览器等），结果按进程名缓存
+        self.app_registry = get_registry()
+        
+        # 各应用的修改标记规则，用于跳过没有未保存修改的文档（按进程名缓存）
+        self.dirty_rules = get_dirty_rules()
+        
+        # 保存确认：观察窗口标题的修改标记和文件修改时间，确认后立即返回
+        self.save_verifier = SaveVerifier(lambda hwnd: win32gui.GetWindowText(hwnd))
+        
+        # 前台窗口跟踪器：由焦点/标题变化事件更新，按键处理时直接读取，不再调用系统接口
+        # 前台窗口标题变化时提前唤醒保存确认
+        self.foreground = foreground_tracker or get_default_tracker()
+        self.foreground.add_listener(self.on_foreground_change)
+        
+        # 按键注入后端：原生接口一次调用发送整个组合键，没有pyautogui的固定延迟
+        self.injector = input_injector or get_default_injector()
+        
+        # 手动保存和自动保存共用：同一时刻只向一个窗口发送保存快捷键
+        self.save_lock = threading.Lock()
+        # 每个文档的保存记录（手动和自动）
+        self.save_history = SaveHistory()
+        
+        # 定时自动保存：间隔由参数或环境变量指定，指定时启动即启用
+        interval = auto_save_interval or interval_from_env()
+        self.auto_saver = AutoSaver(
+            self.save_window,
+            activate_window=self.activate_window,
+            window_source=window_source or default_window_source(self.foreground),
+            idle_source=idle_source or default_idle_source(self.foreground),
+            process_names=self.foreground.process_cache.name,
+            is_candidate=self.app_registry.is_editor,
+            dirty_rules=self.dirty_rules,
+            history=self.save_history,
+            interval=interval or DEFAULT_INTERVAL,
+            current_window=lambda: self.foreground.current.hwnd,
+        )
+        if interval:
+            self.set_auto_save(True)
+    
+    def build_window(self, master=None):
+        """创建主窗口；由进程内宿主启动时作为宿主根窗口的子窗口"""
+        self.root = tk.Toplevel(master) if master is not None else tk.Tk()
         self.root.title("文档自动保存助手")
-        self.root.geometry("420x300")
+        self.root.geometry("420x360")
         
         # 创建状态标签
         self.status_label = tk.Label(
             self.root,
-            text="文档自动保存助手正在运行...\n\n可用快捷键:\n- 按 A 键: 保存当前活动文档\n- 按 Q 键: 退出程序\n\n功能说明:\n- 自动识别当前活动窗口的类型\n- 针对不同类型的应用程序使用相应的保存快捷键\n- 支持大多数常见的办公软件和编辑器\n- 操作结果会实时显示在状态栏",
+            text="文档自动保存助手正在运行...\n\n可用快捷键:\n- 按 A 键: 保存当前活动文档\n- 按 Q 键: 退出程序\n\n功能说明:\n- 自动识别当前活动窗口的类型\n- 针对不同类型的应用程序使用相应的保存快捷键\n- 支持大多数常见的办公软件和编辑器\n- 操作结果会实时显示在状态栏\n- 定时自动保存：用户停止输入后逐个保存有修改的文档",
             justify=tk.LEFT,
             wraplength=400
         )
-        self.status_label.pack(pady=20)
+        self.status_label.pack(pady=(20, 0))
+        
+        # 状态行：单独的控件，更新时不需要重新解析说明文字
+        self.status_line = StatusLine(self.root, wraplength=400).pack(fill=tk.X, padx=10, pady=(0, 10))
+        
+        # 定时自动保存开关
+        self.auto_save_var = tk.BooleanVar(value=False)
+        self.auto_save_check = tk.Checkbutton(
+            self.root,
+            text="定时自动保存",
+            variable=self.auto_save_var,
+            command=self.toggle_auto_save
+        )
+        self.auto_save_check.pack()
         
         # 创建退出按钮
         self.quit_button = tk.Button(
@@ -31,232 +150,294 @@ class DocumentSaverApp:
             command=self.quit_program
         )
         self.quit_button.pack(pady=10)
-        
-        # 设置全局键盘监听
-        self.listener = keyboard.Listener(on_press=self.on_key_press)
-        self.listener.start()
-        
-        # 设置窗口关闭事件
-        self.root.protocol("WM_DELETE_WINDOW", self.quit_program)
-        
-        # 记录最后一次操作时间，避免频繁操作
-        self.last_save_time = 0
-        self.cooldown_time = 0.5  # 冷却时间，单位秒
-        
-        # 应用程序特定的保存快捷键映射
-        self.save_hotkeys = {
-            # 通用保存快捷键
-            'default': ['ctrl', 's'],
-            # 可以根据需要添加特定应用程序的保存快捷键
-        }
-        
-        # 已知的文档编辑应用程序列表
-        self.document_apps = [
-            'word', 'excel', 'powerpnt', 'outlook',  # Microsoft Office
-            'notepad++', 'sublime_text', 'vscode', 'atom',  # 文本编辑器
-            'photoshop', 'illustrator', 'indesign',  # Adobe Creative Suite
-            'pycharm', 'intellij', 'eclipse', 'visualstudio',  # IDEs
-            'chrome', 'firefox', 'edge', 'opera',  # 浏览器
-        ]
     
-    def is_cooldown_over(self):
-        """检查操作冷却时间是否已过"""
-        current_time = time.time()
-        if current_time - self.last_save_time < self.cooldown_time:
-            return False
-        self.last_save_time = current_time
-        return True
+    def on_foreground_change(self, info):
+        """前台窗口或标题变化（在跟踪器线程中调用）"""
+        self.save_verifier.notify()
     
     def get_active_window_info(self):
-        """获取当前活动窗口的信息"""
-        try:
-            # 获取当前活动窗口的句柄
-            hwnd = win32gui.GetForegroundWindow()
-            if hwnd == 0:
-                return "无活动窗口", "unknown"
-            
-            # 获取窗口标题
-            window_title = win32gui.GetWindowText(hwnd)
-            if not window_title:
-                window_title = "无标题窗口"
-                
-            # 获取进程ID
-            _, pid = win32process.GetWindowThreadProcessId(hwnd)
-            # 获取进程名称
-            try:
-                process = psutil.Process(pid)
-                process_name = process.name().lower()
-            except:
-                process_name = "unknown_process"
-                
-            return window_title, process_name
-        except Exception as e:
-            print(f"获取活动窗口信息时出错: {e}")
-            return "未知窗口", "unknown"
+        """获取当前活动窗口的信息（读取前台窗口跟踪器的缓存状态）"""
+        info = self.foreground.current
+        if not info.hwnd:
+            return "无活动窗口", "unknown"
+        window_title = info.title or "无标题窗口"
+        process_name = info.process_name or "unknown_process"
+        return window_title, process_name
+    
+    def document_label(self, window_title, process_name):
+        """状态消息中显示的文档名称：优先显示窗口标题而非进程名"""
+        if window_title and window_title != "无标题窗口" and window_title != "无活动窗口":
+            # 移除可能的路径信息，只显示文件名
+            if '\\' in window_title:
+                window_title = window_title.split('\\')[-1]
+            return window_title
+        return process_name
+    
+    def hotkey_for(self, process_name):
+        """选择适当的保存快捷键"""
+        if process_name in self.save_hotkeys:
+            return self.save_hotkeys[process_name]
+        return self.save_hotkeys['default']  # 使用默认的Ctrl+S
+    
+    def activate_window(self, hwnd, timeout=ACTIVATE_TIMEOUT):
+        """把窗口切换到前台，等待前台窗口跟踪器确认，返回是否成功"""
+        if self.foreground.current.hwnd == hwnd:
+            return True
+        win32gui.SetForegroundWindow(hwnd)
+        deadline = time.perf_counter() + timeout
+        while self.foreground.current.hwnd != hwnd:
+            if time.perf_counter() > deadline:
+                return False
+            time.sleep(0.005)
+        return True
+    
+    def save_window(self, window, rule):
+        """自动保存一个文档窗口（在定时线程中调用），返回保存确认结果"""
+        with self.save_lock:
+            # 用户切换了窗口时快捷键会发到别的窗口，此时放弃保存
+            if not self.activate_window(window.hwnd):
+                logger.info("无法切换到窗口，跳过自动保存: %s", window.title)
+                return 'not_activated'
+            snapshot = self.save_verifier.snapshot(window.hwnd, rule.is_dirty)
+            self.injector.hotkey(*self.hotkey_for(window.process_name))
+            result = self.save_verifier.verify(snapshot)
+        SAVE_VERIFY_SECONDS.observe(result.elapsed)
+        SAVE_RESULTS.labels(result.status).inc()
+        document = self.document_label(rule.strip(window.title), window.process_name)
+        if result.status == SAVE_CONFIRMED:
+            status_msg = f"已自动保存文档: {document} ({result.elapsed * 1000:.0f}ms)"
+        elif result.status == SAVE_UNVERIFIED:
+            status_msg = f"已发送保存快捷键（无法确认保存结果）: {document}"
+        else:
+            status_msg = f"已发送保存快捷键，但未能确认保存结果: {document}"
+        logger.info(status_msg)
+        self.update_status(status_msg)
+        return result.status
+    
+    def toggle_auto_save(self):
+        """窗口中的定时自动保存开关"""
+        self.set_auto_save(self.auto_save_var.get())
+    
+    def set_auto_save(self, enabled):
+        """开启或关闭定时自动保存"""
+        if not self.headless:
+            self.auto_save_var.set(enabled)
+        if enabled:
+            self.auto_saver.start()
+            status_msg = f"定时自动保存已开启（每{self.auto_saver.interval:.0f}秒）"
+        else:
+            self.auto_saver.stop()
+            status_msg = "定时自动保存已关闭"
+        self.update_status(status_msg)
     
     def is_document_application(self, process_name):
         """检查是否为文档类应用程序"""
-        for app in self.document_apps:
-            if app in process_name:
-                return True
-        return False
+        return self.app_registry.is_document(process_name)
     
     def save_current_document(self):
         """保存当前活动文档"""
-        if not self.is_cooldown_over():
-            return
-        
         try:
             # 调试信息 - 开始保存操作
-            print("\n===== 开始保存文档操作 =====")
+            logger.debug("===== 开始保存文档操作 =====")
             
             # 获取当前活动窗口信息
             window_title, process_name = self.get_active_window_info()
             
             # 调试信息 - 显示窗口信息
-            print(f"检测到的窗口标题: '{window_title}'")
-            print(f"检测到的进程名称: '{process_name}'")
+            logger.debug("检测到的窗口标题: '%s'", window_title)
+            logger.debug("检测到的进程名称: '%s'", process_name)
             
             # 避免保存本程序自身
             if "pythonw.exe" in process_name or "python.exe" in process_name:
                 status_msg = "当前是Python程序窗口，无需保存"
-                print(status_msg)
-                self.root.after(0, lambda: self.update_status(status_msg))
+                logger.info(status_msg)
+                self.update_status(status_msg)
                 return
             
             # 检查是否为文档类应用程序
             is_document = self.is_document_application(process_name)
-            print(f"是否为文档应用: {is_document}")
+            logger.debug("是否为文档应用: %s", is_document)
             
             # 选择适当的保存快捷键
-            if process_name in self.save_hotkeys:
-                hotkey = self.save_hotkeys[process_name]
-            else:
-                hotkey = self.save_hotkeys['default']  # 使用默认的Ctrl+S
-            print(f"使用的保存快捷键: {hotkey}")
-            
-            # 确保焦点在当前窗口
-            hwnd = win32gui.GetForegroundWindow()
-            if hwnd:
-                win32gui.SetForegroundWindow(hwnd)
-                print("已确保焦点在当前窗口")
-            
-            # 添加一个小延迟，确保在正确的窗口中执行
-            time.sleep(0.2)
+            hotkey = self.hotkey_for(process_name)
+            logger.debug("使用的保存快捷键: %s", hotkey)
             
-            # 发送保存快捷键
-            print("正在发送保存快捷键...")
-            pyautogui.hotkey(*hotkey)
-            print("保存快捷键已发送")
+            # 按应用的规则读取修改状态，只用于标注保存结果：触发键可能刚刚输入到编辑器中，
+            # 标题还来不及显示修改标记，手动保存总是发送快捷键
+            document = self.document_label(window_title, process_name)
+            rule = self.dirty_rules.rule_for(process_name)
+            dirty_state = rule.state(window_title)
+            logger.debug("文档修改状态: %s", dirty_state)
             
-            # 添加一个小延迟，确保保存操作完成
-            time.sleep(0.3)
-            
-            # 更精确地检测保存是否成功 - 可以根据窗口标题变化来判断
-            new_window_title = win32gui.GetWindowText(win32gui.GetForegroundWindow())
-            if new_window_title != window_title:
-                print(f"窗口标题变化: '{window_title}' -> '{new_window_title}'")
+            with self.save_lock:
+                # 确保焦点在当前窗口（按键由钩子触发时前台窗口就是目标窗口，无需额外等待）
+                hwnd = self.foreground.current.hwnd
+                if hwnd:
+                    win32gui.SetForegroundWindow(hwnd)
+                    logger.debug("已确保焦点在当前窗口")
+                
+                # 记录发送前的标题和文件修改时间，用于确认保存结果
+                snapshot = self.save_verifier.snapshot(hwnd, rule.is_dirty)
+                
+                # 发送保存快捷键
+                logger.debug("正在发送保存快捷键...")
+                self.injector.hotkey(*hotkey)
+                logger.debug("保存快捷键已发送")
+                
+                # 轮询标题和文件修改时间，确认保存后立即返回，最多等待截止时间
+                result = self.save_verifier.verify(snapshot)
+            if result.status == SAVE_UNVERIFIED and dirty_state == CLEAN:
+                # 无法观察保存结果，但该应用的标题在按键前没有修改标记
+                result.status = SAVE_NOT_DIRTY
+            self.save_history.record(process_name, rule.strip(window_title), SOURCE_MANUAL, result.status)
+            SAVE_VERIFY_SECONDS.observe(result.elapsed)
+            SAVE_RESULTS.labels(result.status).inc()
+            if result.title != window_title:
+                logger.debug("窗口标题变化: '%s' -> '%s'", window_title, result.title)
             
-            # 构建状态消息 - 重点显示窗口标题而非进程名
-            if window_title and window_title != "无标题窗口" and window_title != "无活动窗口":
-                # 移除可能的路径信息，只显示文件名
-                if '\\' in window_title:
-                    window_title = window_title.split('\\')[-1]
-                status_msg = f"已保存文档: {window_title}"
+            # 构建状态消息
+            if result.status == SAVE_CONFIRMED:
+                status_msg = f"已保存文档: {document} ({result.elapsed * 1000:.0f}ms)"
+            elif result.status == SAVE_UNVERIFIED:
+                # 标题不反映修改状态、也找不到文件的应用：快捷键已发送，但无法观察到保存
+                status_msg = f"已发送保存快捷键（无法确认保存结果）: {document}"
+            elif result.status == SAVE_NOT_DIRTY:
+                status_msg = f"已发送保存快捷键，文档没有需要保存的修改: {document}"
             else:
-                status_msg = f"已尝试保存当前窗口: {process_name}"
+                status_msg = f"已发送保存快捷键，但未能确认保存结果: {document}"
             
-            print(status_msg)
-            print("===== 保存文档操作完成 =====")
+            logger.info(status_msg)
+            logger.debug("===== 保存文档操作完成 =====")
             
             # 更新状态标签
-            self.root.after(0, lambda: self.update_status(status_msg))
+            self.update_status(status_msg)
             
         except Exception as e:
             error_msg = f"保存文档时出错: {str(e)}"
-            print(error_msg)
-            print("===== 保存文档操作失败 =====")
-            self.root.after(0, lambda: self.update_status(error_msg))
+            logger.error(error_msg)
+            logger.debug("===== 保存文档操作失败 =====")
+            self.update_status(error_msg)
     
     def update_status(self, status_msg):
-        """更新状态标签，显示最近操作"""
+        """发布最近操作到状态行（可在任意线程调用，连续的更新会被合并，按上限频率刷新）"""
+        if self.headless:
+            self.notifier.status('document_saver', status_msg)
+        else:
+            self.status_line.set(status_msg)
+    
+    def register_hotkeys(self):
+        """注册快捷键，按键已被其他组件占用时跳过并提示"""
+        bindings = [
+            ('a', lambda: self.executor.submit('save_document', self.save_current_document), False),
+            # 共享绑定，但只在本组件窗口位于前台时退出
+            ('q', self.handle_quit_key, True),
+        ]
+        for key, handler, shared in bindings:
+            try:
+                self.keyboard_bus.register(key, handler, owner=self, shared=shared)
+            except KeyBindingConflict as e:
+                logger.warning("快捷键冲突: %s", e)
+                self.update_status(str(e))
+    
+    def handle_quit_key(self):
+        """Q键处理：仅当程序窗口为当前活动窗口时退出"""
         try:
-            original_text = self.status_label.cget("text")
-            lines = original_text.split('\n')
-            # 保留前几行说明文字，更新最后一行状态
-            if len(lines) > 1:
-                updated_text = '\n'.join(lines[:-1]) + f"\n最近操作: {status_msg}"
+            # 获取当前活动窗口的标题
+            current_title = self.foreground.current.title
+            if not current_title:
+                return
+            
+            # 获取程序窗口的标题
+            app_title = self.root.title()
+            
+            # 调试信息
+            logger.debug("当前活动窗口标题: '%s'", current_title)
+            logger.debug("程序窗口标题: '%s'", app_title)
+            
+            # 检查当前活动窗口是否为程序窗口（通过标题匹配）
+            if app_title in current_title or current_title in app_title:
+                logger.info("检测到程序窗口是当前活动窗口，执行退出操作")
+                self.quit_program()
             else:
-                updated_text = original_text + f"\n最近操作: {status_msg}"
-            self.status_label.config(text=updated_text)
+                logger.debug("程序窗口不是当前活动窗口，不执行退出操作")
         except Exception as e:
-            print(f"更新状态标签时出错: {e}")
+            logger.warning("键盘处理出错: %s", str(e))
     
-    def on_key_press(self, key):
-        """键盘按键处理"""
-        try:
-            if hasattr(key, 'char') and key.char:
-                char = key.char.lower()
-                if char == 'a':
-                    self.save_current_document()
-                elif char == 'q':
-                    # 获取当前活动窗口的标题
-                    current_hwnd = win32gui.GetForegroundWindow()
-                    current_title = win32gui.GetWindowText(current_hwnd)
-                    
-                    # 获取程序窗口的标题
-                    app_title = self.root.title()
-                    
-                    # 调试信息
-                    print(f"当前活动窗口标题: '{current_title}'")
-                    print(f"程序窗口标题: '{app_title}'")
-                    
-                    # 检查当前活动窗口是否为程序窗口（通过标题匹配）
-                    if app_title in current_title or current_title in app_title:
-                        print("检测到程序窗口是当前活动窗口，执行退出操作")
-                        self.quit_program()
-                    else:
-                        print("程序窗口不是当前活动窗口，不执行退出操作")
-        except Exception as e:
-            print(f"键盘处理出错: {str(e)}")
+    def stop(self):
+        """停止键盘监听并释放资源，不关闭窗口也不退出进程"""
+        if self.stopped:
+            return
+        self.stopped = True
+        
+        # 注销本组件的全部快捷键，最后一个组件注销时键盘钩子随之停止
+        self.keyboard_bus.unregister_owner(self)
+        self.foreground.remove_listener(self.on_foreground_change)
+        
+        # 停止定时自动保存
+        self.auto_saver.stop()
+        
+        # 停止动作执行器
+        self.executor.stop()
+        if not self.headless:
+            self.status_line.destroy()
     
     def quit_program(self):
         """安全退出程序，确保所有资源正确释放"""
-        print("正在退出程序...")
+        logger.info("正在退出程序...")
+        self.stop()
         
-        # 停止键盘监听器
-        if hasattr(self, 'listener') and self.listener:
+        # 进程内宿主模式：只销毁本组件的窗口，不停止共享的主循环，也不退出进程
+        # Q键处理函数在键盘钩子线程中运行，窗口操作交给Tk线程执行
+        if self.hosted:
             try:
-                self.listener.stop()
-                print("键盘监听器已停止")
+                self.root.after(0, self.close_hosted_window)
             except Exception as e:
-                print(f"停止键盘监听器时出错: {e}")
+                logger.warning("关闭组件窗口时出错: %s", e)
+            return
         
         # 安全关闭Tkinter窗口
         try:
             # 先quit，再destroy，确保事件循环停止
             if hasattr(self, 'root') and self.root:
                 self.root.quit()
-                print("Tkinter主循环已停止")
+                logger.debug("Tkinter主循环已停止")
                 # 短暂延迟，确保quit生效
                 time.sleep(0.1)
                 self.root.destroy()
-                print("Tkinter窗口已销毁")
+                logger.debug("Tkinter窗口已销毁")
         except Exception as e:
-            print(f"关闭Tkinter窗口时出错: {e}")
+            logger.warning("关闭Tkinter窗口时出错: %s", e)
         
         # 最后退出Python进程
-        print("程序退出完成")
+        logger.info("程序退出完成")
         sys.exit(0)
     
+    def close_hosted_window(self):
+        """进程内宿主模式：在Tk线程中销毁本组件的窗口并通知宿主"""
+        try:
+            self.root.destroy()
+        except Exception as e:
+            logger.warning("关闭组件窗口时出错: %s", e)
+        if self.on_quit:
+            self.on_quit()
+        logger.info("组件已停止")
+    
     def run(self):
         """运行程序主循环"""
         self.root.mainloop()
 
 if __name__ == "__main__":
+    setup_logging('document_saver')
+    setup_metrics('document_saver')
     try:
-        app = DocumentSaverApp()
+        app = DocumentSaverApp(headless=HEADLESS_FLAG in sys.argv)
+        startup_profiler.watch_window(app.root)
+        # 由主程序启动时定期输出心跳
+        start_heartbeat(app.root)
         app.run()
     except Exception as e:
-        print(f"程序启动失败: {e}")
-        input("按回车键退出...")
\ No newline at end of file
+        logger.error("程序启动失败: %s", e)
+        # 单独运行时保留控制台窗口；由主程序监管时以非零退出码退出，按崩溃处理
+        if not is_supervised():
+            input("按回车键退出...")
+        sys.exit(1)
\ No newline at end of file
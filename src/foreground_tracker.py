@@ -0,0 +1,478 @@
+import logging
+import os
+import sys
+import threading
+import time
+
+logger = logging.getLogger('foreground_tracker')
+
+
+class ForegroundInfo:
+    """某一时刻的前台窗口信息（不可变，读取时无需加锁）"""
+    __slots__ = ('hwnd', 'title', 'pid', 'process_name', 'updated')
+
+    def __init__(self, hwnd=0, title='', pid=0, process_name=None, updated=0.0):
+        self.hwnd = hwnd
+        self.title = title
+        self.pid = pid
+        self.process_name = process_name
+        self.updated = updated
+
+    def __repr__(self):
+        return f"<ForegroundInfo {self.process_name}({self.pid}) '{self.title}'>"
+
+
+EMPTY = ForegroundInfo()
+
+
+def _psutil_process_name(pid):
+    import psutil
+    try:
+        return psutil.Process(pid).name().lower()
+    except (psutil.NoSuchProcess, psutil.ZombieProcess):
+        return None
+    except psutil.AccessDenied:
+        return ''
+
+
+def _psutil_pids():
+    import psutil
+    return psutil.pids()
+
+
+def _psutil_pid_exists(pid):
+    import psutil
+    return psutil.pid_exists(pid)
+
+
+class ProcessInfoCache:
+    """pid -> 进程名缓存；进程退出后由prune()或invalidate()清除，避免pid复用后读到旧名称"""
+
+    def __init__(self, name_lookup=None):
+        self._name_lookup = name_lookup or _psutil_process_name
+        self._names = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def name(self, pid):
+        if not pid:
+            return None
+        name = self._names.get(pid)
+        if name is not None:
+            self.hits += 1
+            return name
+        self.misses += 1
+        name = self._name_lookup(pid)
+        if name is not None:
+            with self._lock:
+                self._names[pid] = name
+        return name
+
+    def invalidate(self, pid):
+        with self._lock:
+            self._names.pop(pid, None)
+
+    def prune(self, live_pids):
+        """删除已退出进程的缓存"""
+        live = set(live_pids)
+        with self._lock:
+            for pid in [pid for pid in self._names if pid not in live]:
+                del self._names[pid]
+
+    def __len__(self):
+        return len(self._names)
+
+
+class ForegroundBackend:
+    """前台窗口事件源：焦点或前台窗口标题变化时调用on_change(hwnd, title, pid)"""
+    name = 'base'
+    # 事件源线程启动后意外结束时调用on_failure(error)，由跟踪器改为轮询
+    on_failure = None
+
+    def start(self, on_change):
+        raise NotImplementedError
+
+    def stop(self):
+        pass
+
+
+class WinEventBackend(ForegroundBackend):
+    """Windows：SetWinEventHook监听前台窗口切换和窗口标题变化，在专用线程中运行消息循环"""
+    name = 'winevent'
+
+    EVENT_SYSTEM_FOREGROUND = 0x0003
+    EVENT_OBJECT_NAMECHANGE = 0x800C
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    OBJID_WINDOW = 0
+    WM_QUIT = 0x0012
+
+    def __init__(self):
+        self._thread = None
+        self._thread_id = None
+        self._ready = threading.Event()
+        self._hwnd = None
+        self._error = None
+        self._stopping = False
+
+    def _read(self, hwnd):
+        import ctypes
+        from ctypes import wintypes
+        user32 = ctypes.windll.user32
+        length = user32.GetWindowTextLengthW(hwnd)
+        buffer = ctypes.create_unicode_buffer(length + 1)
+        user32.GetWindowTextW(hwnd, buffer, length + 1)
+        pid = wintypes.DWORD()
+        user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+        return buffer.value, pid.value
+
+    def start(self, on_change):
+        """启动钩子线程；2秒内没有就绪或安装钩子失败时抛出异常，由跟踪器改为轮询"""
+        self._error = None
+        self._stopping = False
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run, args=(on_change,), name="foreground-winevent", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(2.0):
+            # 线程之后就绪时也不再处理事件，避免与轮询同时通知
+            self.stop()
+            raise RuntimeError("WinEvent钩子线程没有在2秒内就绪")
+        if self._error is not None:
+            raise self._error
+
+    def _run(self, on_change):
+        try:
+            self._hook_loop(on_change)
+        except Exception as e:
+            self._error = e
+        if not self._ready.is_set():
+            # start()仍在等待，由start()抛出异常
+            self._ready.set()
+            return
+        if self._stopping:
+            return
+        # 启动后钩子线程意外结束：通知跟踪器改为轮询
+        error = self._error or RuntimeError("WinEvent消息循环意外结束")
+        logger.warning("前台窗口事件线程已结束: %s", error)
+        if self.on_failure is not None:
+            self.on_failure(error)
+
+    def _hook_loop(self, on_change):
+        import ctypes
+        from ctypes import wintypes
+        user32 = ctypes.windll.user32
+        kernel32 = ctypes.windll.kernel32
+        user32.SetWinEventHook.restype = wintypes.HANDLE
+        WinEventProc = ctypes.WINFUNCTYPE(None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+                                          wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+
+        def callback(hook, event, hwnd, id_object, id_child, thread, timestamp):
+            try:
+                if event == self.EVENT_SYSTEM_FOREGROUND:
+                    self._hwnd = hwnd
+                elif hwnd != self._hwnd or id_object != self.OBJID_WINDOW:
+                    # 只关心前台窗口本身的标题变化
+                    return
+                title, pid = self._read(hwnd)
+                on_change(hwnd, title, pid)
+            except Exception as e:
+                logger.warning("处理前台窗口事件时出错: %s", e)
+
+        # 回调对象必须在钩子存在期间保持引用
+        self._callback = WinEventProc(callback)
+        hooks = [
+            user32.SetWinEventHook(self.EVENT_SYSTEM_FOREGROUND, self.EVENT_SYSTEM_FOREGROUND, 0,
+                                   self._callback, 0, 0, self.WINEVENT_OUTOFCONTEXT),
+            user32.SetWinEventHook(self.EVENT_OBJECT_NAMECHANGE, self.EVENT_OBJECT_NAMECHANGE, 0,
+                                   self._callback, 0, 0, self.WINEVENT_OUTOFCONTEXT),
+        ]
+        if not all(hooks):
+            for hook in hooks:
+                if hook:
+                    user32.UnhookWinEvent(hook)
+            raise ctypes.WinError()
+        self._thread_id = kernel32.GetCurrentThreadId()
+        if self._stopping:
+            # start()已经超时放弃
+            for hook in hooks:
+                user32.UnhookWinEvent(hook)
+            return
+        # 启动时读取一次当前前台窗口
+        hwnd = user32.GetForegroundWindow()
+        if hwnd:
+            self._hwnd = hwnd
+            title, pid = self._read(hwnd)
+            on_change(hwnd, title, pid)
+        self._ready.set()
+
+        msg = wintypes.MSG()
+        try:
+            while True:
+                result = user32.GetMessageW(ctypes.byref(msg), 0, 0, 0)
+                if result == 0:
+                    break
+                if result < 0:
+                    raise ctypes.WinError()
+                user32.TranslateMessage(ctypes.byref(msg))
+                user32.DispatchMessageW(ctypes.byref(msg))
+        finally:
+            for hook in hooks:
+                user32.UnhookWinEvent(hook)
+
+    def stop(self):
+        self._stopping = True
+        if self._thread_id is not None:
+            import ctypes
+            ctypes.windll.user32.PostThreadMessageW(self._thread_id, self.WM_QUIT, 0, 0)
+            self._thread_id = None
+
+
+class X11Backend(ForegroundBackend):
+    """X11：监听根窗口的_NET_ACTIVE_WINDOW属性和活动窗口的_NET_WM_NAME属性（需要python-xlib）"""
+    name = 'x11'
+
+    def __init__(self, display_name=None):
+        self.display_name = display_name
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self, on_change):
+        from Xlib import display
+        self._display = display.Display(self.display_name)
+        self._thread = threading.Thread(target=self._run, args=(on_change,), name="foreground-x11", daemon=True)
+        self._thread.start()
+
+    def _property(self, window, atom, type_atom):
+        try:
+            prop = window.get_full_property(atom, type_atom)
+        except Exception:
+            return None
+        return prop.value if prop is not None else None
+
+    def _run(self, on_change):
+        import select
+        from Xlib import X
+        d = self._display
+        root = d.screen().root
+        net_active = d.intern_atom('_NET_ACTIVE_WINDOW')
+        net_name = d.intern_atom('_NET_WM_NAME')
+        net_pid = d.intern_atom('_NET_WM_PID')
+        utf8 = d.intern_atom('UTF8_STRING')
+        root.change_attributes(event_mask=X.PropertyChangeMask)
+        active = None
+
+        def refresh_active():
+            nonlocal active
+            value = self._property(root, net_active, X.AnyPropertyType)
+            window_id = int(value[0]) if value is not None and len(value) else 0
+            active = d.create_resource_object('window', window_id) if window_id else None
+            if active is not None:
+                # 同时关注活动窗口的标题变化
+                active.change_attributes(event_mask=X.PropertyChangeMask)
+            report()
+
+        def report():
+            if active is None:
+                on_change(0, '', 0)
+                return
+            title = self._property(active, net_name, utf8)
+            if isinstance(title, bytes):
+                title = title.decode('utf-8', 'replace')
+            pid = self._property(active, net_pid, X.AnyPropertyType)
+            on_change(active.id, title or '', int(pid[0]) if pid is not None and len(pid) else 0)
+
+        refresh_active()
+        while not self._stop_event.is_set():
+            readable, _, _ = select.select([d.fileno()], [], [], 0.5)
+            if not readable and not d.pending_events():
+                continue
+            while d.pending_events():
+                event = d.next_event()
+                if event.type != X.PropertyNotify:
+                    continue
+                if event.window == root and event.atom == net_active:
+                    refresh_active()
+                elif active is not None and event.window == active and event.atom == net_name:
+                    report()
+        d.close()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def _win32_reader():
+    import win32gui
+    import win32process
+    hwnd = win32gui.GetForegroundWindow()
+    if not hwnd:
+        return 0, '', 0
+    _, pid = win32process.GetWindowThreadProcessId(hwnd)
+    return hwnd, win32gui.GetWindowText(hwnd), pid
+
+
+class PollingBackend(ForegroundBackend):
+    """没有事件通知时定期读取前台窗口，只在变化时通知"""
+    name = 'polling'
+
+    def __init__(self, reader=None, interval=0.25):
+        # reader() 返回 (hwnd, title, pid)
+        self.reader = reader or _win32_reader
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self, on_change):
+        self._last = None
+        self._poll(on_change)
+        self._thread = threading.Thread(target=self._run, args=(on_change,), name="foreground-polling", daemon=True)
+        self._thread.start()
+
+    def _poll(self, on_change):
+        try:
+            state = self.reader()
+        except Exception as e:
+            logger.warning("读取前台窗口失败: %s", e)
+            return
+        if state != self._last:
+            self._last = state
+            on_change(*state)
+
+    def _run(self, on_change):
+        while not self._stop_event.wait(self.interval):
+            self._poll(on_change)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+class FakeForegroundBackend(ForegroundBackend):
+    """内存中的模拟事件源，用于测试和基准测试"""
+    name = 'fake'
+
+    def __init__(self):
+        self._on_change = None
+
+    def start(self, on_change):
+        self._on_change = on_change
+
+    def set_foreground(self, hwnd, title, pid):
+        if self._on_change is not None:
+            self._on_change(hwnd, title, pid)
+
+
+def default_backend():
+    """按平台选择事件源：Windows用WinEvent钩子，X11用EWMH属性通知，其他情况轮询"""
+    from lazy_import import module_available
+    if sys.platform.startswith('win'):
+        return WinEventBackend()
+    if os.environ.get('DISPLAY') and module_available('Xlib'):
+        return X11Backend()
+    return PollingBackend()
+
+
+class ForegroundTracker:
+    """前台窗口跟踪器
+
+    由事件源在焦点或标题变化时更新当前窗口、标题、pid和进程名，按键处理函数读取current时
+    不需要任何系统调用。进程名按pid缓存，定期清除已退出进程的缓存。
+    """
+
+    def __init__(self, backend=None, process_cache=None, pid_source=None, prune_interval=30.0, pid_exists=None):
+        self.backend = backend
+        self.process_cache = process_cache if process_cache is not None else ProcessInfoCache()
+        self._pid_source = pid_source or _psutil_pids
+        self._pid_exists = pid_exists or _psutil_pid_exists
+        self.prune_interval = prune_interval
+        self._last_prune = time.monotonic()
+        self.current = EMPTY
+        self._listeners = []
+        self._started = False
+        self._lock = threading.Lock()
+
+    def add_listener(self, callback):
+        """前台窗口或标题变化时调用callback(info)（在事件源线程中调用）"""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def start(self):
+        """启动事件源（已启动时忽略）"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        if self.backend is None:
+            self.backend = default_backend()
+        self.backend.on_failure = self._backend_failed
+        try:
+            self.backend.start(self._on_change)
+            logger.info("前台窗口跟踪已启动 (%s)", self.backend.name)
+        except Exception as e:
+            logger.warning("%s前台窗口事件不可用，改为轮询: %s", self.backend.name, e)
+            self.backend = PollingBackend()
+            self.backend.start(self._on_change)
+
+    def _backend_failed(self, error):
+        """事件源线程启动后意外结束（在事件源线程中调用），改为轮询"""
+        with self._lock:
+            if not self._started or isinstance(self.backend, PollingBackend):
+                return
+            failed = self.backend
+            self.backend = PollingBackend()
+        logger.warning("%s前台窗口事件中断，改为轮询: %s", failed.name, error)
+        self.backend.start(self._on_change)
+
+    def stop(self):
+        with self._lock:
+            if not self._started:
+                return
+            self._started = False
+        self.backend.stop()
+
+    def _on_change(self, hwnd, title, pid):
+        now = time.monotonic()
+        if now - self._last_prune > self.prune_interval:
+            self._last_prune = now
+            try:
+                self.process_cache.prune(self._pid_source())
+            except Exception as e:
+                logger.debug("清理进程缓存失败: %s", e)
+        previous = self.current
+        if pid == previous.pid and previous.process_name is not None:
+            process_name = previous.process_name
+        else:
+            if previous.pid:
+                self._forget_if_exited(previous.pid)
+            process_name = self.process_cache.name(pid)
+        self.current = ForegroundInfo(hwnd, title or '', pid, process_name, now)
+        for callback in list(self._listeners):
+            try:
+                callback(self.current)
+            except Exception as e:
+                logger.warning("前台窗口回调出错: %s", e)
+
+    def _forget_if_exited(self, pid):
+        """前台切换到其他进程时检查原进程是否仍在，已退出的立即清除缓存，pid复用后不会读到旧名称"""
+        try:
+            exists = self._pid_exists(pid)
+        except Exception as e:
+            logger.debug("检查进程 %s 是否存在失败: %s", pid, e)
+            return
+        if not exists:
+            self.process_cache.invalidate(pid)
+
+
+_default_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def get_default_tracker():
+    """返回进程内共享的前台窗口跟踪器（已启动）"""
+    global _default_tracker
+    with _tracker_lock:
+        if _default_tracker is None:
+            _default_tracker = ForegroundTracker()
+    _default_tracker.start()
+    return _default_tracker
@@ -0,0 +1,159 @@
+import heapq
+import itertools
+import logging
+import signal
+import threading
+import time
+
+logger = logging.getLogger('headless')
+
+# 入口脚本的命令行参数：不创建Tk窗口，以无界面模式运行
+HEADLESS_FLAG = '--headless'
+
+
+class HeadlessLoop:
+    """无界面模式的轻量主循环，代替Tk根窗口
+
+    提供组件用到的根窗口接口子集：after/after_cancel/mainloop/quit/destroy/title/protocol/bind，
+    定时器保存在最小堆中，after()可以在任意线程调用。不导入tkinter，也不创建GUI线程和任务栏图标。
+    Ctrl+C和SIGTERM按关闭窗口处理（调用protocol登记的WM_DELETE_WINDOW回调）。
+    """
+
+    # 等待的最长时间：Windows上的锁等待不响应Ctrl+C，分段等待以便及时处理
+    MAX_WAIT = 0.5
+
+    def __init__(self, title=''):
+        self._title = title
+        self._timers = []
+        self._callbacks = {}
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._running = False
+        self._destroyed = False
+        self._protocols = {}
+        self._map_callbacks = []
+
+    # ---- Tk根窗口接口 ----
+
+    def title(self, text=None):
+        if text is None:
+            return self._title
+        self._title = text
+
+    def protocol(self, name, func=None):
+        self._protocols[name] = func
+
+    def bind(self, sequence, func, add=None):
+        # 只支持<Map>：主循环开始时视为"窗口已显示"，用于启动耗时分析
+        if sequence == '<Map>':
+            self._map_callbacks.append(func)
+
+    def after(self, ms, func=None, *args):
+        """ms毫秒后在主循环线程中调用func(*args)，返回可用于after_cancel的标识"""
+        if func is None:
+            time.sleep(ms / 1000.0)
+            return None
+        timer_id = f'after#{next(self._ids)}'
+        with self._cond:
+            if self._destroyed:
+                return timer_id
+            self._callbacks[timer_id] = (func, args)
+            heapq.heappush(self._timers, (time.monotonic() + ms / 1000.0, timer_id))
+            self._cond.notify()
+        return timer_id
+
+    def after_idle(self, func, *args):
+        return self.after(0, func, *args)
+
+    def after_cancel(self, timer_id):
+        with self._cond:
+            self._callbacks.pop(timer_id, None)
+
+    def winfo_exists(self):
+        return not self._destroyed
+
+    def update(self):
+        """执行所有已到期的定时器，不等待"""
+        for func, args in self._due():
+            self._call(func, args)
+
+    update_idletasks = update
+
+    def mainloop(self):
+        """运行主循环，直到quit()或destroy()"""
+        self._running = True
+        restore = self._install_signal_handlers()
+        try:
+            for func in self._map_callbacks:
+                self._call(func, (None,))
+            while self._running:
+                try:
+                    for func, args in self._wait():
+                        self._call(func, args)
+                except KeyboardInterrupt:
+                    self.close()
+        finally:
+            self._running = False
+            restore()
+
+    def quit(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+
+    def destroy(self):
+        with self._cond:
+            self._destroyed = True
+            self._running = False
+            self._timers.clear()
+            self._callbacks.clear()
+            self._cond.notify()
+
+    # ---- 内部实现 ----
+
+    def close(self):
+        """按关闭窗口处理：调用WM_DELETE_WINDOW回调，没有时直接结束主循环"""
+        handler = self._protocols.get('WM_DELETE_WINDOW')
+        if handler is None:
+            self.quit()
+        else:
+            self._call(handler, ())
+
+    def _due(self):
+        now = time.monotonic()
+        due = []
+        with self._cond:
+            while self._timers and self._timers[0][0] <= now:
+                _, timer_id = heapq.heappop(self._timers)
+                callback = self._callbacks.pop(timer_id, None)
+                if callback is not None:
+                    due.append(callback)
+        return due
+
+    def _wait(self):
+        """等待到下一个定时器到期或被唤醒，返回已到期的回调"""
+        with self._cond:
+            if self._running and (not self._timers or self._timers[0][0] > time.monotonic()):
+                timeout = self._timers[0][0] - time.monotonic() if self._timers else self.MAX_WAIT
+                self._cond.wait(min(max(0.0, timeout), self.MAX_WAIT))
+        return self._due()
+
+    def _call(self, func, args):
+        try:
+            func(*args)
+        except (SystemExit, KeyboardInterrupt):
+            raise
+        except Exception as e:
+            # 与Tk一致：单个回调出错不结束主循环
+            logger.exception("主循环回调出错: %s", e)
+
+    def _install_signal_handlers(self):
+        """SIGTERM按关闭窗口处理；只能在主线程中安装"""
+        if threading.current_thread() is not threading.main_thread() or not hasattr(signal, 'SIGTERM'):
+            return lambda: None
+        previous = signal.getsignal(signal.SIGTERM)
+        try:
+            signal.signal(signal.SIGTERM, lambda signum, frame: self.after(0, self.close))
+        except (ValueError, OSError):
+            return lambda: None
+        return lambda: signal.signal(signal.SIGTERM, previous)
@@ -1,16 +1,78 @@
-import tkinter as tk
-from pynput import keyboard
-import pyautogui
+import startup_profiler
+startup_profiler.enable_from_argv()
+
+import logging
 import sys
 import threading
 import time
+from lazy_import import LazyModule
+from app_registry import get_registry
+from action_executor import ActionExecutor, TokenBucket
+from keyboard_bus import get_default_bus, KeyBindingConflict
+from foreground_tracker import get_default_tracker
+from input_injector import get_default_injector
+from media_control import get_media_controller, TOGGLED, UNAVAILABLE
+from process_supervisor import start_heartbeat, is_supervised
+from app_logging import setup_logging
+from ui_updates import StatusLine
+from headless import HeadlessLoop, HEADLESS_FLAG
+from notifications import get_notifier
+from state_store import get_state_store
+from metrics import setup_metrics
+
+# 只有显示窗口时才导入tkinter，无界面模式不加载
+tk = LazyModule('tkinter')
+
+logger = logging.getLogger('hotkey_controller')
 
 class HotkeyControllerApp:
-    def __init__(self):
-        # 创建主窗口
-        self.root = tk.Tk()
+    def __init__(self, master=None, keyboard_bus=None, foreground_tracker=None, input_injector=None,
+                 media_controller=None, headless=False, notifier=None, state_store=None):
+        self.hosted = master is not None
+        # 无界面模式：轻量主循环代替Tk窗口，状态输出到通知目标（进程内宿主模式总是显示窗口）
+        self.headless = headless and not self.hosted
+        # 组件退出时的回调，由宿主设置
+        self.on_quit = None
+        self.stopped = False
+        if self.headless:
+            self.root = HeadlessLoop("快捷键控制器")
+            self.notifier = notifier or get_notifier()
+        else:
+            self.build_window(master)
+        
+        # 动作执行器：键盘钩子只负责提交请求，动作在执行器线程中运行
+        # 每个动作使用独立的令牌桶限流，避免频繁操作；连续的相同请求会被合并
+        self.cooldown_time = 0.5  # 冷却时间，单位秒
+        # 最近一次执行时间和计数保存在共享的状态存储中，重启后冷却时间照常生效
+        self.state = (state_store or get_state_store()).namespace('hotkey_controller')
+        self.executor = ActionExecutor(name="hotkey-actions", state=self.state)
+        for action in ('pause_video', 'switch_window'):
+            self.executor.set_limit(action, TokenBucket.from_cooldown(self.cooldown_time))
+        
+        # 通过共享键盘总线注册全局快捷键，同一进程内的组件共用一个键盘钩子
+        self.keyboard_bus = keyboard_bus or get_default_bus()
+        self.register_hotkeys()
+        
+        # 设置窗口关闭事件
+        self.root.protocol("WM_DELETE_WINDOW", self.quit_program)
+        
+        # 应用程序分类注册表，用于避免向编辑器发送空格
+        self.app_registry = get_registry()
+        
+        # 前台窗口跟踪器：按键时直接读取缓存的前台进程名，不再调用系统接口
+        self.foreground = foreground_tracker or get_default_tracker()
+        
+        # 按键注入后端：原生接口一次调用发送整个组合键，没有pyautogui的固定延迟
+        self.injector = input_injector or get_default_injector()
+        
+        # 媒体会话控制：直接向正在播放的会话发送播放/暂停，不依赖焦点窗口
+        self.media = media_controller or get_media_controller()
+    
+    def build_window(self, master=None):
+        """创建主窗口；由进程内宿主启动时作为宿主根窗口的子窗口"""
+        self.root = tk.Toplevel(master) if master is not None else tk.Tk()
         self.root.title("快捷键控制器")
-        self.root.geometry("400x300")
+        self.root.geometry("400x320")
         
         # 创建状态标签
         self.status_label = tk.Label(
@@ -19,7 +81,10 @@ class HotkeyControllerApp:
             justify=tk.LEFT,
             wraplength=380
         )
-        self.status_label.pack(pady=20)
+        self.status_label.pack(pady=(20, 0))
+        
+        # 状态行：单独的控件，更新时不需要重新解析说明文字
+        self.status_line = StatusLine(self.root, wraplength=380).pack(fill=tk.X, padx=10, pady=(0, 10))
         
         # 创建退出按钮
         self.quit_button = tk.Button(
@@ -28,124 +93,153 @@ class HotkeyControllerApp:
             command=self.quit_program
         )
         self.quit_button.pack(pady=10)
-        
-        # 设置全局键盘监听
-        self.listener = keyboard.Listener(on_press=self.on_key_press)
-        self.listener.start()
-        
-        # 设置窗口关闭事件
-        self.root.protocol("WM_DELETE_WINDOW", self.quit_program)
-        
-        # 记录最后一次操作时间，避免频繁操作
-        self.last_operation_time = {}
-        self.cooldown_time = 0.5  # 冷却时间，单位秒
     
-    def is_cooldown_over(self, operation_name):
-        """检查操作冷却时间是否已过"""
-        current_time = time.time()
-        if operation_name in self.last_operation_time:
-            if current_time - self.last_operation_time[operation_name] < self.cooldown_time:
-                return False
-        self.last_operation_time[operation_name] = current_time
-        return True
+    def submit_action(self, action, func):
+        """返回提交到动作执行器的按键处理函数"""
+        return lambda: self.executor.submit(action, func)
+    
+    def get_foreground_process_name(self):
+        """获取前台窗口所属进程名称，未知时返回None"""
+        return self.foreground.current.process_name or None
     
     def pause_video(self):
         """暂停或播放视频"""
-        if not self.is_cooldown_over('pause_video'):
-            return
-        
         try:
-            # 发送空格键，大多数视频播放器使用空格键暂停/播放
-            pyautogui.press('space')
-            print("已发送暂停/播放命令")
+            # 优先直接控制正在播放的媒体会话（系统媒体传输控件 / MPRIS）
+            result, session = self.media.toggle()
+            if result == TOGGLED:
+                state = "播放" if session.playing else "暂停"
+                status_msg = f"已{state}: {session.app}"
+            elif result == UNAVAILABLE:
+                # 没有媒体控制接口：发送多媒体播放/暂停键，由系统转发给媒体程序，不会输入到当前窗口
+                self.injector.press('playpause')
+                status_msg = "已发送媒体播放/暂停键"
+            else:
+                status_msg = self.pause_focused_player()
+            logger.info(status_msg)
             # 更新状态标签
-            self.root.after(0, lambda: self.update_status("已暂停/播放视频"))
+            self.update_status(status_msg)
         except Exception as e:
             error_msg = f"暂停视频时出错: {e}"
-            print(error_msg)
-            self.root.after(0, lambda: self.update_status(error_msg))
+            logger.warning(error_msg)
+            self.update_status(error_msg)
+    
+    def pause_focused_player(self):
+        """没有可控制的媒体会话时，只在前台是媒体播放器或浏览器时发送空格键"""
+        process_name = self.get_foreground_process_name()
+        if not process_name or not self.app_registry.is_media(process_name):
+            # 前台是文档编辑器等其他程序时发送空格会输入到文档中，跳过
+            return "没有正在播放的媒体，未发送暂停命令"
+        # 大多数视频播放器使用空格键暂停/播放
+        self.injector.press('space')
+        return f"已向 {process_name} 发送暂停/播放命令"
     
     def switch_window(self):
         """切换到上一个窗口 (Alt+Tab)"""
-        if not self.is_cooldown_over('switch_window'):
-            return
-        
         try:
             # 发送Alt+Tab组合键，切换到上一个窗口
-            pyautogui.hotkey('alt', 'tab')
-            print("已切换到上一个窗口")
+            self.injector.hotkey('alt', 'tab')
+            logger.info("已切换到上一个窗口")
             # 更新状态标签
-            self.root.after(0, lambda: self.update_status("已切换到上一个窗口"))
+            self.update_status("已切换到上一个窗口")
         except Exception as e:
             error_msg = f"切换窗口时出错: {e}"
-            print(error_msg)
-            self.root.after(0, lambda: self.update_status(error_msg))
+            logger.warning(error_msg)
+            self.update_status(error_msg)
     
     def update_status(self, status_msg):
-        """更新状态标签，显示最近操作"""
-        try:
-            original_text = self.status_label.cget("text")
-            lines = original_text.split('\n')
-            # 保留前几行说明文字，更新最后一行状态
-            if len(lines) > 1:
-                updated_text = '\n'.join(lines[:-1]) + f"\n最近操作: {status_msg}"
-            else:
-                updated_text = original_text + f"\n最近操作: {status_msg}"
-            self.status_label.config(text=updated_text)
-        except Exception as e:
-            print(f"更新状态标签时出错: {e}")
+        """发布最近操作到状态行（可在任意线程调用，连续的更新会被合并，按上限频率刷新）"""
+        if self.headless:
+            self.notifier.status('hotkey_controller', status_msg)
+        else:
+            self.status_line.set(status_msg)
     
-    def on_key_press(self, key):
-        """键盘按键处理"""
-        try:
-            if hasattr(key, 'char') and key.char:
-                char = key.char.lower()
-                if char == 'a':
-                    self.pause_video()
-                elif char == 'b':
-                    self.switch_window()
-                elif char == 'q':
-                    self.quit_program()
-        except Exception as e:
-            print(f"键盘处理出错: {e}")
+    def register_hotkeys(self):
+        """注册快捷键，按键已被其他组件占用时跳过并提示"""
+        bindings = [
+            ('a', self.submit_action('pause_video', self.pause_video), False),
+            ('b', self.submit_action('switch_window', self.switch_window), False),
+            # 共享绑定：进程内宿主模式下按一次Q即退出所有组件
+            ('q', self.quit_program, True),
+        ]
+        for key, handler, shared in bindings:
+            try:
+                self.keyboard_bus.register(key, handler, owner=self, shared=shared)
+            except KeyBindingConflict as e:
+                logger.warning("快捷键冲突: %s", e)
+                self.update_status(str(e))
+    
+    def stop(self):
+        """停止键盘监听并释放资源，不关闭窗口也不退出进程"""
+        if self.stopped:
+            return
+        self.stopped = True
+        
+        # 注销本组件的全部快捷键，最后一个组件注销时键盘钩子随之停止
+        self.keyboard_bus.unregister_owner(self)
+        
+        # 停止动作执行器
+        self.executor.stop()
+        if not self.headless:
+            self.status_line.destroy()
     
     def quit_program(self):
         """安全退出程序，确保所有资源正确释放"""
-        print("正在退出程序...")
+        logger.info("正在退出程序...")
+        self.stop()
         
-        # 停止键盘监听器
-        if hasattr(self, 'listener') and self.listener:
+        # 进程内宿主模式：只销毁本组件的窗口，不停止共享的主循环，也不退出进程
+        # Q键处理函数在键盘钩子线程中运行，窗口操作交给Tk线程执行
+        if self.hosted:
             try:
-                self.listener.stop()
-                print("键盘监听器已停止")
+                self.root.after(0, self.close_hosted_window)
             except Exception as e:
-                print(f"停止键盘监听器时出错: {e}")
+                logger.warning("关闭组件窗口时出错: %s", e)
+            return
         
         # 安全关闭Tkinter窗口
         try:
             # 先quit，再destroy，确保事件循环停止
             if hasattr(self, 'root') and self.root:
                 self.root.quit()
-                print("Tkinter主循环已停止")
+                logger.debug("Tkinter主循环已停止")
                 # 短暂延迟，确保quit生效
                 time.sleep(0.1)
                 self.root.destroy()
-                print("Tkinter窗口已销毁")
+                logger.debug("Tkinter窗口已销毁")
         except Exception as e:
-            print(f"关闭Tkinter窗口时出错: {e}")
+            logger.warning("关闭Tkinter窗口时出错: %s", e)
         
         # 最后退出Python进程
-        print("程序退出完成")
+        logger.info("程序退出完成")
         sys.exit(0)
     
+    def close_hosted_window(self):
+        """进程内宿主模式：在Tk线程中销毁本组件的窗口并通知宿主"""
+        try:
+            self.root.destroy()
+        except Exception as e:
+            logger.warning("关闭组件窗口时出错: %s", e)
+        if self.on_quit:
+            self.on_quit()
+        logger.info("组件已停止")
+    
     def run(self):
         """运行程序主循环"""
         self.root.mainloop()
 
 if __name__ == "__main__":
+    setup_logging('hotkey_controller')
+    setup_metrics('hotkey_controller')
     try:
-        app = HotkeyControllerApp()
+        app = HotkeyControllerApp(headless=HEADLESS_FLAG in sys.argv)
+        startup_profiler.watch_window(app.root)
+        # 由主程序启动时定期输出心跳
+        start_heartbeat(app.root)
         app.run()
     except Exception as e:
-        print(f"程序启动失败: {e}")
-        input("按回车键退出...")
\ No newline at end of file
+        logger.error("程序启动失败: %s", e)
+        # 单独运行时保留控制台窗口；由主程序监管时以非零退出码退出，按崩溃处理
+        if not is_supervised():
+            input("按回车键退出...")
+        sys.exit(1)
\ No newline at end of file
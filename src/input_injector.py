@@ -0,0 +1,255 @@
+import logging
+import os
+import sys
+import threading
+import time
+
+from metrics import get_metrics
+
+logger = logging.getLogger('input_injector')
+
+INJECT_SECONDS = get_metrics().histogram('focus_inject_seconds', '注入一次按键或组合键的耗时', ('backend',))
+
+
+class InjectionError(RuntimeError):
+    """按键注入失败（例如被UIPI拦截或按键名称未知）"""
+    pass
+
+
+class InputInjector:
+    """按键注入接口：press()发送单个按键，hotkey()把组合键作为一次批量调用发送
+
+    组合键按顺序按下、逆序释放，与pyautogui.hotkey的行为一致，但没有每次调用后的PAUSE延迟和
+    屏幕角落的fail-safe检查。
+    """
+    name = 'base'
+
+    def press(self, key):
+        self.hotkey(key)
+
+    def hotkey(self, *keys):
+        if not keys:
+            return
+        keys = tuple(key.lower() for key in keys)
+        start = time.perf_counter()
+        self._send(keys)
+        INJECT_SECONDS.labels(self.name).observe(time.perf_counter() - start)
+
+    def _send(self, keys):
+        """按下keys中的所有按键再逆序释放，由子类实现"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SendInputInjector(InputInjector):
+    """Windows：一次SendInput调用发送整个组合键的按下和释放事件，事件数组按组合键缓存"""
+    name = 'sendinput'
+
+    INPUT_KEYBOARD = 1
+    KEYEVENTF_EXTENDEDKEY = 0x0001
+    KEYEVENTF_KEYUP = 0x0002
+
+    VIRTUAL_KEYS = {
+        'ctrl': 0x11, 'ctrlleft': 0xA2, 'ctrlright': 0xA3,
+        'alt': 0x12, 'altleft': 0xA4, 'altright': 0xA5,
+        'shift': 0x10, 'shiftleft': 0xA0, 'shiftright': 0xA1,
+        'win': 0x5B, 'winleft': 0x5B, 'winright': 0x5C,
+        'tab': 0x09, 'space': 0x20, 'enter': 0x0D, 'return': 0x0D, 'esc': 0x1B, 'escape': 0x1B,
+        'backspace': 0x08, 'delete': 0x2E, 'insert': 0x2D, 'home': 0x24, 'end': 0x23,
+        'pageup': 0x21, 'pagedown': 0x22, 'left': 0x25, 'up': 0x26, 'right': 0x27, 'down': 0x28,
+        'playpause': 0xB3, 'stop': 0xB2, 'nexttrack': 0xB0, 'prevtrack': 0xB1,
+        'volumemute': 0xAD, 'volumedown': 0xAE, 'volumeup': 0xAF,
+    }
+    VIRTUAL_KEYS.update({f'f{index}': 0x6F + index for index in range(1, 25)})
+    # 需要KEYEVENTF_EXTENDEDKEY标志的按键
+    EXTENDED_KEYS = frozenset([0xA3, 0xA5, 0x5B, 0x5C, 0x2E, 0x2D, 0x24, 0x23, 0x21, 0x22,
+                               0x25, 0x26, 0x27, 0x28, 0xB0, 0xB1, 0xB2, 0xB3, 0xAD, 0xAE, 0xAF])
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+        self._ctypes = ctypes
+        ULONG_PTR = ctypes.c_size_t
+
+        class KEYBDINPUT(ctypes.Structure):
+            _fields_ = [('wVk', wintypes.WORD), ('wScan', wintypes.WORD), ('dwFlags', wintypes.DWORD),
+                        ('time', wintypes.DWORD), ('dwExtraInfo', ULONG_PTR)]
+
+        class MOUSEINPUT(ctypes.Structure):
+            # 只用于确定联合体的大小
+            _fields_ = [('dx', wintypes.LONG), ('dy', wintypes.LONG), ('mouseData', wintypes.DWORD),
+                        ('dwFlags', wintypes.DWORD), ('time', wintypes.DWORD), ('dwExtraInfo', ULONG_PTR)]
+
+        class _INPUTUNION(ctypes.Union):
+            _fields_ = [('ki', KEYBDINPUT), ('mi', MOUSEINPUT)]
+
+        class INPUT(ctypes.Structure):
+            _fields_ = [('type', wintypes.DWORD), ('union', _INPUTUNION)]
+
+        self._INPUT = INPUT
+        self._user32 = ctypes.windll.user32
+        self._user32.SendInput.argtypes = (wintypes.UINT, ctypes.POINTER(INPUT), ctypes.c_int)
+        self._user32.SendInput.restype = wintypes.UINT
+        self._vk_scan = self._user32.VkKeyScanW
+        self._vk_scan.restype = ctypes.c_short
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _virtual_key(self, key):
+        vk = self.VIRTUAL_KEYS.get(key)
+        if vk is not None:
+            return vk
+        if len(key) == 1:
+            # 字母和数字的虚拟键码就是大写字符的编码，其他字符按当前键盘布局查找
+            if key.isalnum() and key.isascii():
+                return ord(key.upper())
+            result = self._vk_scan(ord(key))
+            if result != -1:
+                return result & 0xFF
+        raise InjectionError(f"未知的按键: {key}")
+
+    def _build(self, keys):
+        codes = [self._virtual_key(key) for key in keys]
+        events = [(vk, 0) for vk in codes] + [(vk, self.KEYEVENTF_KEYUP) for vk in reversed(codes)]
+        array = (self._INPUT * len(events))()
+        for item, (vk, flags) in zip(array, events):
+            item.type = self.INPUT_KEYBOARD
+            item.union.ki.wVk = vk
+            item.union.ki.dwFlags = flags | (self.KEYEVENTF_EXTENDEDKEY if vk in self.EXTENDED_KEYS else 0)
+        return array
+
+    def _send(self, keys):
+        array = self._cache.get(keys)
+        if array is None:
+            array = self._build(keys)
+            with self._lock:
+                self._cache[keys] = array
+        sent = self._user32.SendInput(len(array), array, self._ctypes.sizeof(self._INPUT))
+        if sent != len(array):
+            # 目标窗口权限更高（UIPI）或输入被其他程序阻止
+            raise InjectionError(f"SendInput只发送了 {sent}/{len(array)} 个事件")
+
+
+class XTestInjector(InputInjector):
+    """X11：通过XTest扩展注入按键事件，整个组合键只在最后同步一次（需要python-xlib）"""
+    name = 'xtest'
+
+    KEYSYMS = {
+        'ctrl': 'Control_L', 'ctrlleft': 'Control_L', 'ctrlright': 'Control_R',
+        'alt': 'Alt_L', 'altleft': 'Alt_L', 'altright': 'Alt_R',
+        'shift': 'Shift_L', 'shiftleft': 'Shift_L', 'shiftright': 'Shift_R',
+        'win': 'Super_L', 'winleft': 'Super_L', 'winright': 'Super_R',
+        'tab': 'Tab', 'space': 'space', 'enter': 'Return', 'return': 'Return', 'esc': 'Escape',
+        'escape': 'Escape', 'backspace': 'BackSpace', 'delete': 'Delete', 'insert': 'Insert',
+        'home': 'Home', 'end': 'End', 'pageup': 'Prior', 'pagedown': 'Next',
+        'left': 'Left', 'up': 'Up', 'right': 'Right', 'down': 'Down',
+        'playpause': 'XF86AudioPlay', 'stop': 'XF86AudioStop', 'nexttrack': 'XF86AudioNext',
+        'prevtrack': 'XF86AudioPrev', 'volumemute': 'XF86AudioMute',
+        'volumedown': 'XF86AudioLowerVolume', 'volumeup': 'XF86AudioRaiseVolume',
+    }
+
+    def __init__(self, display_name=None):
+        from Xlib import X, XK, display
+        from Xlib.ext import xtest
+        self._X = X
+        self._XK = XK
+        self._xtest = xtest
+        self._display = display.Display(display_name)
+        if not self._display.has_extension('XTEST'):
+            self._display.close()
+            raise InjectionError("X服务器不支持XTEST扩展")
+        self._keycodes = {}
+        self._lock = threading.Lock()
+
+    def _keycode(self, key):
+        keycode = self._keycodes.get(key)
+        if keycode is None:
+            name = self.KEYSYMS.get(key, key)
+            keysym = self._XK.string_to_keysym(name)
+            if not keysym and len(key) == 1:
+                keysym = ord(key)
+            keycode = self._display.keysym_to_keycode(keysym) if keysym else 0
+            if not keycode:
+                raise InjectionError(f"未知的按键: {key}")
+            self._keycodes[key] = keycode
+        return keycode
+
+    def _send(self, keys):
+        codes = [self._keycode(key) for key in keys]
+        with self._lock:
+            for keycode in codes:
+                self._xtest.fake_input(self._display, self._X.KeyPress, keycode)
+            for keycode in reversed(codes):
+                self._xtest.fake_input(self._display, self._X.KeyRelease, keycode)
+            self._display.sync()
+
+    def close(self):
+        self._display.close()
+
+
+class PyAutoGuiInjector(InputInjector):
+    """没有原生后端时的后备实现：调用pyautogui，但跳过每次调用后的PAUSE延迟"""
+    name = 'pyautogui'
+
+    def __init__(self):
+        from lazy_import import LazyModule
+        self._pyautogui = LazyModule('pyautogui')
+
+    def _send(self, keys):
+        if len(keys) == 1:
+            self._pyautogui.press(keys[0], _pause=False)
+        else:
+            self._pyautogui.hotkey(*keys, _pause=False)
+
+
+class RecordingInjector(InputInjector):
+    """只记录按键不注入的模拟实现，用于测试和基准测试"""
+    name = 'recording'
+
+    def __init__(self, on_send=None):
+        # 已发送的组合键：[(按键元组, 时间戳)]
+        self.sent = []
+        # 每次发送时调用on_send(keys)，例如驱动模拟桌面
+        self.on_send = on_send
+
+    def _send(self, keys):
+        self.sent.append((keys, time.perf_counter()))
+        if self.on_send is not None:
+            self.on_send(keys)
+
+    @property
+    def keys(self):
+        return [keys for keys, _ in self.sent]
+
+
+def default_injector():
+    """按平台选择注入后端：Windows用SendInput，X11用XTest，都不可用时退回pyautogui"""
+    from lazy_import import module_available
+    candidates = []
+    if sys.platform.startswith('win'):
+        candidates.append(SendInputInjector)
+    elif os.environ.get('DISPLAY') and module_available('Xlib'):
+        candidates.append(XTestInjector)
+    for factory in candidates:
+        try:
+            return factory()
+        except Exception as e:
+            logger.warning("%s按键注入不可用，改用pyautogui: %s", factory.name, e)
+    return PyAutoGuiInjector()
+
+
+_default_injector = None
+_injector_lock = threading.Lock()
+
+
+def get_default_injector():
+    """返回进程内共享的按键注入后端"""
+    global _default_injector
+    if _default_injector is None:
+        with _injector_lock:
+            if _default_injector is None:
+                _default_injector = default_injector()
+                logger.info("按键注入后端: %s", _default_injector.name)
+    return _default_injector
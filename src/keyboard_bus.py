@@ -0,0 +1,148 @@
+import logging
+import threading
+import time
+
+from metrics import get_metrics
+
+logger = logging.getLogger('keyboard_bus')
+
+DISPATCH_SECONDS = get_metrics().histogram('focus_key_dispatch_seconds', '键盘钩子回调中分发一次按键的耗时')
+
+
+class KeyBindingConflict(ValueError):
+    """按键已被其他组件以独占方式绑定"""
+    pass
+
+
+class _Binding:
+    __slots__ = ('owner', 'handler', 'shared')
+
+    def __init__(self, owner, handler, shared):
+        self.owner = owner
+        self.handler = handler
+        self.shared = shared
+
+
+def _owner_name(owner):
+    return owner if isinstance(owner, str) else type(owner).__name__
+
+
+class KeyboardBus:
+    """全局键盘事件总线：整个进程只安装一个键盘钩子，按查找表分发到已注册的处理函数
+
+    - 独占绑定（默认）：同一按键只能有一个处理函数，重复绑定时抛出KeyBindingConflict
+    - 共享绑定（shared=True）：所有共享绑定的处理函数都会被调用，例如各组件的Q键退出
+    - 未绑定的按键只做一次字典查找即返回
+    监听器在第一次注册时启动，最后一个绑定注销时停止。
+    """
+
+    def __init__(self, listener_factory=None):
+        # 创建底层监听器的函数，参数为按键回调；默认使用pynput
+        self._listener_factory = listener_factory
+        self._listener = None
+        self._bindings = {}
+        # 分发表：按键 -> 处理函数元组，注册时整体替换，分发时无需加锁
+        self._table = {}
+        self._lock = threading.Lock()
+
+    def register(self, key, handler, owner, shared=False):
+        """为按键注册处理函数，与已有绑定冲突时抛出KeyBindingConflict"""
+        key = key.lower()
+        with self._lock:
+            bindings = self._bindings.get(key, [])
+            for binding in bindings:
+                if binding.owner is owner:
+                    continue
+                if not (binding.shared and shared):
+                    raise KeyBindingConflict(
+                        f"按键 '{key.upper()}' 已被 {_owner_name(binding.owner)} 绑定，"
+                        f"{_owner_name(owner)} 无法重复绑定")
+            bindings = [binding for binding in bindings if binding.owner is not owner]
+            bindings.append(_Binding(owner, handler, shared))
+            self._bindings[key] = bindings
+            self._rebuild_table()
+        self.start()
+
+    def unregister_owner(self, owner):
+        """注销某个组件的全部绑定"""
+        with self._lock:
+            for key in list(self._bindings):
+                bindings = [binding for binding in self._bindings[key] if binding.owner is not owner]
+                if bindings:
+                    self._bindings[key] = bindings
+                else:
+                    del self._bindings[key]
+            self._rebuild_table()
+            empty = not self._bindings
+        if empty:
+            self.stop()
+
+    def _rebuild_table(self):
+        self._table = {key: tuple(binding.handler for binding in bindings)
+                       for key, bindings in self._bindings.items()}
+
+    def bindings(self):
+        """返回当前绑定：按键 -> 组件名称列表"""
+        with self._lock:
+            return {key: [_owner_name(binding.owner) for binding in bindings]
+                    for key, bindings in self._bindings.items()}
+
+    def dispatch(self, char):
+        """分发一个字符按键，返回是否有处理函数"""
+        handlers = self._table.get(char)
+        if handlers is None:
+            return False
+        start = time.perf_counter()
+        for handler in handlers:
+            try:
+                handler()
+            except Exception as e:
+                logger.warning("键盘处理出错: %s", e)
+        DISPATCH_SECONDS.observe(time.perf_counter() - start)
+        return True
+
+    def _on_press(self, key):
+        char = getattr(key, 'char', None)
+        if not char:
+            return
+        self.dispatch(char.lower())
+
+    def start(self):
+        """启动唯一的底层键盘监听器（已启动时忽略）"""
+        with self._lock:
+            if self._listener is not None:
+                return
+            if self._listener_factory is not None:
+                self._listener = self._listener_factory(self._on_press)
+            else:
+                from pynput import keyboard
+                self._listener = keyboard.Listener(on_press=self._on_press)
+                self._listener.daemon = True
+            self._listener.start()
+            logger.info("全局键盘监听器已启动")
+
+    def stop(self):
+        """停止底层键盘监听器"""
+        with self._lock:
+            listener = self._listener
+            self._listener = None
+        if listener is not None:
+            try:
+                listener.stop()
+                logger.debug("键盘监听器已停止")
+            except Exception as e:
+                logger.warning("停止键盘监听器时出错: %s", e)
+
+
+_default_bus = None
+_default_bus_lock = threading.Lock()
+
+
+def get_default_bus():
+    """返回进程内共享的键盘总线，同一进程中的所有组件共用一个键盘钩子"""
+    global _default_bus
+    if _default_bus is None:
+        with _default_bus_lock:
+            if _default_bus is None:
+                _default_bus = KeyboardBus()
+    return _default_bus
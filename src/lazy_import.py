@@ -0,0 +1,58 @@
+import importlib
+import importlib.util
+import sys
+import threading
+import time
+
+
+class LazyModule:
+    """延迟导入的模块代理：第一次访问属性时才真正导入模块
+
+    用法: pyautogui = LazyModule('pyautogui')，之后像普通模块一样使用。
+    """
+
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+        self.__dict__['_lock'] = threading.Lock()
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            with self.__dict__['_lock']:
+                module = self.__dict__['_module']
+                if module is None:
+                    name = self.__dict__['_name']
+                    start = time.perf_counter()
+                    module = importlib.import_module(name)
+                    elapsed = time.perf_counter() - start
+                    # 启用启动分析时记录延迟导入的耗时
+                    profiler = sys.modules.get('startup_profiler')
+                    if profiler is not None:
+                        profiler.record_lazy_import(name, elapsed)
+                    self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    @property
+    def loaded(self):
+        return self.__dict__['_module'] is not None
+
+    def __repr__(self):
+        state = "已导入" if self.loaded else "未导入"
+        return f"<LazyModule {self.__dict__['_name']} ({state})>"
+
+
+def module_available(name):
+    """检查模块是否已安装，只查找模块规格而不执行导入"""
+    if name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
@@ -0,0 +1,344 @@
+import logging
+import os
+import sys
+import threading
+import time
+
+from metrics import get_metrics
+
+logger = logging.getLogger('media_control')
+
+_metrics = get_metrics()
+TOGGLE_SECONDS = _metrics.histogram('focus_media_toggle_seconds', '向媒体会话发送播放/暂停的耗时', ('backend',))
+DISCOVERY_SECONDS = _metrics.histogram('focus_media_discovery_seconds', '枚举媒体会话的耗时', ('backend',))
+TOGGLE_RESULTS = _metrics.counter('focus_media_toggle_total', '播放/暂停请求的结果', ('result',))
+
+# toggle()的结果
+TOGGLED = 'toggled'          # 已向会话发送播放/暂停
+NO_SESSION = 'no_session'    # 没有可控制的媒体会话
+UNAVAILABLE = 'unavailable'  # 当前平台没有可用的媒体控制接口
+
+
+class MediaSession:
+    """一个媒体播放会话"""
+    __slots__ = ('key', 'app', 'playing', 'handle')
+
+    def __init__(self, key, app, playing, handle=None):
+        # key: 会话的稳定标识（SMTC的来源应用ID、MPRIS的总线名）
+        self.key = key
+        self.app = app
+        self.playing = playing
+        # 后端用于发送命令的对象
+        self.handle = handle
+
+    def __repr__(self):
+        state = "播放中" if self.playing else "已暂停"
+        return f"<MediaSession {self.app} ({state})>"
+
+
+class MediaControlBackend:
+    """媒体控制后端接口：sessions()枚举会话（较慢），play_pause()向单个会话发送命令
+
+    supports_events为True时，会话增减或播放状态变化时后端调用start()传入的回调，
+    控制器收到通知后才重新枚举；否则按缓存有效期定期重新枚举。
+    """
+    name = 'base'
+    supports_events = False
+
+    def start(self, on_change):
+        """开始接收会话变化通知，返回是否启用事件模式"""
+        return self.supports_events
+
+    def sessions(self):
+        raise NotImplementedError
+
+    def play_pause(self, session):
+        raise NotImplementedError
+
+    def stop(self):
+        pass
+
+
+class SmtcBackend(MediaControlBackend):
+    """Windows：系统媒体传输控件（GlobalSystemMediaTransportControlsSessionManager，需要winsdk）
+
+    WinRT异步接口在专用线程的事件循环中执行；会话增减和播放状态变化通过事件通知。
+    """
+    name = 'smtc'
+    supports_events = True
+
+    PLAYING = 4  # GlobalSystemMediaTransportControlsSessionPlaybackStatus.PLAYING
+
+    def __init__(self, timeout=2.0):
+        import asyncio
+        from winsdk.windows.media.control import GlobalSystemMediaTransportControlsSessionManager
+        self._asyncio = asyncio
+        self._manager_class = GlobalSystemMediaTransportControlsSessionManager
+        self.timeout = timeout
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="media-smtc", daemon=True)
+        self._thread.start()
+        self._manager = self._call(self._manager_class.request_async())
+        self._on_change = None
+        self._tokens = []
+        self._session_tokens = []
+
+    def _call(self, awaitable):
+        async def wait():
+            return await awaitable
+        return self._asyncio.run_coroutine_threadsafe(wait(), self._loop).result(self.timeout)
+
+    def _changed(self, *args):
+        if self._on_change is not None:
+            self._on_change()
+
+    def start(self, on_change):
+        self._on_change = on_change
+        self._tokens.append(self._manager.add_sessions_changed(self._changed))
+        return True
+
+    def sessions(self):
+        # 重新登记每个会话的播放状态变化事件
+        for session, token in self._session_tokens:
+            try:
+                session.remove_playback_info_changed(token)
+            except Exception:
+                pass
+        self._session_tokens = []
+        found = []
+        for session in self._manager.get_sessions():
+            try:
+                info = session.get_playback_info()
+                playing = info is not None and int(info.playback_status) == self.PLAYING
+                self._session_tokens.append((session, session.add_playback_info_changed(self._changed)))
+            except Exception as e:
+                logger.debug("读取媒体会话状态失败: %s", e)
+                continue
+            app = session.source_app_user_model_id
+            found.append(MediaSession(app, app, playing, session))
+        return found
+
+    def play_pause(self, session):
+        if not self._call(session.handle.try_toggle_play_pause_async()):
+            raise RuntimeError(f"{session.app} 拒绝了播放/暂停命令")
+
+    def stop(self):
+        for token in self._tokens:
+            try:
+                self._manager.remove_sessions_changed(token)
+            except Exception:
+                pass
+        self._tokens = []
+        self._on_change = None
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+class MprisBackend(MediaControlBackend):
+    """Linux：通过会话D-Bus上的MPRIS接口控制播放器（需要jeepney）"""
+    name = 'mpris'
+
+    PREFIX = 'org.mpris.MediaPlayer2.'
+    PATH = '/org/mpris/MediaPlayer2'
+    PLAYER = 'org.mpris.MediaPlayer2.Player'
+
+    def __init__(self, timeout=1.0):
+        from jeepney import DBusAddress, Properties, new_method_call, unwrap_msg
+        from jeepney.io.blocking import open_dbus_connection
+        self._DBusAddress = DBusAddress
+        self._Properties = Properties
+        self._new_method_call = new_method_call
+        self._unwrap_msg = unwrap_msg
+        self.timeout = timeout
+        self._connection = open_dbus_connection(bus='SESSION')
+        self._bus = DBusAddress('/org/freedesktop/DBus', bus_name='org.freedesktop.DBus',
+                                interface='org.freedesktop.DBus')
+        self._lock = threading.Lock()
+
+    def _send(self, message):
+        """发送方法调用并返回回复的body；send_and_get_reply不检查错误回复，由unwrap_msg抛出DBusErrorResponse"""
+        with self._lock:
+            reply = self._connection.send_and_get_reply(message, timeout=self.timeout)
+        return self._unwrap_msg(reply)
+
+    def sessions(self):
+        names = self._send(self._new_method_call(self._bus, 'ListNames'))[0]
+        found = []
+        for name in names:
+            if not name.startswith(self.PREFIX):
+                continue
+            player = self._DBusAddress(self.PATH, bus_name=name, interface=self.PLAYER)
+            try:
+                status = self._send(self._Properties(player).get('PlaybackStatus'))[0][1]
+            except Exception as e:
+                logger.debug("读取 %s 播放状态失败: %s", name, e)
+                continue
+            found.append(MediaSession(name, name[len(self.PREFIX):], status == 'Playing', player))
+        return found
+
+    def play_pause(self, session):
+        self._send(self._new_method_call(session.handle, 'PlayPause'))
+
+    def stop(self):
+        with self._lock:
+            self._connection.close()
+
+
+class FakeMediaBackend(MediaControlBackend):
+    """内存中的模拟媒体会话，用于测试和基准测试"""
+    name = 'fake'
+    supports_events = True
+
+    def __init__(self, discovery_delay=0.0):
+        # key -> [应用名, 是否播放]
+        self.players = {}
+        # 模拟枚举会话的系统调用耗时（秒）
+        self.discovery_delay = discovery_delay
+        self.discoveries = 0
+        self.commands = []
+        self._on_change = None
+
+    def start(self, on_change):
+        self._on_change = on_change
+        return self.supports_events
+
+    def add_player(self, key, app=None, playing=False):
+        self.players[key] = [app or key, playing]
+        if self._on_change is not None:
+            self._on_change()
+
+    def remove_player(self, key):
+        self.players.pop(key, None)
+        if self._on_change is not None:
+            self._on_change()
+
+    def sessions(self):
+        self.discoveries += 1
+        if self.discovery_delay:
+            time.sleep(self.discovery_delay)
+        return [MediaSession(key, app, playing, key) for key, (app, playing) in self.players.items()]
+
+    def play_pause(self, session):
+        player = self.players.get(session.handle)
+        if player is None:
+            raise RuntimeError(f"会话已结束: {session.key}")
+        player[1] = not player[1]
+        self.commands.append(session.key)
+
+
+class MediaController:
+    """播放/暂停正在播放的媒体会话，不依赖焦点窗口
+
+    - 会话列表按缓存保存：支持事件的后端在收到变化通知后才重新枚举，否则缓存ttl秒
+    - 目标会话：正在播放的会话；没有时选择上一次控制的会话（再次按键即恢复播放），
+      只有一个会话时选择它
+    - 每次按键只向目标会话发送一个命令；会话已失效时重新枚举并重试一次
+    """
+
+    def __init__(self, backend, ttl=3.0, event_ttl=60.0):
+        self.backend = backend
+        self.ttl = ttl
+        self._sessions = None
+        self._expires = 0.0
+        self._last_key = None
+        self._lock = threading.Lock()
+        if backend is not None:
+            try:
+                if backend.start(self.invalidate):
+                    self.ttl = event_ttl
+            except Exception as e:
+                logger.warning("%s媒体会话通知不可用: %s", backend.name, e)
+
+    @property
+    def available(self):
+        return self.backend is not None
+
+    def invalidate(self):
+        """会话列表已变化，下次使用时重新枚举"""
+        self._expires = 0.0
+
+    def sessions(self):
+        """返回缓存的会话列表，过期时重新枚举"""
+        now = time.monotonic()
+        if self._sessions is None or now >= self._expires:
+            start = time.perf_counter()
+            try:
+                self._sessions = self.backend.sessions()
+            except Exception as e:
+                logger.warning("枚举媒体会话失败: %s", e)
+                self._sessions = []
+            DISCOVERY_SECONDS.labels(self.backend.name).observe(time.perf_counter() - start)
+            self._expires = now + self.ttl
+        return self._sessions
+
+    def target(self):
+        """选择要控制的会话，没有时返回None"""
+        sessions = self.sessions()
+        for session in sessions:
+            if session.playing:
+                return session
+        for session in sessions:
+            if session.key == self._last_key:
+                return session
+        return sessions[0] if len(sessions) == 1 else None
+
+    def toggle(self):
+        """播放/暂停目标会话，返回 (结果, 会话)"""
+        if self.backend is None:
+            TOGGLE_RESULTS.labels(UNAVAILABLE).inc()
+            return UNAVAILABLE, None
+        with self._lock:
+            for attempt in range(2):
+                session = self.target()
+                if session is None:
+                    break
+                start = time.perf_counter()
+                try:
+                    self.backend.play_pause(session)
+                except Exception as e:
+                    # 会话可能已经结束，重新枚举后再试一次
+                    logger.debug("控制媒体会话 %s 失败: %s", session.app, e)
+                    self.invalidate()
+                    continue
+                TOGGLE_SECONDS.labels(self.backend.name).observe(time.perf_counter() - start)
+                session.playing = not session.playing
+                self._last_key = session.key
+                TOGGLE_RESULTS.labels(TOGGLED).inc()
+                return TOGGLED, session
+        TOGGLE_RESULTS.labels(NO_SESSION).inc()
+        return NO_SESSION, None
+
+    def stop(self):
+        if self.backend is not None:
+            self.backend.stop()
+
+
+def default_backend():
+    """按平台选择媒体控制后端，都不可用时返回None"""
+    from lazy_import import module_available
+    candidates = []
+    if sys.platform.startswith('win') and module_available('winsdk'):
+        candidates.append(SmtcBackend)
+    elif os.environ.get('DBUS_SESSION_BUS_ADDRESS') and module_available('jeepney'):
+        candidates.append(MprisBackend)
+    for factory in candidates:
+        try:
+            return factory()
+        except Exception as e:
+            logger.warning("%s媒体控制不可用: %s", factory.name, e)
+    return None
+
+
+_default_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_media_controller():
+    """返回进程内共享的媒体控制器"""
+    global _default_controller
+    if _default_controller is None:
+        with _controller_lock:
+            if _default_controller is None:
+                backend = default_backend()
+                logger.info("媒体控制后端: %s", backend.name if backend is not None else "不可用")
+                _default_controller = MediaController(backend)
+    return _default_controller
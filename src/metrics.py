@@ -0,0 +1,294 @@
+# 热点路径的延迟直方图和计数器
+# 指标保存在进程内的注册表中，可以通过本机HTTP端点以Prometheus文本格式读取，也可以在退出时写入文件：
+# - 环境变量FOCUS_ASSISTANT_METRICS_PORT：在127.0.0.1的该端口提供 /metrics（端口被占用时改用随机端口并写入日志）
+# - 环境变量FOCUS_ASSISTANT_METRICS_DIR：退出时把指标写入该目录下的 <组件名>.prom
+import atexit
+import bisect
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger('metrics')
+
+PORT_ENV = 'FOCUS_ASSISTANT_METRICS_PORT'
+DUMP_DIR_ENV = 'FOCUS_ASSISTANT_METRICS_DIR'
+
+# 默认直方图区间（秒），覆盖从亚毫秒级的按键分发到数秒的保存确认
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels)
+    if extra:
+        items.append(extra)
+    if not items:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in items) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Timer:
+    __slots__ = ('_histogram', '_start')
+
+    def __init__(self, histogram):
+        self._histogram = histogram
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._histogram.observe(time.perf_counter() - self._start)
+        return False
+
+
+class _CounterChild:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class _HistogramChild:
+    __slots__ = ('buckets', 'counts', 'sum', 'count', '_lock')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def time(self):
+        """with metric.time(): ... 记录代码块的耗时"""
+        return _Timer(self)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.label_names:
+            self._default = self._child(())
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _child(self, key):
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._children[key] = self._new_child()
+        return child
+
+    def labels(self, *values, **kwargs):
+        """按标签值取得子序列，例如 histogram.labels(stage='winmm')"""
+        if kwargs:
+            values = tuple(str(kwargs[name]) for name in self.label_names)
+        else:
+            values = tuple(str(value) for value in values)
+        if len(values) != len(self.label_names):
+            raise ValueError(f"{self.name} 需要标签: {', '.join(self.label_names)}")
+        return self._child(values)
+
+    def _series(self):
+        with self._lock:
+            items = list(self._children.items())
+        return [(tuple(zip(self.label_names, key)), child) for key, child in sorted(items)]
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+    def render(self):
+        lines = []
+        for labels, child in self._series():
+            lines.append(f'{self.name}{_format_labels(labels)} {_format_value(child.value)}')
+        return lines
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help_text, label_names)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._default.observe(value)
+
+    def time(self):
+        return self._default.time()
+
+    def render(self):
+        lines = []
+        for labels, child in self._series():
+            with child._lock:
+                counts = list(child.counts)
+                total, count = child.sum, child.count
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = ('le', _format_value(bound))
+                lines.append(f'{self.name}_bucket{_format_labels(labels, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(labels)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(labels)} {count}')
+        return lines
+
+
+class MetricsRegistry:
+    """进程内的指标注册表；同名指标重复注册时返回已有实例"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"指标 {name} 已注册为 {metric.kind}")
+            return metric
+
+    def counter(self, name, help_text, label_names=()):
+        return self._register(Counter, name, help_text, label_names)
+
+    def histogram(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, help_text, label_names, buckets=buckets)
+
+    def render(self):
+        """Prometheus文本格式"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path):
+        """把当前指标写入文件"""
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+
+class MetricsServer:
+    """在本机回环地址上以HTTP提供 /metrics"""
+
+    def __init__(self, registry, port=0, host='127.0.0.1'):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # 不把每次抓取写入日志
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.address = self._server.server_address
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+_default_registry = None
+_registry_lock = threading.Lock()
+_server = None
+
+
+def get_metrics():
+    """返回进程内共享的指标注册表"""
+    global _default_registry
+    if _default_registry is None:
+        with _registry_lock:
+            if _default_registry is None:
+                _default_registry = MetricsRegistry()
+    return _default_registry
+
+
+def setup_metrics(component):
+    """根据环境变量启动指标端点、注册退出时的指标转储；重复调用时忽略"""
+    global _server
+    registry = get_metrics()
+    port = os.environ.get(PORT_ENV)
+    if port and _server is None:
+        try:
+            try:
+                _server = MetricsServer(registry, int(port)).start()
+            except OSError:
+                # 多个组件进程使用同一配置时，后启动的改用随机端口
+                _server = MetricsServer(registry, 0).start()
+            host, bound_port = _server.address[:2]
+            logger.info("指标端点: http://%s:%s/metrics", host, bound_port)
+        except (OSError, ValueError) as e:
+            logger.warning("无法启动指标端点: %s", e)
+
+    dump_dir = os.environ.get(DUMP_DIR_ENV)
+    if dump_dir:
+        path = os.path.join(dump_dir, f'{component}.prom')
+
+        def dump():
+            try:
+                os.makedirs(dump_dir, exist_ok=True)
+                registry.dump(path)
+            except OSError as e:
+                logger.warning("写入指标文件失败: %s", e)
+
+        atexit.register(dump)
+    return registry
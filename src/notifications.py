@@ -0,0 +1,172 @@
+import json
+import logging
+import os
+import shutil
+import socket
+import subprocess
+import threading
+import time
+
+logger = logging.getLogger('notifications')
+
+# 通知级别
+LEVEL_INFO = 'info'
+LEVEL_WARNING = 'warning'
+
+# 通知输出的环境变量，例如 "desktop,log" 或 "log,udp://127.0.0.1:9765"
+NOTIFY_ENV = 'FOCUS_ASSISTANT_NOTIFY'
+DEFAULT_SPEC = 'desktop,log'
+
+
+class NotificationSink:
+    """通知输出接口
+
+    - notify(): 需要用户注意的提醒，例如检测到外放
+    - status(): 组件的最近操作，相当于窗口中的状态行，频繁调用，实现应当足够轻量
+    实现不应抛出异常，也不应阻塞调用线程。
+    """
+    name = 'base'
+
+    def notify(self, title, message, level=LEVEL_INFO):
+        pass
+
+    def status(self, component, message):
+        pass
+
+    def close(self):
+        pass
+
+
+class LogSink(NotificationSink):
+    """写入日志：提醒按级别记录，状态行以DEBUG记录（组件已经以INFO记录过同一条消息）"""
+    name = 'log'
+
+    def notify(self, title, message, level=LEVEL_INFO):
+        logger.log(logging.WARNING if level == LEVEL_WARNING else logging.INFO, "%s: %s", title, message)
+
+    def status(self, component, message):
+        logger.debug("[%s] %s", component, message)
+
+
+class DesktopSink(NotificationSink):
+    """桌面通知：优先使用plyer（Windows/macOS/Linux），其次notify-send；都不可用时不输出
+
+    通知在后台线程中发出，不阻塞调用者；状态行不显示为桌面通知。
+    """
+    name = 'desktop'
+
+    def __init__(self, app_name="智能专注助手", timeout=5):
+        from lazy_import import module_available
+        self.app_name = app_name
+        self.timeout = timeout
+        self._plyer = module_available('plyer')
+        self._notify_send = None if self._plyer else shutil.which('notify-send')
+        if not self._plyer and not self._notify_send:
+            logger.info("没有可用的桌面通知接口（plyer / notify-send），桌面通知已禁用")
+
+    @property
+    def available(self):
+        return bool(self._plyer or self._notify_send)
+
+    def notify(self, title, message, level=LEVEL_INFO):
+        if self.available:
+            threading.Thread(target=self._send, args=(title, message, level),
+                             name="desktop-notify", daemon=True).start()
+
+    def _send(self, title, message, level):
+        try:
+            if self._plyer:
+                from plyer import notification
+                notification.notify(title=title, message=message, app_name=self.app_name, timeout=self.timeout)
+            else:
+                urgency = 'critical' if level == LEVEL_WARNING else 'normal'
+                subprocess.run([self._notify_send, '-a', self.app_name, '-u', urgency, title, message],
+                               timeout=5, check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except Exception as e:
+            logger.warning("发送桌面通知失败: %s", e)
+
+
+class SocketSink(NotificationSink):
+    """以UDP数据报发送JSON行：{"type": "notify"|"status", ...}，接收方不在线时直接丢弃"""
+    name = 'socket'
+
+    def __init__(self, host='127.0.0.1', port=9765):
+        self.address = (host, port)
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+
+    def _send(self, payload):
+        payload['time'] = time.time()
+        payload['pid'] = os.getpid()
+        try:
+            self._socket.sendto(json.dumps(payload, ensure_ascii=False).encode('utf-8'), self.address)
+        except OSError as e:
+            logger.debug("发送通知数据报失败: %s", e)
+
+    def notify(self, title, message, level=LEVEL_INFO):
+        self._send({'type': 'notify', 'title': title, 'message': message, 'level': level})
+
+    def status(self, component, message):
+        self._send({'type': 'status', 'component': component, 'message': message})
+
+    def close(self):
+        self._socket.close()
+
+
+class MultiSink(NotificationSink):
+    """同时输出到多个目标"""
+    name = 'multi'
+
+    def __init__(self, sinks):
+        self.sinks = list(sinks)
+
+    def notify(self, title, message, level=LEVEL_INFO):
+        for sink in self.sinks:
+            sink.notify(title, message, level)
+
+    def status(self, component, message):
+        for sink in self.sinks:
+            sink.status(component, message)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+def sink_from_spec(spec):
+    """按描述创建通知输出，多个目标用逗号分隔：log、desktop、udp://主机:端口"""
+    sinks = []
+    for part in (item.strip() for item in spec.split(',')):
+        if not part:
+            continue
+        if part == 'log':
+            sinks.append(LogSink())
+        elif part == 'desktop':
+            sinks.append(DesktopSink())
+        elif part.startswith('udp://'):
+            host, _, port = part[len('udp://'):].rpartition(':')
+            sinks.append(SocketSink(host or '127.0.0.1', int(port)))
+        else:
+            raise ValueError(f"未知的通知输出: {part}")
+    if len(sinks) == 1:
+        return sinks[0]
+    return MultiSink(sinks)
+
+
+_default_sink = None
+_sink_lock = threading.Lock()
+
+
+def get_notifier():
+    """返回进程内共享的通知输出，由环境变量FOCUS_ASSISTANT_NOTIFY配置（默认 desktop,log）"""
+    global _default_sink
+    if _default_sink is None:
+        with _sink_lock:
+            if _default_sink is None:
+                spec = os.environ.get(NOTIFY_ENV) or DEFAULT_SPEC
+                try:
+                    _default_sink = sink_from_spec(spec)
+                except ValueError as e:
+                    logger.warning("%s，改为输出到日志", e)
+                    _default_sink = LogSink()
+    return _default_sink
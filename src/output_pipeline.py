@@ -0,0 +1,131 @@
+import threading
+import time
+from collections import deque
+
+
+class LogLine:
+    """子进程输出的一行日志"""
+    __slots__ = ('timestamp', 'component', 'stream', 'text')
+
+    def __init__(self, component, stream, text, timestamp=None):
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.component = component
+        self.stream = stream
+        self.text = text
+
+    def format(self):
+        clock = time.strftime('%H:%M:%S', time.localtime(self.timestamp))
+        marker = '!' if self.stream == 'stderr' else ' '
+        return f"{clock}{marker}[{self.component}] {self.text}"
+
+
+class OutputPipeline:
+    """持续读取子进程的stdout和stderr，防止管道缓冲区写满导致子进程阻塞在print上
+
+    每个输出流由一个后台线程逐行读取，加上组件名和时间戳后放入有界环形缓冲区；
+    界面通过drain()按批次取走新行，积压超过容量时丢弃最旧的行。
+    """
+
+    def __init__(self, capacity=2000):
+        # 最近的日志（用于回看），以及尚未被界面取走的新日志
+        self.lines = deque(maxlen=capacity)
+        self._new = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._readers = []
+        # 行过滤器：filter(component, stream, text)返回True时该行被消费，不进入缓冲区
+        self._filters = []
+        # 因积压被丢弃、未能显示的行数
+        self.dropped = 0
+
+    def add_filter(self, line_filter):
+        """添加行过滤器（例如识别心跳行），在读取线程中调用"""
+        self._filters.append(line_filter)
+
+    def attach(self, component, process):
+        """为子进程的输出流启动读取线程"""
+        for stream_name in ('stdout', 'stderr'):
+            stream = getattr(process, stream_name)
+            if stream is None:
+                continue
+            reader = threading.Thread(target=self._read_stream, args=(component, stream_name, stream),
+                                      name=f"{component}-{stream_name}", daemon=True)
+            reader.start()
+            self._readers.append(reader)
+
+    def _read_stream(self, component, stream_name, stream):
+        try:
+            for raw_line in iter(stream.readline, ''):
+                text = raw_line.rstrip('\r\n')
+                if any(line_filter(component, stream_name, text) for line_filter in self._filters):
+                    continue
+                self.append(LogLine(component, stream_name, text))
+        except (OSError, ValueError):
+            # 子进程退出或管道被关闭
+            pass
+        finally:
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+    def append(self, line):
+        with self._lock:
+            self.lines.append(line)
+            if len(self._new) == self._new.maxlen:
+                self.dropped += 1
+            self._new.append(line)
+
+    def drain(self, max_lines=200):
+        """取走最多max_lines条尚未显示的新日志"""
+        with self._lock:
+            count = min(max_lines, len(self._new))
+            return [self._new.popleft() for _ in range(count)]
+
+    def recent(self, component=None):
+        """返回缓冲区中的日志，可按组件过滤"""
+        with self._lock:
+            lines = list(self.lines)
+        if component is None:
+            return lines
+        return [line for line in lines if line.component == component]
+
+
+class LogPane:
+    """Tk日志面板：定时批量刷新，输出洪峰时也不会阻塞界面"""
+
+    def __init__(self, master, pipeline, interval_ms=200, batch_size=200, max_lines=1000):
+        import tkinter as tk
+        from tkinter import scrolledtext
+        self.pipeline = pipeline
+        self.interval_ms = interval_ms
+        self.batch_size = batch_size
+        self.max_lines = max_lines
+        self.text = scrolledtext.ScrolledText(master, height=10, state=tk.DISABLED, wrap=tk.NONE)
+        self._tk = tk
+        self._job = None
+
+    def pack(self, **kwargs):
+        self.text.pack(**kwargs)
+
+    def start(self):
+        if self._job is None:
+            self._job = self.text.after(self.interval_ms, self._flush)
+
+    def stop(self):
+        if self._job is not None:
+            self.text.after_cancel(self._job)
+            self._job = None
+
+    def _flush(self):
+        tk = self._tk
+        lines = self.pipeline.drain(self.batch_size)
+        if lines:
+            # 每批只做一次插入，避免逐行更新控件
+            self.text.config(state=tk.NORMAL)
+            self.text.insert(tk.END, '\n'.join(line.format() for line in lines) + '\n')
+            line_count = int(self.text.index('end-1c').split('.')[0])
+            if line_count > self.max_lines:
+                self.text.delete('1.0', f'{line_count - self.max_lines}.0')
+            self.text.config(state=tk.DISABLED)
+            self.text.see(tk.END)
+        self._job = self.text.after(self.interval_ms, self._flush)
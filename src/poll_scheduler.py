@@ -0,0 +1,53 @@
+import random
+import threading
+import time
+
+
+class PollScheduler:
+    """自适应轮询调度器
+
+    - 没有音频活动时逐步拉长轮询间隔（直到max_interval），检测到活动时立即回到min_interval
+    - 每次间隔加入随机抖动，避免多个组件同时唤醒
+    - 所有等待都基于Event，stop()后立即返回，不再需要分段sleep检查退出标志
+    """
+
+    def __init__(self, min_interval=0.5, base_interval=1.0, max_interval=8.0,
+                 backoff=1.5, jitter=0.1, rng=None):
+        self.min_interval = min_interval
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.jitter = jitter
+        self.interval = base_interval
+        self._random = rng or random.Random()
+        self._stop_event = threading.Event()
+
+    @property
+    def stopped(self):
+        return self._stop_event.is_set()
+
+    def record_activity(self, active):
+        """根据本次检测结果调整下一次轮询间隔"""
+        if active:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, max(self.base_interval, self.interval * self.backoff))
+        return self.interval
+
+    def next_delay(self):
+        """带抖动的下一次轮询延迟"""
+        return self.interval * (1 + self._random.uniform(-self.jitter, self.jitter))
+
+    def sleep(self, timeout):
+        """等待timeout秒，调度器停止时立即返回；返回是否已停止"""
+        if timeout > 0:
+            return self._stop_event.wait(timeout)
+        return self.stopped
+
+    def sleep_until(self, deadline):
+        """等待到指定时间（time.time()时间戳），调度器停止时立即返回；返回是否已停止"""
+        return self.sleep(deadline - time.time())
+
+    def stop(self):
+        """停止调度器，唤醒所有等待"""
+        self._stop_event.set()
@@ -0,0 +1,278 @@
+import logging
+import os
+import sys
+import threading
+import time
+
+# 心跳协议：子进程定期向stdout输出该标记行，由主程序的输出管道识别
+HEARTBEAT_MARKER = '@@heartbeat@@'
+HEARTBEAT_ENV = 'FOCUS_ASSISTANT_HEARTBEAT'
+
+# 组件状态
+STATE_RUNNING = 'running'
+STATE_UNRESPONSIVE = 'unresponsive'
+STATE_CRASHED = 'crashed'
+STATE_RESTARTING = 'restarting'
+STATE_STOPPING = 'stopping'
+STATE_STOPPED = 'stopped'
+
+STATE_LABELS = {
+    STATE_RUNNING: '运行中',
+    STATE_UNRESPONSIVE: '无响应',
+    STATE_CRASHED: '已崩溃',
+    STATE_RESTARTING: '重启中',
+    STATE_STOPPING: '停止中',
+    STATE_STOPPED: '已停止',
+}
+
+logger = logging.getLogger('process_supervisor')
+
+
+def is_supervised():
+    """当前进程是否由主程序的监管器启动"""
+    return bool(os.environ.get(HEARTBEAT_ENV))
+
+
+def start_heartbeat(root):
+    """在子进程中通过Tk定时器输出心跳，能证明Tk主循环仍在响应
+
+    仅在由主程序启动（设置了心跳环境变量）时生效。
+    """
+    interval = os.environ.get(HEARTBEAT_ENV)
+    if not interval:
+        return
+    interval_ms = int(float(interval) * 1000)
+
+    def beat():
+        # 整行一次写入，避免与后台日志线程的输出交错
+        sys.stdout.write(HEARTBEAT_MARKER + '\n')
+        sys.stdout.flush()
+        root.after(interval_ms, beat)
+
+    root.after(0, beat)
+
+
+class ManagedProcess:
+    """受监管的子进程及其重启状态"""
+
+    def __init__(self, name, process):
+        self.name = name
+        self.process = process
+        self.state = STATE_RUNNING
+        self.started_at = time.monotonic()
+        self.last_heartbeat = self.started_at
+        self.restarts = 0
+        self.backoff = 0
+        self.restart_at = None
+
+
+class ProcessSupervisor:
+    """子进程监管器
+
+    - 通过退出码和心跳检测组件崩溃或无响应
+    - 按指数退避自动重启崩溃的组件，稳定运行一段时间后重置退避
+    - 并行停止所有子进程，共用一个总超时时间
+    - 状态变化通过回调异步通知界面（回调在监管线程中调用）
+    """
+
+    def __init__(self, launcher, on_state_change=None, heartbeat_interval=5.0, heartbeat_timeout=20.0,
+                 base_backoff=1.0, max_backoff=60.0, stable_after=60.0, check_interval=1.0):
+        # launcher(name) 启动组件并返回subprocess.Popen
+        self.launcher = launcher
+        self.on_state_change = on_state_change
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.stable_after = stable_after
+        self.check_interval = check_interval
+        self.children = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._watch, name="process-supervisor", daemon=True)
+        self._thread.start()
+
+    def child_env(self):
+        """子进程需要的环境变量（开启心跳）"""
+        return {HEARTBEAT_ENV: str(self.heartbeat_interval)}
+
+    def add(self, name, process):
+        """开始监管一个已启动的子进程"""
+        child = ManagedProcess(name, process)
+        with self._lock:
+            self.children[name] = child
+        self._notify(child, STATE_RUNNING)
+
+    def heartbeat(self, name):
+        """收到组件心跳"""
+        child = self.children.get(name)
+        if child is None:
+            return
+        child.last_heartbeat = time.monotonic()
+        if child.state == STATE_UNRESPONSIVE:
+            child.state = STATE_RUNNING
+            self._notify(child, STATE_RUNNING)
+
+    def is_running(self):
+        with self._lock:
+            return any(child.state != STATE_STOPPED for child in self.children.values())
+
+    def states(self):
+        """组件名称 -> 状态"""
+        with self._lock:
+            return {name: child.state for name, child in self.children.items()}
+
+    def _notify(self, child, state, detail=None):
+        """通知child的状态变化；同名组件已由新的实例接管时，旧实例的状态不再通知界面"""
+        with self._lock:
+            current = self.children.get(child.name)
+        if current is not None and current is not child:
+            logger.debug("忽略已被替换的组件 %s 的状态: %s", child.name, state)
+            return
+        if self.on_state_change:
+            try:
+                self.on_state_change(child.name, state, detail)
+            except Exception as e:
+                logger.warning("组件状态回调出错: %s", e)
+
+    def _watch(self):
+        while not self._stop_event.wait(self.check_interval):
+            now = time.monotonic()
+            with self._lock:
+                children = list(self.children.values())
+            for child in children:
+                try:
+                    self._check(child, now)
+                except Exception as e:
+                    logger.warning("检查组件 %s 时出错: %s", child.name, e)
+
+    def _check(self, child, now):
+        if child.state in (STATE_STOPPING, STATE_STOPPED):
+            return
+        if child.state == STATE_CRASHED:
+            if now >= child.restart_at:
+                self._restart(child)
+            return
+
+        exit_code = child.process.poll()
+        if exit_code is None and now - child.last_heartbeat > self.heartbeat_timeout:
+            # 进程仍在但主循环无响应，强制结束后按崩溃处理
+            if child.state != STATE_UNRESPONSIVE:
+                child.state = STATE_UNRESPONSIVE
+                self._notify(child, STATE_UNRESPONSIVE)
+            logger.warning("组件 %s 超过%.0f秒无心跳，强制结束", child.name, self.heartbeat_timeout)
+            _kill_tree(child.process)
+            exit_code = child.process.poll()
+        if exit_code is None:
+            # 稳定运行足够久后重置退避时间
+            if child.backoff and now - child.started_at > self.stable_after:
+                child.backoff = 0
+            return
+
+        if exit_code == 0:
+            # 组件正常退出（例如用户按Q键），不自动重启
+            child.state = STATE_STOPPED
+            self._notify(child, STATE_STOPPED)
+            return
+
+        child.backoff = min(self.max_backoff, child.backoff * 2 if child.backoff else self.base_backoff)
+        child.restart_at = now + child.backoff
+        child.state = STATE_CRASHED
+        logger.warning("组件 %s 异常退出（退出码 %s），%.0f秒后重启", child.name, exit_code, child.backoff)
+        self._notify(child, STATE_CRASHED, child.backoff)
+
+    def _restart(self, child):
+        # 状态的检查和修改都在锁内进行，不会覆盖stop_all设置的停止状态
+        with self._lock:
+            if child.state in (STATE_STOPPING, STATE_STOPPED):
+                return
+            child.state = STATE_RESTARTING
+        self._notify(child, STATE_RESTARTING)
+        try:
+            process = self.launcher(child.name)
+        except Exception as e:
+            with self._lock:
+                if child.state in (STATE_STOPPING, STATE_STOPPED):
+                    return
+                child.backoff = min(self.max_backoff, child.backoff * 2)
+                child.restart_at = time.monotonic() + child.backoff
+                child.state = STATE_CRASHED
+            logger.warning("重启组件 %s 失败: %s", child.name, e)
+            self._notify(child, STATE_CRASHED, child.backoff)
+            return
+        with self._lock:
+            # 与stop_all互斥：停止请求要么在此之前到达（结束新进程），要么在此之后到达（停止的是新进程）
+            stopping = child.state in (STATE_STOPPING, STATE_STOPPED)
+            if not stopping:
+                child.process = process
+                child.restarts += 1
+                child.started_at = child.last_heartbeat = time.monotonic()
+                child.state = STATE_RUNNING
+        if stopping:
+            # 重启期间收到了停止请求
+            _kill_tree(process)
+            return
+        logger.info("组件 %s 已重启（第%s次）", child.name, child.restarts)
+        self._notify(child, STATE_RUNNING)
+
+    def stop_all(self, deadline=3.0, on_done=None, wait=False):
+        """并行停止所有子进程，总共最多等待deadline秒，超时的进程树被强制结束
+
+        wait为False时在后台线程中执行并在完成后调用on_done，不阻塞界面线程。
+        """
+        with self._lock:
+            children = list(self.children.values())
+            for child in children:
+                child.state = STATE_STOPPING
+            self.children.clear()
+
+        def run():
+            for child in children:
+                try:
+                    child.process.terminate()
+                except Exception as e:
+                    logger.warning("停止进程时出错: %s", e)
+            end = time.monotonic() + deadline
+            for child in children:
+                try:
+                    child.process.wait(timeout=max(0, end - time.monotonic()))
+                    logger.debug("进程 %s 已终止", child.process.pid)
+                except Exception:
+                    _kill_tree(child.process)
+                child.state = STATE_STOPPED
+                self._notify(child, STATE_STOPPED)
+            if on_done:
+                on_done()
+
+        if wait:
+            run()
+        else:
+            threading.Thread(target=run, name="process-stopper", daemon=True).start()
+
+    def shutdown(self):
+        """停止监管线程"""
+        self._stop_event.set()
+
+
+def _kill_tree(process):
+    """强制结束进程及其所有子进程"""
+    try:
+        import psutil
+        proc = psutil.Process(process.pid)
+        for child in proc.children(recursive=True):
+            try:
+                child.kill()
+            except Exception as e:
+                logger.warning("终止子进程 %s 时出错: %s", child.pid, e)
+        proc.kill()
+        logger.info("进程 %s 已强制终止", process.pid)
+    except Exception as e:
+        # psutil不可用或进程已不存在
+        try:
+            process.kill()
+        except Exception:
+            logger.warning("强制终止进程 %s 时出错: %s", process.pid, e)
+    try:
+        process.wait(timeout=1)
+    except Exception:
+        pass
@@ -0,0 +1,197 @@
+import logging
+import os
+import socket
+import struct
+import threading
+
+logger = logging.getLogger('process_tracker')
+
+
+def _psutil_pids():
+    import psutil
+    return psutil.pids()
+
+
+def _psutil_name(pid):
+    import psutil
+    try:
+        return psutil.Process(pid).name().lower()
+    except (psutil.NoSuchProcess, psutil.ZombieProcess):
+        return None
+    except psutil.AccessDenied:
+        # 无权限读取名称的进程记为空名称，避免每次刷新都重复查询
+        return ''
+
+
+class ProcessTracker:
+    """增量维护进程表（pid -> 进程名），每次刷新只处理新增和退出的进程
+
+    match_name为判断进程名是否属于关注集合（例如媒体播放器）的函数，
+    匹配的进程pid保存在matched_pids中，检测时只需判断集合是否为空。
+    pid_source/name_lookup可替换为模拟实现，用于基准测试。
+    注意：两次刷新之间pid被复用时无法察觉名称变化，除非使用事件源。
+    """
+
+    def __init__(self, match_name, pid_source=None, name_lookup=None, feed=None):
+        self.match_name = match_name
+        self._pid_source = pid_source or _psutil_pids
+        self._name_lookup = name_lookup or _psutil_name
+        self.feed = feed
+        self.names = {}
+        self.matched_pids = set()
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _add(self, pid, name=None):
+        if name is None:
+            name = self._name_lookup(pid)
+            if name is None:
+                # 进程已经退出
+                self._remove(pid)
+                return
+        self.names[pid] = name
+        if name and self.match_name(name):
+            self.matched_pids.add(pid)
+        else:
+            self.matched_pids.discard(pid)
+
+    def _remove(self, pid):
+        self.names.pop(pid, None)
+        self.matched_pids.discard(pid)
+
+    def refresh(self):
+        """同步进程表：有事件源时只应用事件，否则对pid集合做差集"""
+        with self._lock:
+            if self.feed is not None and self.feed.running and self._initialized:
+                self._apply(self.feed.drain())
+                return
+
+            if self.feed is not None:
+                # 列举之前积压的事件已经反映在即将获取的pid快照中，直接丢弃
+                self.feed.drain()
+            current = set(self._pid_source())
+            known = self.names.keys()
+            for pid in known - current:
+                self._remove(pid)
+            for pid in current - known:
+                self._add(pid)
+            self._initialized = True
+            if self.feed is not None:
+                # 列举期间到达的事件可能晚于快照，在快照之上应用，之后只依赖事件源
+                self._apply(self.feed.drain())
+
+    def _apply(self, events):
+        for kind, pid in events:
+            if kind == 'exit':
+                self._remove(pid)
+            else:
+                # fork和exec都可能改变进程名称，重新查询
+                self._add(pid)
+
+    def matched_names(self):
+        """返回当前匹配的进程名称集合"""
+        with self._lock:
+            return {self.names[pid] for pid in self.matched_pids if pid in self.names}
+
+    def has_match(self):
+        return bool(self.matched_pids)
+
+
+class ProcConnectorFeed:
+    """Linux进程事件源：通过netlink进程连接器接收fork/exec/exit通知
+
+    需要root或CAP_NET_ADMIN权限，start()失败时running为False，
+    ProcessTracker会自动退回pid差集方式。
+    """
+    NETLINK_CONNECTOR = 11
+    CN_IDX_PROC = 1
+    CN_VAL_PROC = 1
+    PROC_CN_MCAST_LISTEN = 1
+    PROC_CN_MCAST_IGNORE = 2
+    PROC_EVENT_FORK = 0x00000001
+    PROC_EVENT_EXEC = 0x00000002
+    PROC_EVENT_EXIT = 0x80000000
+
+    NLMSG_HEADER = struct.Struct('=IHHII')
+    CN_MSG_HEADER = struct.Struct('=IIIIHH')
+    PROC_EVENT_HEADER = struct.Struct('=IIQ')
+
+    def __init__(self, max_pending=65536):
+        self.running = False
+        self.max_pending = max_pending
+        self._sock = None
+        self._thread = None
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def _control_message(self, op):
+        payload = struct.pack('=I', op)
+        cn_msg = self.CN_MSG_HEADER.pack(self.CN_IDX_PROC, self.CN_VAL_PROC, 0, 0, len(payload), 0) + payload
+        header = self.NLMSG_HEADER.pack(self.NLMSG_HEADER.size + len(cn_msg), 3, 0, 0, os.getpid())  # NLMSG_DONE
+        return header + cn_msg
+
+    def start(self):
+        """订阅进程事件，返回是否成功"""
+        if not hasattr(socket, 'AF_NETLINK'):
+            return False
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, self.NETLINK_CONNECTOR)
+            sock.bind((os.getpid(), self.CN_IDX_PROC))
+            sock.send(self._control_message(self.PROC_CN_MCAST_LISTEN))
+        except OSError as e:
+            logger.warning("进程连接器不可用，将使用pid差集方式: %s", e)
+            return False
+        self._sock = sock
+        self.running = True
+        self._thread = threading.Thread(target=self._read_loop, daemon=True)
+        self._thread.start()
+        return True
+
+    def _read_loop(self):
+        offset = self.NLMSG_HEADER.size + self.CN_MSG_HEADER.size
+        while self.running:
+            try:
+                data = self._sock.recv(4096)
+            except OSError:
+                break
+            if len(data) < offset + self.PROC_EVENT_HEADER.size:
+                continue
+            what, _, _ = self.PROC_EVENT_HEADER.unpack_from(data, offset)
+            body = offset + self.PROC_EVENT_HEADER.size
+            if what == self.PROC_EVENT_FORK:
+                _, _, child_pid, child_tgid = struct.unpack_from('=IIII', data, body)
+                # 只跟踪进程（线程组首线程），忽略新建线程
+                event = ('fork', child_tgid) if child_pid == child_tgid else None
+            elif what == self.PROC_EVENT_EXEC:
+                pid, tgid = struct.unpack_from('=II', data, body)
+                event = ('exec', tgid)
+            elif what == self.PROC_EVENT_EXIT:
+                pid, tgid = struct.unpack_from('=II', data, body)
+                event = ('exit', tgid) if pid == tgid else None
+            else:
+                event = None
+            if event is not None:
+                with self._lock:
+                    if len(self._pending) < self.max_pending:
+                        self._pending.append(event)
+                    else:
+                        # 积压过多时停止事件模式，由tracker回到全量同步
+                        self.running = False
+        self.running = False
+
+    def drain(self):
+        """取出积压的事件列表"""
+        with self._lock:
+            events = self._pending
+            self._pending = []
+        return events
+
+    def stop(self):
+        self.running = False
+        if self._sock is not None:
+            try:
+                self._sock.send(self._control_message(self.PROC_CN_MCAST_IGNORE))
+            except OSError:
+                pass
+            self._sock.close()
+            self._sock = None
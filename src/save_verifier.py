@@ -0,0 +1,134 @@
+import os
+import re
+import threading
+import time
+
+# 保存确认结果
+SAVE_CONFIRMED = 'confirmed'   # 标题的修改标记消失或文件修改时间更新
+SAVE_TIMED_OUT = 'timed_out'   # 截止时间内没有观察到保存
+SAVE_NOT_DIRTY = 'not_dirty'   # 文档没有未保存的修改（文件修改时间未变化）
+SAVE_UNVERIFIED = 'unverified' # 标题没有修改标记且找不到文件，无法观察保存结果
+
+SAVE_RESULT_LABELS = {
+    SAVE_CONFIRMED: '已保存',
+    SAVE_TIMED_OUT: '未能确认保存',
+    SAVE_NOT_DIRTY: '没有未保存的修改',
+    SAVE_UNVERIFIED: '无法确认',
+}
+
+# 绝对路径（例如Notepad++标题中的 "C:\\docs\\a.txt"）
+_PATH_PATTERN = re.compile(r'[A-Za-z]:\\[^*?"<>|]+|/[^*?"<>|]+')
+
+
+def title_is_dirty(title):
+    """常见编辑器用'*'或'●'标记未保存的修改"""
+    if not title:
+        return False
+    stripped = title.strip()
+    return stripped.startswith('*') or stripped.endswith('*') or '●' in stripped
+
+
+def path_from_title(title):
+    """尝试从窗口标题中找出文档的完整路径，找不到时返回None"""
+    if not title:
+        return None
+    for part in title.split(' - '):
+        for match in _PATH_PATTERN.findall(part.strip().strip('*● ')):
+            candidate = match.strip()
+            if os.path.isfile(candidate):
+                return candidate
+    return None
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class SaveSnapshot:
+    """发送保存快捷键之前的窗口状态"""
+    __slots__ = ('hwnd', 'title', 'dirty', 'path', 'mtime', 'is_dirty')
+
+    def __init__(self, hwnd, title, dirty, path=None, mtime=None, is_dirty=None):
+        self.hwnd = hwnd
+        self.title = title
+        self.dirty = dirty
+        self.path = path
+        self.mtime = mtime
+        # 判断标题是否带修改标记的函数（按应用的规则）
+        self.is_dirty = is_dirty
+
+
+class SaveResult:
+    __slots__ = ('status', 'elapsed', 'title')
+
+    def __init__(self, status, elapsed, title):
+        self.status = status
+        self.elapsed = elapsed
+        self.title = title
+
+    @property
+    def confirmed(self):
+        return self.status == SAVE_CONFIRMED
+
+
+class SaveVerifier:
+    """按截止时间确认保存是否完成，确认后立即返回，不再固定等待
+
+    - 标题带修改标记时，等待标记消失
+    - 能从标题中找到文件路径时，同时观察文件修改时间
+    - 以短间隔轮询；窗口标题变化事件可调用notify()提前唤醒
+    """
+
+    def __init__(self, title_reader, is_dirty=None, path_resolver=None,
+                 poll_interval=0.015, deadline=2.0, clean_deadline=0.25):
+        # title_reader(hwnd) 返回窗口标题
+        self.title_reader = title_reader
+        self.is_dirty = is_dirty or title_is_dirty
+        self.path_resolver = path_resolver or path_from_title
+        self.poll_interval = poll_interval
+        self.deadline = deadline
+        # 标题没有修改标记、只能观察文件时间时的等待时间
+        self.clean_deadline = clean_deadline
+        self._changed = threading.Event()
+
+    def snapshot(self, hwnd, is_dirty=None):
+        """在发送保存快捷键之前记录窗口标题和文件修改时间；is_dirty为该应用的修改标记判断函数"""
+        is_dirty = is_dirty or self.is_dirty
+        title = self.title_reader(hwnd)
+        path = self.path_resolver(title)
+        return SaveSnapshot(hwnd, title, is_dirty(title), path, _mtime(path) if path else None, is_dirty)
+
+    def notify(self):
+        """窗口标题可能已变化，唤醒正在等待的确认"""
+        self._changed.set()
+
+    def _saved(self, snapshot):
+        if snapshot.dirty and not snapshot.is_dirty(self.title_reader(snapshot.hwnd)):
+            return True
+        if snapshot.mtime is not None:
+            mtime = _mtime(snapshot.path)
+            return mtime is not None and mtime != snapshot.mtime
+        return False
+
+    def verify(self, snapshot, deadline=None):
+        """等待保存完成或超时，返回SaveResult"""
+        start = time.perf_counter()
+        if not snapshot.dirty and snapshot.mtime is None:
+            # 标题和文件都无法观察，不能判断是否已保存，也无需等待
+            return SaveResult(SAVE_UNVERIFIED, 0.0, snapshot.title)
+        if deadline is None:
+            deadline = self.deadline if snapshot.dirty else self.clean_deadline
+        end = start + deadline
+        self._changed.clear()
+        while True:
+            if self._saved(snapshot):
+                return SaveResult(SAVE_CONFIRMED, time.perf_counter() - start, self.title_reader(snapshot.hwnd))
+            remaining = end - time.perf_counter()
+            if remaining <= 0:
+                status = SAVE_TIMED_OUT if snapshot.dirty else SAVE_NOT_DIRTY
+                return SaveResult(status, time.perf_counter() - start, self.title_reader(snapshot.hwnd))
+            if self._changed.wait(min(self.poll_interval, remaining)):
+                self._changed.clear()
@@ -1,3 +1,7 @@
+import startup_profiler
+startup_profiler.enable_from_argv()
+
+import logging
 import tkinter as tk
 from tkinter import messagebox, ttk
 import subprocess
@@ -5,13 +9,21 @@ import sys
 import os
 import threading
 import time
+from component_host import ComponentHost
+from lazy_import import module_available
+from output_pipeline import OutputPipeline, LogPane
+from process_supervisor import ProcessSupervisor, HEARTBEAT_MARKER, STATE_LABELS, STATE_CRASHED
+from app_logging import setup_logging
+from metrics import setup_metrics
+
+logger = logging.getLogger('smart_assistant')
 
 class SmartAssistantApp:
-    def __init__(self):
+    def __init__(self, in_process=False):
         # 创建主窗口
         self.root = tk.Tk()
         self.root.title("智能专注助手")
-        self.root.geometry("500x400")
+        self.root.geometry("560x640")
         self.root.resizable(True, True)
         
         # 设置样式
@@ -78,6 +90,15 @@ class SmartAssistantApp:
         )
         saver_check.pack(anchor=tk.W, pady=5, padx=10)
         
+        # 运行模式：进程内模式下所有组件共享一个解释器和一个Tk根窗口
+        self.in_process_var = tk.BooleanVar(value=in_process)
+        in_process_check = ttk.Checkbutton(
+            self.functions_frame,
+            text="在同一进程内运行（启动更快、占用内存更少）",
+            variable=self.in_process_var
+        )
+        in_process_check.pack(anchor=tk.W, pady=5, padx=10)
+        
         # 创建按钮框架
         self.buttons_frame = ttk.Frame(self.root)
         self.buttons_frame.pack(pady=15)
@@ -123,8 +144,21 @@ class SmartAssistantApp:
         )
         self.status_label.pack(side=tk.BOTTOM, fill=tk.X, pady=5, padx=5)
         
-        # 存储子进程
-        self.processes = []
+        # 子进程输出日志：后台线程持续读取各组件的输出，日志面板定时批量刷新
+        self.output_pipeline = OutputPipeline()
+        log_frame = ttk.LabelFrame(self.root, text="组件日志")
+        log_frame.pack(pady=5, padx=20, fill=tk.BOTH, expand=True)
+        self.log_pane = LogPane(log_frame, self.output_pipeline)
+        self.log_pane.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.log_pane.start()
+        
+        # 子进程监管器：心跳检测、崩溃后按指数退避重启，状态异步回报到界面
+        self.supervisor = ProcessSupervisor(self.launch_process, on_state_change=self.on_component_state)
+        self.output_pipeline.add_filter(self.on_child_line)
+        self.component_states = {}
+        self.component_state_var = tk.StringVar(value="")
+        self.component_state_label = ttk.Label(self.root, textvariable=self.component_state_var, anchor=tk.W)
+        self.component_state_label.pack(side=tk.BOTTOM, fill=tk.X, padx=5)
         
         # 获取当前脚本所在目录
         self.script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -135,59 +169,97 @@ class SmartAssistantApp:
             'hotkey': 'hotkey_controller.py',
             'saver': 'document_saver.py'
         }
+        self.script_components = {script: name for name, script in self.function_scripts.items()}
+        
+        # 进程内组件宿主，组件启动/停止后刷新按钮状态
+        self.host = ComponentHost(self.root, on_change=lambda name: self.root.after(0, self.update_button_states))
     
     def update_status(self, status):
         """更新状态栏文本"""
         self.status_var.set(f"状态: {status}")
         self.root.update_idletasks()
     
+    def launch_process(self, name):
+        """启动组件子进程并接入输出管道，返回subprocess.Popen（也用于监管器自动重启）"""
+        script_path = os.path.join(self.script_dir, self.function_scripts[name])
+        if not os.path.exists(script_path):
+            raise FileNotFoundError(f"脚本文件不存在: {script_path}")
+        
+        # 启动子进程：关闭输出缓冲并统一使用UTF-8，保证日志按行及时送达；开启心跳供监管器检测
+        env = dict(os.environ, PYTHONUNBUFFERED='1', PYTHONIOENCODING='utf-8')
+        env.update(self.supervisor.child_env())
+        process = subprocess.Popen(
+            [sys.executable, script_path],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            env=env
+        )
+        
+        # 持续读取其输出，避免管道写满后子进程阻塞
+        self.output_pipeline.attach(name, process)
+        return process
+    
     def start_script(self, script_name):
         """启动指定的Python脚本"""
+        if self.in_process_var.get():
+            return self.start_component(script_name)
         try:
-            script_path = os.path.join(self.script_dir, script_name)
-            if not os.path.exists(script_path):
-                raise FileNotFoundError(f"脚本文件不存在: {script_path}")
-            
-            # 启动子进程
-            process = subprocess.Popen(
-                [sys.executable, script_path],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
+            name = self.script_components[script_name]
+            process = self.launch_process(name)
             
-            # 添加到进程列表
-            self.processes.append(process)
+            # 交给监管器管理：崩溃或无响应时自动重启
+            self.supervisor.add(name, process)
             
             # 更新状态
-            script_base = os.path.basename(script_path)
-            self.update_status(f"已启动: {script_base}")
-            print(f"已启动脚本: {script_base}")
+            self.update_status(f"已启动: {script_name}")
+            logger.info("已启动脚本: %s", script_name)
             
             return True
         except Exception as e:
             error_msg = f"启动脚本时出错: {e}"
-            print(error_msg)
+            logger.error(error_msg)
+            messagebox.showerror("启动失败", error_msg)
+            return False
+    
+    def start_component(self, script_name):
+        """在当前进程内启动脚本对应的功能组件"""
+        try:
+            self.host.start(self.script_components[script_name])
+            self.update_status(f"已在进程内启动: {script_name}")
+            return True
+        except Exception as e:
+            error_msg = f"启动组件时出错: {e}"
+            logger.error(error_msg)
             messagebox.showerror("启动失败", error_msg)
             return False
     
+    def stagger_start(self):
+        """子进程模式下错开启动，避免同时启动多个窗口导致的问题；进程内模式无需等待"""
+        if not self.in_process_var.get():
+            time.sleep(0.5)
+    
     def start_all_functions(self):
         """启动所有功能"""
-        # 先停止所有正在运行的进程
-        self.stop_all_processes()
-        
         # 设置所有复选框为选中
         self.volume_var.set(True)
         self.hotkey_var.set(True)
         self.saver_var.set(True)
         
-        # 启动所有脚本
+        # 先停止所有正在运行的进程，全部停止后再启动，
+        # 避免后台停止线程的状态通知落到新启动的同名组件上
+        self.stop_all_processes(on_done=self.start_all_scripts)
+    
+    def start_all_scripts(self):
+        """启动所有脚本（由start_all_functions在旧进程停止后调用）"""
         success_count = 0
         for script in self.function_scripts.values():
             if self.start_script(script):
                 success_count += 1
                 # 添加短暂延迟，避免同时启动多个窗口导致的问题
-                time.sleep(0.5)
+                self.stagger_start()
         
         # 更新按钮状态
         self.update_button_states()
@@ -203,12 +275,12 @@ class SmartAssistantApp:
         if self.volume_var.get():
             if self.start_script(self.function_scripts['volume']):
                 success_count += 1
-                time.sleep(0.5)
+                self.stagger_start()
         
         if self.hotkey_var.get():
             if self.start_script(self.function_scripts['hotkey']):
                 success_count += 1
-                time.sleep(0.5)
+                self.stagger_start()
         
         if self.saver_var.get():
             if self.start_script(self.function_scripts['saver']):
@@ -222,72 +294,68 @@ class SmartAssistantApp:
         else:
             messagebox.showwarning("未启动", "请至少选择一个功能")
     
-    def stop_all_processes(self):
-        """停止所有子进程，确保强制终止所有子进程"""
-        import signal
-        import psutil
-        
-        # 创建进程列表的副本，避免在迭代时修改列表
-        processes_to_stop = list(self.processes)
-        
-        for process in processes_to_stop:
-            try:
-                # 首先尝试优雅终止
-                process.terminate()
-                
-                # 等待进程结束，增加超时时间到3秒
-                try:
-                    process.wait(timeout=3)
-                    print(f"进程 {process.pid} 已终止")
-                except subprocess.TimeoutExpired:
-                    # 如果超时，尝试更强制的终止方式
-                    try:
-                        # 在Windows上，kill()实际上就是terminate()，所以需要特殊处理
-                        # 获取进程对象
-                        proc = psutil.Process(process.pid)
-                        
-                        # 强制终止进程树，确保所有子进程也被终止
-                        for child in proc.children(recursive=True):
-                            try:
-                                child.kill()
-                            except Exception as e:
-                                print(f"终止子进程 {child.pid} 时出错: {e}")
-                        
-                        # 终止主进程
-                        proc.kill()
-                        print(f"进程 {process.pid} 已强制终止")
-                    except psutil.NoSuchProcess:
-                        print(f"进程 {process.pid} 已不存在")
-                    except Exception as e:
-                        print(f"强制终止进程 {process.pid} 时出错: {e}")
-            except Exception as e:
-                print(f"停止进程时出错: {e}")
-            finally:
-                # 确保从列表中移除该进程
-                if process in self.processes:
-                    self.processes.remove(process)
-        
-        # 清空进程列表（双重保障）
-        self.processes.clear()
-        self.update_status("所有功能已停止")
+    def stop_all_processes(self, wait=False, on_done=None):
+        """并行停止所有子进程，总共最多等待3秒，超时的进程树被强制终止
+
+        wait为False时在后台完成，不阻塞界面线程。
+        """
+        def finished():
+            self.root.after(0, lambda: self.update_status("所有功能已停止"))
+            if on_done:
+                self.root.after(0, on_done)
+        
+        self.supervisor.stop_all(deadline=3.0, on_done=None if wait else finished, wait=wait)
+        
+        # 停止进程内运行的组件
+        self.host.stop_all()
+        if wait:
+            self.update_status("所有功能已停止")
+        else:
+            self.update_status("正在停止所有功能...")
     
     def stop_all_functions(self):
         """停止所有功能"""
-        self.stop_all_processes()
+        def finished():
+            self.update_button_states()
+            messagebox.showinfo("已停止", "所有功能组件已停止")
+        
+        self.stop_all_processes(on_done=finished)
         self.update_button_states()
-        messagebox.showinfo("已停止", "所有功能组件已停止")
     
     def update_button_states(self):
         """更新按钮状态"""
-        has_processes = len(self.processes) > 0
+        has_processes = self.supervisor.is_running() or len(self.host.components) > 0
         self.stop_all_button.config(state=tk.NORMAL if has_processes else tk.DISABLED)
     
+    def on_child_line(self, component, stream, text):
+        """输出管道的行过滤器：识别子进程心跳"""
+        if text == HEARTBEAT_MARKER:
+            self.supervisor.heartbeat(component)
+            return True
+        return False
+    
+    def on_component_state(self, name, state, detail=None):
+        """监管器状态回调（在监管线程中调用），转到界面线程更新显示"""
+        self.root.after(0, self.show_component_state, name, state, detail)
+    
+    def show_component_state(self, name, state, detail=None):
+        """在状态栏中显示各组件的运行状态"""
+        label = STATE_LABELS.get(state, state)
+        if state == STATE_CRASHED and detail:
+            label += f"，{detail:.0f}秒后重启"
+        self.component_states[name] = label
+        names = {'volume': '音量监控', 'hotkey': '快捷键', 'saver': '文档保存'}
+        self.component_state_var.set(" | ".join(f"{names.get(key, key)}: {value}"
+                                                for key, value in self.component_states.items()))
+        self.update_button_states()
+    
     def quit_program(self):
         """退出程序"""
         # 询问用户是否确定退出
         if messagebox.askyesno("确认退出", "确定要退出智能专注助手吗？\n所有正在运行的功能将被停止。"):
-            # 停止所有进程
-            self.stop_all_processes()
+            # 停止所有进程（并行停止，总共最多等待3秒）
+            self.stop_all_processes(wait=True)
+            self.supervisor.shutdown()
             # 退出主程序
             self.root.quit()
             self.root.destroy()
@@ -302,28 +370,22 @@ class SmartAssistantApp:
         self.root.mainloop()
 
 if __name__ == "__main__":
+    setup_logging('smart_assistant')
+    setup_metrics('smart_assistant')
     try:
-        # 检查是否安装了必要的库
-        required_libraries = ['tkinter', 'pynput', 'pyautogui', 'psutil', 'pygame', 'win32gui', 'win32process']
-        missing_libraries = []
-        
-        for lib in required_libraries:
-            try:
-                if lib == 'tkinter':
-                    import tkinter as tk
-                else:
-                    __import__(lib)
-            except ImportError:
-                missing_libraries.append(lib)
+        # 检查是否安装了必要的库（只查找模块，不实际导入）
+        required_libraries = ['tkinter', 'pynput', 'pyautogui', 'psutil', 'win32gui', 'win32process']
+        missing_libraries = [lib for lib in required_libraries if not module_available(lib)]
         
         if missing_libraries:
             msg = f"缺少以下必要的Python库:\n{', '.join(missing_libraries)}\n\n请运行以下命令安装:\npip install {' '.join([lib.replace('win32gui', 'pywin32').replace('win32process', 'pywin32') for lib in missing_libraries])}"
-            print(msg)
+            logger.error(msg)
             messagebox.showerror("缺少依赖", msg)
         else:
-            # 启动应用程序
-            app = SmartAssistantApp()
+            # 启动应用程序，--in-process 默认使用进程内模式运行组件
+            app = SmartAssistantApp(in_process='--in-process' in sys.argv)
+            startup_profiler.watch_window(app.root)
             app.run()
     except Exception as e:
-        print(f"程序启动失败: {e}")
+        logger.error("程序启动失败: %s", e)
         input("按回车键退出...")
\ No newline at end of file
@@ -0,0 +1,97 @@
+# 启动耗时分析（--profile-startup）
+# 在入口脚本的最开始、其他导入之前调用enable_from_argv()，之后的每个模块导入都会被计时；
+# 窗口第一次显示时输出报告：按自身耗时（不含子模块）排序的模块导入时间，以及从启动到窗口显示的总耗时。
+import builtins
+import sys
+import time
+
+FLAG = '--profile-startup'
+
+_enabled = False
+_start_time = None
+_original_import = None
+# 模块名 -> [自身耗时, 累计耗时]
+_import_times = {}
+# 延迟导入的模块名 -> 耗时
+_lazy_imports = {}
+_stack = []
+_window_shown_at = None
+
+
+def is_enabled():
+    return _enabled
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    # 已导入的模块不计时，避免统计重复的import语句
+    if level == 0 and name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+    start = time.perf_counter()
+    _stack.append(0.0)
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        children = _stack.pop()
+        elapsed = time.perf_counter() - start
+        if _stack:
+            _stack[-1] += elapsed
+        entry = _import_times.setdefault(name, [0.0, 0.0])
+        entry[0] += elapsed - children
+        entry[1] += elapsed
+
+
+def enable():
+    """开始记录模块导入耗时"""
+    global _enabled, _start_time, _original_import
+    if _enabled:
+        return
+    _enabled = True
+    _start_time = time.perf_counter()
+    _original_import = builtins.__import__
+    builtins.__import__ = _timed_import
+
+
+def enable_from_argv(argv=None):
+    """命令行包含--profile-startup时启用分析，并从参数中移除该标志"""
+    argv = sys.argv if argv is None else argv
+    if FLAG in argv:
+        argv.remove(FLAG)
+        enable()
+    return _enabled
+
+
+def record_lazy_import(name, elapsed):
+    """由LazyModule调用，记录首次使用时才导入的模块"""
+    if _enabled:
+        _lazy_imports[name] = _lazy_imports.get(name, 0.0) + elapsed
+
+
+def watch_window(root, label=None):
+    """窗口第一次显示时输出报告"""
+    if not _enabled:
+        return
+
+    def on_map(event=None):
+        global _window_shown_at
+        if _window_shown_at is None:
+            _window_shown_at = time.perf_counter()
+            report(label or root.title())
+
+    root.bind('<Map>', on_map, add='+')
+
+
+def report(label='', limit=15, file=None):
+    """输出导入耗时报告"""
+    file = file or sys.stderr
+    builtins.__import__ = _original_import
+    total_imports = sum(entry[0] for entry in _import_times.values())
+    print(f"===== 启动分析: {label} =====", file=file)
+    print(f"{'模块':<40} {'自身耗时':>10} {'累计耗时':>10}", file=file)
+    ranked = sorted(_import_times.items(), key=lambda item: item[1][0], reverse=True)
+    for name, (self_time, cumulative) in ranked[:limit]:
+        print(f"{name:<40} {self_time * 1000:>8.1f}ms {cumulative * 1000:>8.1f}ms", file=file)
+    print(f"模块导入合计: {total_imports * 1000:.1f}ms ({len(_import_times)} 个模块)", file=file)
+    for name, elapsed in sorted(_lazy_imports.items(), key=lambda item: item[1], reverse=True):
+        print(f"延迟导入 {name}: {elapsed * 1000:.1f}ms", file=file)
+    if _window_shown_at is not None:
+        print(f"启动到窗口显示: {(_window_shown_at - _start_time) * 1000:.1f}ms", file=file)
@@ -0,0 +1,265 @@
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from metrics import get_metrics
+
+logger = logging.getLogger('state_store')
+
+_metrics = get_metrics()
+FLUSH_SECONDS = _metrics.histogram('focus_state_flush_seconds', '把一批状态变更写入数据库的耗时')
+FLUSHED_ROWS = _metrics.counter('focus_state_rows_written_total', '写入数据库的状态行数')
+
+# 状态数据库路径的环境变量；设为 ":memory:" 时只保存在内存中
+STATE_PATH_ENV = 'FOCUS_ASSISTANT_STATE_DB'
+MEMORY = ':memory:'
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS state ("
+    " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, updated REAL NOT NULL,"
+    " PRIMARY KEY (namespace, key)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS counters ("
+    " namespace TEXT NOT NULL, key TEXT NOT NULL, value INTEGER NOT NULL, updated REAL NOT NULL,"
+    " PRIMARY KEY (namespace, key)) WITHOUT ROWID",
+)
+
+
+class StateNamespace:
+    """某个组件的状态视图，键不需要带组件前缀"""
+
+    def __init__(self, store, name):
+        self.store = store
+        self.name = name
+
+    def get(self, key, default=None):
+        return self.store.get(self.name, key, default)
+
+    def set(self, key, value):
+        self.store.set(self.name, key, value)
+
+    def incr(self, key, amount=1):
+        return self.store.incr(self.name, key, amount)
+
+    def counter(self, key):
+        return self.store.counter(self.name, key)
+
+    def items(self, prefix=''):
+        return self.store.items(self.name, prefix)
+
+
+class StateStore:
+    """跨重启保留的组件状态（冷却时间、禁用窗口、计数器），保存在SQLite（WAL模式）中
+
+    - 读写都只访问内存：每个命名空间第一次使用时用一次主键范围查询载入，之后get/set是字典操作
+    - 变更先记入待写集合，后台线程每隔flush_interval秒在一个事务中批量写出；
+      同一个键在两次写出之间的多次修改只写最后一次
+    - 计数器按增量写出（value = value + 增量），多个组件进程同时累加同一个计数器不会互相覆盖
+    - 每批写入是一个事务，进程崩溃最多丢失最近flush_interval秒的变更，不会留下写了一半的状态
+    多个组件进程可以共用同一个数据库文件；其他进程的修改在本进程下次载入该命名空间时可见。
+    """
+
+    def __init__(self, path=MEMORY, flush_interval=1.0, busy_timeout=5.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._values = {}
+        self._counters = {}
+        self._loaded = set()
+        # 待写出的值：(命名空间, 键) -> (JSON文本, 时间戳)
+        self._dirty = {}
+        # 待写出的计数器增量：(命名空间, 键) -> 增量
+        self._deltas = {}
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._db = None
+        self._thread = None
+        if path != MEMORY:
+            try:
+                self._db = self._open(path, busy_timeout)
+            except (sqlite3.Error, OSError) as e:
+                logger.warning("无法打开状态数据库 %s，状态只保存在内存中: %s", path, e)
+        if self._db is not None:
+            self._thread = threading.Thread(target=self._writer, name="state-writer", daemon=True)
+            self._thread.start()
+
+    @staticmethod
+    def _open(path, busy_timeout):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        db = sqlite3.connect(path, timeout=busy_timeout, check_same_thread=False, isolation_level=None)
+        # WAL：写入不阻塞其他进程读取；NORMAL：每次提交不强制fsync，崩溃后数据库仍保持一致
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            db.execute(statement)
+        return db
+
+    @property
+    def persistent(self):
+        return self._db is not None
+
+    def namespace(self, name):
+        self._load(name)
+        return StateNamespace(self, name)
+
+    def _load(self, namespace):
+        if namespace in self._loaded:
+            return
+        values = {}
+        counters = {}
+        if self._db is not None:
+            try:
+                with self._db_lock:
+                    rows = self._db.execute(
+                        "SELECT key, value FROM state WHERE namespace = ?", (namespace,)).fetchall()
+                    counter_rows = self._db.execute(
+                        "SELECT key, value FROM counters WHERE namespace = ?", (namespace,)).fetchall()
+            except sqlite3.Error as e:
+                logger.warning("载入状态 %s 失败: %s", namespace, e)
+                rows = counter_rows = []
+            for key, text in rows:
+                try:
+                    values[(namespace, key)] = json.loads(text)
+                except ValueError:
+                    logger.warning("忽略无法解析的状态 %s/%s", namespace, key)
+            for key, value in counter_rows:
+                counters[(namespace, key)] = value
+        with self._lock:
+            if namespace in self._loaded:
+                return
+            # 载入期间本进程已经修改过的键以内存中的值为准
+            for item, value in values.items():
+                self._values.setdefault(item, value)
+            for item, value in counters.items():
+                self._counters[item] = self._counters.get(item, 0) + value
+            self._loaded.add(namespace)
+
+    def get(self, namespace, key, default=None):
+        self._load(namespace)
+        return self._values.get((namespace, key), default)
+
+    def set(self, namespace, key, value):
+        """修改状态（只写内存，由后台线程批量写出）；value必须能序列化为JSON"""
+        self._load(namespace)
+        text = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._values[(namespace, key)] = value
+            self._dirty[(namespace, key)] = (text, time.time())
+        self._notify_writer()
+
+    def incr(self, namespace, key, amount=1):
+        """累加计数器，返回本进程看到的新值"""
+        self._load(namespace)
+        item = (namespace, key)
+        with self._lock:
+            value = self._counters.get(item, 0) + amount
+            self._counters[item] = value
+            self._deltas[item] = self._deltas.get(item, 0) + amount
+        self._notify_writer()
+        return value
+
+    def _notify_writer(self):
+        # 写出线程已被唤醒时不再重复设置，热路径上只有一次读取
+        if not self._wake.is_set():
+            self._wake.set()
+
+    def counter(self, namespace, key):
+        self._load(namespace)
+        return self._counters.get((namespace, key), 0)
+
+    def items(self, namespace, prefix=''):
+        """命名空间中以prefix开头的状态：[(键, 值)]"""
+        self._load(namespace)
+        with self._lock:
+            return [(key, value) for (name, key), value in self._values.items()
+                    if name == namespace and key.startswith(prefix)]
+
+    def flush(self):
+        """立即写出所有待写的变更，返回写出的行数"""
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+            deltas, self._deltas = self._deltas, {}
+        if not dirty and not deltas:
+            return 0
+        if self._db is None:
+            return 0
+        start = time.perf_counter()
+        now = time.time()
+        try:
+            with self._db_lock:
+                self._db.execute("BEGIN IMMEDIATE")
+                try:
+                    self._db.executemany(
+                        "INSERT INTO state (namespace, key, value, updated) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value, updated = excluded.updated",
+                        [(namespace, key, text, updated) for (namespace, key), (text, updated) in dirty.items()])
+                    self._db.executemany(
+                        "INSERT INTO counters (namespace, key, value, updated) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT (namespace, key) DO UPDATE SET value = value + excluded.value, "
+                        "updated = excluded.updated",
+                        [(namespace, key, delta, now) for (namespace, key), delta in deltas.items()])
+                    self._db.execute("COMMIT")
+                except BaseException:
+                    self._db.execute("ROLLBACK")
+                    raise
+        except sqlite3.Error as e:
+            logger.warning("写入状态数据库失败，稍后重试: %s", e)
+            # 放回待写集合，不覆盖之后的新修改
+            with self._lock:
+                for item, entry in dirty.items():
+                    self._dirty.setdefault(item, entry)
+                for item, delta in deltas.items():
+                    self._deltas[item] = self._deltas.get(item, 0) + delta
+            return 0
+        rows = len(dirty) + len(deltas)
+        FLUSH_SECONDS.observe(time.perf_counter() - start)
+        FLUSHED_ROWS.inc(rows)
+        return rows
+
+    def _writer(self):
+        while not self._closed.is_set():
+            self._wake.wait()
+            # 等待一个写出间隔，把这段时间内的修改合并成一个事务
+            self._closed.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def close(self):
+        """写出剩余的变更并关闭数据库"""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._wake.set()
+        if self._thread is not None and threading.current_thread() is not self._thread:
+            self._thread.join(timeout=2.0)
+        self.flush()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
+
+
+def default_state_path():
+    base = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.local', 'state')
+    return os.path.join(base, 'FocusAssistant', 'state.db')
+
+
+_default_store = None
+_store_lock = threading.Lock()
+
+
+def get_state_store():
+    """返回进程内共享的状态存储，路径由环境变量FOCUS_ASSISTANT_STATE_DB配置；退出时写出剩余变更"""
+    global _default_store
+    if _default_store is None:
+        with _store_lock:
+            if _default_store is None:
+                _default_store = StateStore(os.environ.get(STATE_PATH_ENV) or default_state_path())
+                atexit.register(_default_store.close)
+    return _default_store
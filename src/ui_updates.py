@@ -0,0 +1,126 @@
+import logging
+import threading
+import time
+
+from lazy_import import LazyModule
+from metrics import get_metrics
+
+# 创建状态行控件时才导入tkinter
+tk = LazyModule('tkinter')
+
+logger = logging.getLogger('ui_updates')
+
+_metrics = get_metrics()
+FLUSH_SECONDS = _metrics.histogram('focus_ui_flush_seconds', '一次刷新状态控件的耗时')
+COALESCED = _metrics.counter('focus_ui_updates_coalesced_total', '被合并（未单独刷新）的状态更新')
+
+# 默认最高刷新频率
+DEFAULT_RATE = 30
+
+
+class StatusBoard:
+    """状态发布板：各组件把最新状态写入自己的槽位，一个定时器按上限频率只刷新有变化的槽位
+
+    - publish()可以在任意线程调用，只记录最新文本；同一槽位在两次刷新之间的多次发布合并为一次
+    - 有待刷新的槽位时才安排定时器，同一时刻最多只有一个待执行的after回调
+    - 刷新在Tk线程中执行，两次刷新之间至少间隔1/rate秒
+    """
+
+    def __init__(self, root, rate=DEFAULT_RATE):
+        self.root = root
+        self.interval = 1.0 / rate
+        # 槽位 -> 设置控件内容的函数(text)
+        self._slots = {}
+        # 等待刷新的槽位 -> 最新文本
+        self._pending = {}
+        self._scheduled = False
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+        self.flushes = 0
+
+    def slot(self, key, setter):
+        """登记槽位；setter(text)在Tk线程中更新控件"""
+        with self._lock:
+            self._slots[key] = setter
+
+    def remove(self, key):
+        """注销槽位（组件窗口销毁时调用）"""
+        with self._lock:
+            self._slots.pop(key, None)
+            self._pending.pop(key, None)
+
+    def publish(self, key, text):
+        """发布槽位的最新状态（线程安全，立即返回）"""
+        with self._lock:
+            if key not in self._slots:
+                return
+            if key in self._pending:
+                COALESCED.inc()
+            self._pending[key] = text
+            if self._scheduled:
+                return
+            self._scheduled = True
+            delay = self._last_flush + self.interval - time.monotonic()
+        try:
+            self.root.after(max(0, int(delay * 1000)), self._flush)
+        except Exception as e:
+            # 窗口已销毁
+            logger.debug("安排状态刷新失败: %s", e)
+            with self._lock:
+                self._scheduled = False
+
+    def _flush(self):
+        start = time.perf_counter()
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._scheduled = False
+            self._last_flush = time.monotonic()
+            setters = [(self._slots.get(key), text) for key, text in pending.items()]
+        for setter, text in setters:
+            if setter is None:
+                continue
+            try:
+                setter(text)
+            except Exception as e:
+                logger.warning("更新状态控件时出错: %s", e)
+        self.flushes += 1
+        FLUSH_SECONDS.observe(time.perf_counter() - start)
+
+
+def get_status_board(widget, rate=DEFAULT_RATE):
+    """返回控件所属Tk解释器共享的状态发布板（进程内宿主模式下所有组件共用一个定时器）"""
+    root = getattr(widget, '_root', None)
+    root = root() if callable(root) else None
+    if root is None:
+        root = widget
+    board = getattr(root, '_focus_status_board', None)
+    if not isinstance(board, StatusBoard):
+        board = StatusBoard(root, rate)
+        root._focus_status_board = board
+    return board
+
+
+class StatusLine:
+    """单独的状态行控件：只显示"前缀 + 最新状态"，与静态说明文字分开，更新时不需要重新解析说明文字"""
+
+    def __init__(self, parent, board=None, prefix="最近操作: ", text="", **options):
+        self.prefix = prefix
+        self.board = board or get_status_board(parent)
+        options.setdefault('justify', tk.LEFT)
+        options.setdefault('anchor', 'w')
+        self.label = tk.Label(parent, text=prefix + text if text else '', **options)
+        self.board.slot(self, self._apply)
+
+    def _apply(self, text):
+        self.label.config(text=self.prefix + text)
+
+    def pack(self, **options):
+        self.label.pack(**options)
+        return self
+
+    def set(self, text):
+        """发布新的状态文本（线程安全，按上限频率刷新）"""
+        self.board.publish(self, text)
+
+    def destroy(self):
+        self.board.remove(self)
@@ -1,22 +1,119 @@
-import tkinter as tk
-from tkinter import messagebox
-import pygame
-import pyautogui
-from pynput import keyboard
-import win32api
-import win32con
+import startup_profiler
+startup_profiler.enable_from_argv()
+
+import logging
 import threading
 import sys
 import time
-import win32com.client
-from ctypes import cast, POINTER
-from comtypes import CLSCTX_ALL
-from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+from audio_backend import PycawAudioBackend, AudioChangeWaiter, EVENT_DEVICE_CHANGED
+from audio_snapshot import AudioSnapshotSource
+from app_registry import get_registry
+from keyboard_bus import get_default_bus, KeyBindingConflict
+from lazy_import import LazyModule
+from headless import HeadlessLoop, HEADLESS_FLAG
+from notifications import get_notifier, LEVEL_WARNING
+from dialogs import WarningDialog, Toast
+from process_supervisor import start_heartbeat, is_supervised
+from app_logging import setup_logging
+from state_store import get_state_store
+from metrics import get_metrics, setup_metrics
+from poll_scheduler import PollScheduler
+from process_tracker import ProcessTracker, ProcConnectorFeed
+from audio_resolver import AudioBackendResolver, AllStagesFailedError, OP_VOLUME, OP_MUTE, OP_UNMUTE, default_stages
+
+# 只有显示窗口时才导入tkinter，无界面模式不加载
+tk = LazyModule('tkinter')
+
+logger = logging.getLogger('volume_monitor')
+
+_metrics = get_metrics()
+POLL_SECONDS = _metrics.histogram('focus_volume_poll_seconds', '一次音量检测周期的耗时（不含等待）')
+VOLUME_CHECK_SECONDS = _metrics.histogram('focus_volume_check_seconds', 'get_system_volume的耗时')
+MEDIA_SCAN_SECONDS = _metrics.histogram('focus_media_scan_seconds', 'is_media_playing的耗时')
+MUTE_TRIGGERS = _metrics.counter('focus_mute_triggers_total', '检测到外放并自动静音的次数')
 
 class VolumeMonitorApp:
-    def __init__(self):
-        # 创建主窗口
-        self.root = tk.Tk()
+    def __init__(self, audio_backend=None, master=None, keyboard_bus=None, headless=False, notifier=None,
+                 state_store=None):
+        self.hosted = master is not None
+        # 无界面模式：轻量主循环代替Tk窗口，提醒输出到通知目标（进程内宿主模式总是显示窗口）
+        self.headless = headless and not self.hosted
+        # 组件退出时的回调，由宿主设置
+        self.on_quit = None
+        self.stopped = False
+        if self.headless:
+            self.root = HeadlessLoop("音量监控助手")
+            self.notifier = notifier or get_notifier()
+        else:
+            self.build_window(master)
+        
+        # 初始化标志和资源
+        self.monitoring = False
+        self.monitor_thread = None
+        
+        # 禁用时间、最近一次触发和音频活动保存在共享的状态存储中，组件重启后继续生效
+        self.state = (state_store or get_state_store()).namespace('volume_monitor')
+        
+        # 添加静音设置禁用时间，初始为0表示未禁用
+        self.mute_disabled_until = self.state.get('mute_disabled_until', 0)
+        
+        # 音频后端：支持事件通知时只在音量/静音/会话状态变化时检测，否则退回轮询
+        self.audio_backend = audio_backend or PycawAudioBackend()
+        self.audio_backend.start()
+        self.audio_waiter = AudioChangeWaiter(self.audio_backend)
+        
+        # 应用程序分类注册表，用于识别媒体播放器进程
+        self.app_registry = get_registry()
+        
+        # 每个检测周期只枚举一次音频会话，所有检测共享同一快照
+        self.audio_snapshots = AudioSnapshotSource()
+        
+        # 音量检测、静音和取消静音共享同一个后端解析器，记住可用阶段并复用端点句柄
+        self.audio_resolver = AudioBackendResolver(
+            default_stages(self.app_registry.is_media, self.audio_snapshots.get))
+        self.audio_backend.add_listener(self.on_audio_event)
+        
+        # 媒体进程跟踪器：维护pid到进程名的映射，Linux下可由进程连接器事件驱动
+        process_feed = None
+        if sys.platform.startswith('linux'):
+            process_feed = ProcConnectorFeed()
+            if not process_feed.start():
+                process_feed = None
+        self.process_tracker = ProcessTracker(self.app_registry.is_media, feed=process_feed)
+        # 事件模式下的兜底轮询间隔，防止遗漏通知
+        self.fallback_poll_interval = 30
+        
+        # 轮询调度器：无事件通知时按音频活动自适应调整间隔，退出时立即唤醒监控线程
+        self.scheduler = PollScheduler()
+        self.trigger_backoff = 5  # 触发静音后暂停检测的时间，单位秒
+        self.error_backoff = 2    # 出错后暂停检测的时间，单位秒
+        # 重启前刚触发过静音时，等满触发间隔再检测，避免重启后立即再次静音并弹窗
+        self.mute_disabled_until = max(self.mute_disabled_until,
+                                       self.state.get('last_mute_at', 0) + self.trigger_backoff)
+        # 重启前不久还有音频活动时，从最短检测间隔开始
+        if time.time() - self.state.get('last_activity_at', 0) < 60:
+            self.scheduler.record_activity(True)
+        
+        # 通过共享键盘总线注册Q键退出，同一进程内的组件共用一个键盘钩子
+        # Q键是共享绑定：进程内宿主模式下按一次Q即退出所有组件，与子进程模式下各组件进程分别响应Q键一致
+        self.keyboard_bus = keyboard_bus or get_default_bus()
+        try:
+            self.keyboard_bus.register('q', self.quit_program, owner=self, shared=True)
+        except KeyBindingConflict as e:
+            logger.warning("快捷键冲突: %s", e)
+        
+        # 设置窗口关闭事件
+        self.root.protocol("WM_DELETE_WINDOW", self.quit_program)
+        
+        # 启动音量监控线程
+        self.monitoring = True
+        self.monitor_thread = threading.Thread(target=self.monitor_volume)
+        self.monitor_thread.daemon = True
+        self.monitor_thread.start()
+    
+    def build_window(self, master=None):
+        """创建主窗口；由进程内宿主启动时作为宿主根窗口的子窗口"""
+        self.root = tk.Toplevel(master) if master is not None else tk.Tk()
         self.root.title("音量监控助手")
         self.root.geometry("400x250")
         
@@ -37,569 +134,278 @@ class VolumeMonitorApp:
         )
         self.quit_button.pack(pady=10)
         
-        # 初始化标志和资源
-        self.monitoring = False
-        self.listener = None
-        self.monitor_thread = None
-        
-        # 添加静音设置禁用时间，初始为0表示未禁用
-        self.mute_disabled_until = 0
-        
-        # 安全地初始化pygame
-        self.init_pygame()
-        
-        # 设置全局键盘监听
-        self.listener = keyboard.Listener(on_press=self.on_key_press)
-        self.listener.daemon = True
-        self.listener.start()
-        
-        # 设置窗口关闭事件
-        self.root.protocol("WM_DELETE_WINDOW", self.quit_program)
-        
-        # 启动音量监控线程
-        self.monitoring = True
-        self.monitor_thread = threading.Thread(target=self.monitor_volume)
-        self.monitor_thread.daemon = True
-        self.monitor_thread.start()
+        # 音量警告和确认提示各只有一个窗口，第一次显示时创建，之后重复使用
+        self.warning_dialog = WarningDialog(
+            self.root, "音量提示", "检测到当前为外放状态，已设置系统为静音",
+            actions=[("取消静音设置", self.handle_cancel_mute, 15)])
+        self.confirm_toast = Toast(self.root)
     
     def get_system_volume(self):
         """获取系统音量，检测是否音量不为0且非静音模式"""
         try:
-            # 优先尝试使用pycaw获取音量，但使用更兼容的方式
-            try:
-                # 导入必要的模块
-                from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
-                from ctypes import cast, POINTER
-                from comtypes import CLSCTX_ALL
-                
-                # 获取所有活动的音频端点
-                devices = AudioUtilities.GetSpeakers()
-                
-                # 尝试获取音量接口
-                try:
-                    # 使用正确的pycaw方法获取音量
-                    volume = devices.EndpointVolume
-                    
-                    # 获取音量级别（0.0到1.0）
-                    current_volume = volume.GetMasterVolumeLevelScalar()
-                    
-                    # 检查是否静音
-                    is_muted = volume.GetMute()
-                    
-                    # 如果音量大于0且非静音模式，则返回True
-                    has_sound = current_volume > 0.01 and not is_muted
-                    print(f"音量检测 (pycaw): 级别={current_volume:.2f}, 静音={is_muted}, 有声音={has_sound}")
-                    return has_sound
-                except Exception as activation_error:
-                    print(f"pycaw激活失败: {activation_error}")
-                    
-                    # 尝试获取所有音频会话并检查是否有活动的声音
-                    sessions = AudioUtilities.GetAllSessions()
-                    active_sessions = 0
-                    
-                    # 定义媒体播放器进程列表（为了避免重复定义，直接在这里列出常见的）
-                    media_players = ['vlc.exe', 'potplayermini64.exe', 'potplayer64.exe', 'mpc-hc.exe', 'mpc-hc64.exe',
-                                    'wmplayer.exe', 'mplayer2.exe', 'kodi.exe', 'plexmediaplayer.exe', 'mxplayer.exe',
-                                    'spotify.exe', 'itunes.exe', 'qqmusic.exe', 'neteasemusic.exe', 'kuwo.exe',
-                                    'foobar2000.exe', 'winamp.exe', 'groove.exe', 'musicbee.exe', 'aimp.exe',
-                                    'chrome.exe', 'firefox.exe', 'edge.exe', 'opera.exe', 'brave.exe', 'safari.exe']
-                    
-                    for session in sessions:
-                        if session.State == 1:  # 活动状态
-                            volume = session.SimpleAudioVolume
-                            if volume and not volume.GetMute() and volume.GetMasterVolume() > 0.0:
-                                active_sessions += 1
-                                # 只对媒体播放器进程输出日志
-                                if session.Process and session.Process.name().lower() in media_players:
-                                    print(f"检测到活动音频会话: {session.Process.name()}")
-                    
-                    has_active_sound = active_sessions > 0
-                    # 不输出会话数量，避免暴露不必要的信息
-                    print(f"音频会话检测: 有声音={has_active_sound}")
-                    return has_active_sound
-            except Exception as pycaw_error:
-                print(f"pycaw方法失败: {pycaw_error}")
-                
-                # 备用方案：使用PowerShell命令获取系统音量
-                try:
-                    import subprocess
-                    import json
-                    
-                    # 使用PowerShell获取系统音量和静音状态
-                    ps_command = "(Get-SoundVolume).MasterVolumeLevelPercentage"  # 注意：这可能需要安装额外模块
-                    result = subprocess.run(["powershell", "-Command", ps_command], 
-                                          capture_output=True, text=True, timeout=2)
-                    
-                    if result.returncode == 0 and result.stdout.strip():
-                        volume_percent = float(result.stdout.strip())
-                        has_sound = volume_percent > 1.0  # 音量大于1%认为有声音
-                        print(f"PowerShell音量检测: 级别={volume_percent:.2f}%, 有声音={has_sound}")
-                        return has_sound
-                except Exception as ps_error:
-                    print(f"PowerShell方法失败: {ps_error}")
-                    
-                    # 备用方案：使用win32api（但不作为主要方法，因为它可能不准确）
-                    try:
-                        from ctypes import windll, byref, c_uint
-                        winmm = windll.winmm
-                        
-                        # 设置音量变量
-                        volume = c_uint(0)
-                        
-                        # 获取当前音量
-                        result = winmm.waveOutGetVolume(0, byref(volume))
-                        
-                        if result == 0:  # 成功获取音量
-                            # 分离左右声道音量
-                            left_volume = volume.value & 0xFFFF
-                            right_volume = (volume.value >> 16) & 0xFFFF
-                            
-                            # 计算平均音量（0-1范围）
-                            average_volume = ((left_volume + right_volume) / 2) / 65535.0
-                            
-                            # 重要：不要仅依赖这个值，添加额外的检查逻辑
-                            # 由于winmm可能不准确，我们将阈值提高到20%，避免误判
-                            has_sound = average_volume > 0.20
-                            print(f"winmm音量检测: 级别={average_volume:.2f}, 有声音={has_sound}")
-                            return has_sound
-                        else:
-                            print(f"winmm音量获取失败，错误代码: {result}")
-                    except Exception as winmm_error:
-                        print(f"winmm方法失败: {winmm_error}")
-            
+            return self.audio_resolver.run(OP_VOLUME)
+        except AllStagesFailedError as e:
             # 如果所有方法都失败，返回False以避免误触发
+            logger.warning("获取音量失败: %s", e)
             return False
         except Exception as e:
-            print(f"获取音量时发生异常: {e}")
+            logger.warning("获取音量时发生异常: %s", e)
             return False
     
     def is_media_playing(self):
         """检测是否有媒体播放器正在播放音频/视频"""
         try:
-            # 导入psutil模块
-            import psutil
-            
-            # 媒体播放器进程列表（分组管理）
-            media_players = [
-                # 视频播放器
-                'vlc.exe', 'potplayermini64.exe', 'potplayer64.exe', 'mpc-hc.exe', 'mpc-hc64.exe',
-                'wmplayer.exe', 'mplayer2.exe', 'kodi.exe', 'plexmediaplayer.exe', 'mxplayer.exe',
-                # 音乐播放器
-                'spotify.exe', 'itunes.exe', 'qqmusic.exe', 'neteasemusic.exe', 'kuwo.exe',
-                'foobar2000.exe', 'winamp.exe', 'groove.exe', 'musicbee.exe', 'aimp.exe',
-                # 浏览器
-                'chrome.exe', 'firefox.exe', 'edge.exe', 'opera.exe', 'brave.exe', 'safari.exe',
-            ]
-            
-            # 首先，尝试获取所有活动的音频会话，但只检查media_players中的程序
+            # 首先，检查本周期音频会话快照中正在出声的会话，但只检查媒体播放器程序
             try:
-                from pycaw.pycaw import AudioUtilities
-                
-                sessions = AudioUtilities.GetAllSessions()
-                for session in sessions:
-                    if session.State == 1:  # 活动状态
-                        volume = session.SimpleAudioVolume
-                        if volume and not volume.GetMute() and volume.GetMasterVolume() > 0.0 and session.Process:
-                            process_name = session.Process.name().lower()
-                            # 只输出并检测media_players中的程序
-                            if process_name in media_players:
-                                print(f"检测到活动音频会话: {process_name}")
-                                print(f"通过音频会话检测确认正在播放媒体")
-                                return True
+                for process_name in self.audio_snapshots.get().audible_names():
+                    if self.app_registry.is_media(process_name):
+                        logger.debug("检测到活动音频会话: %s", process_name)
+                        logger.debug("通过音频会话检测确认正在播放媒体")
+                        return True
             except Exception as session_error:
-                print(f"音频会话检测失败: {session_error}")
+                logger.warning("音频会话检测失败: %s", session_error)
             
-            # 检查常见媒体播放器进程
-            for proc in psutil.process_iter(['name']):
-                try:
-                    process_name = proc.info['name'].lower()
-                    
-                    if process_name in media_players:
-                        print(f"检测到媒体相关进程: {process_name}")
-                        return True
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                    pass
+            # 检查常见媒体播放器进程：增量刷新进程表，只处理新增和退出的进程
+            self.process_tracker.refresh()
+            if self.process_tracker.has_match():
+                logger.debug("检测到媒体相关进程: %s", ', '.join(sorted(self.process_tracker.matched_names())))
+                return True
             
             # 检查Windows Media Player COM对象
             try:
                 import win32com.client
                 wmp = win32com.client.Dispatch("WMPlayer.OCX")
                 if hasattr(wmp, 'playState') and wmp.playState == 3:  # 播放状态为3表示正在播放
-                    print("Windows Media Player正在播放")
+                    logger.debug("Windows Media Player正在播放")
                     return True
             except Exception as e:
-                print(f"WMPlayer检测失败: {e}")
+                logger.warning("WMPlayer检测失败: %s", e)
             
-            print("未检测到正在播放的媒体")
+            logger.debug("未检测到正在播放的媒体")
             return False
         except Exception as e:
-            print(f"媒体检测出错: {e}")
+            logger.warning("媒体检测出错: %s", e)
             return False
     
     def set_system_mute(self):
         """设置系统为静音状态"""
         try:
-            # 方法1：尝试使用pycaw设置系统静音
-            try:
-                from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
-                from ctypes import cast, POINTER
-                from comtypes import CLSCTX_ALL
-                
-                # 获取默认音频输出设备
-                devices = AudioUtilities.GetSpeakers()
-                
-                # 使用正确的pycaw方法获取并设置音量
-                try:
-                    volume = devices.EndpointVolume
-                    
-                    # 设置为静音
-                    volume.SetMute(1, None)
-                    print("已设置系统为静音 (pycaw方法)")
-                    return True
-                except AttributeError:
-                    # 如果Activate方法不存在，尝试通过会话设置静音
-                    sessions = AudioUtilities.GetAllSessions()
-                    for session in sessions:
-                        if session.State == 1:  # 活动状态
-                            volume = session.SimpleAudioVolume
-                            if volume:
-                                volume.SetMute(1, None)
-                    print("已设置所有活动音频会话为静音 (会话方法)")
-                    return True
-            except Exception as pycaw_error:
-                print(f"pycaw静音方法失败: {pycaw_error}")
-                
-                # 方法2：尝试使用win32api设置系统静音
-                try:
-                    import ctypes
-                    
-                    # 定义发送按键的函数
-                    def press_key(key_code):
-                        ctypes.windll.user32.keybd_event(key_code, 0, 0, 0)  # 按下键
-                        ctypes.windll.user32.keybd_event(key_code, 0, 0x0002, 0)  # 释放键
-                    
-                    # 模拟按下静音快捷键 (Windows键 + F3)
-                    VK_LWIN = 0x5B
-                    VK_F3 = 0x72
-                    
-                    # 按下Windows键
-                    ctypes.windll.user32.keybd_event(VK_LWIN, 0, 0, 0)
-                    # 按下F3键
-                    ctypes.windll.user32.keybd_event(VK_F3, 0, 0, 0)
-                    # 释放F3键
-                    ctypes.windll.user32.keybd_event(VK_F3, 0, 0x0002, 0)
-                    # 释放Windows键
-                    ctypes.windll.user32.keybd_event(VK_LWIN, 0, 0x0002, 0)
-                    
-                    print("已模拟静音快捷键 (Windows + F3)")
-                    return True
-                except Exception as win32_error:
-                    print(f"win32api静音方法失败: {win32_error}")
-                    
-                    # 方法3：使用PowerShell命令设置系统静音
-                    try:
-                        import subprocess
-                        
-                        # PowerShell命令来切换静音状态
-                        ps_command = "(New-Object -ComObject WScript.Shell).SendKeys([char]173)"
-                        result = subprocess.run(["powershell", "-Command", ps_command], 
-                                              capture_output=True, text=True, timeout=2)
-                        
-                        if result.returncode == 0:
-                            print("已通过PowerShell设置系统静音")
-                            return True
-                        else:
-                            print(f"PowerShell命令失败: {result.stderr}")
-                    except Exception as ps_error:
-                        print(f"PowerShell静音方法失败: {ps_error}")
-            
-            # 如果所有方法都失败
-            return False
+            return self.audio_resolver.run(OP_MUTE)
         except Exception as e:
-            print(f"设置系统静音时发生异常: {e}")
+            logger.warning("设置系统静音时发生异常: %s", e)
             return False
     
     def unmute_system(self):
         """取消系统静音状态"""
         try:
-            # 方法1：尝试使用pycaw取消系统静音
-            try:
-                from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
-                from ctypes import cast, POINTER
-                from comtypes import CLSCTX_ALL
-                
-                # 获取默认音频输出设备
-                devices = AudioUtilities.GetSpeakers()
-                
-                # 使用正确的pycaw方法获取并设置音量
-                try:
-                    volume = devices.EndpointVolume
-                    
-                    # 取消静音
-                    volume.SetMute(0, None)
-                    # 设置一个合适的音量级别
-                    volume.SetMasterVolumeLevelScalar(0.3, None)  # 30%音量
-                    print("已取消系统静音并设置音量 (pycaw方法)")
-                    return True
-                except AttributeError:
-                    # 如果Activate方法不存在，尝试通过会话取消静音
-                    sessions = AudioUtilities.GetAllSessions()
-                    for session in sessions:
-                        if session.State == 1:  # 活动状态
-                            volume = session.SimpleAudioVolume
-                            if volume:
-                                volume.SetMute(0, None)
-                    print("已取消所有活动音频会话静音 (会话方法)")
-                    return True
-            except Exception as pycaw_error:
-                print(f"pycaw取消静音方法失败: {pycaw_error}")
-                
-                # 方法2：尝试使用win32api取消系统静音
-                try:
-                    import ctypes
-                    
-                    # 再次模拟按下静音快捷键来取消静音
-                    VK_LWIN = 0x5B
-                    VK_F3 = 0x72
-                    
-                    # 按下Windows键
-                    ctypes.windll.user32.keybd_event(VK_LWIN, 0, 0, 0)
-                    # 按下F3键
-                    ctypes.windll.user32.keybd_event(VK_F3, 0, 0, 0)
-                    # 释放F3键
-                    ctypes.windll.user32.keybd_event(VK_F3, 0, 0x0002, 0)
-                    # 释放Windows键
-                    ctypes.windll.user32.keybd_event(VK_LWIN, 0, 0x0002, 0)
-                    
-                    print("已模拟取消静音快捷键 (Windows + F3)")
-                    return True
-                except Exception as win32_error:
-                    print(f"win32api取消静音方法失败: {win32_error}")
-                    
-                    # 方法3：使用PowerShell命令取消系统静音
-                    try:
-                        import subprocess
-                        
-                        # 再次使用PowerShell命令来切换静音状态
-                        ps_command = "(New-Object -ComObject WScript.Shell).SendKeys([char]173)"
-                        result = subprocess.run(["powershell", "-Command", ps_command], 
-                                              capture_output=True, text=True, timeout=2)
-                        
-                        if result.returncode == 0:
-                            print("已通过PowerShell取消系统静音")
-                            return True
-                        else:
-                            print(f"PowerShell命令失败: {result.stderr}")
-                    except Exception as ps_error:
-                        print(f"PowerShell取消静音方法失败: {ps_error}")
-            
-            # 如果所有方法都失败
-            return False
+            return self.audio_resolver.run(OP_UNMUTE)
         except Exception as e:
-            print(f"取消系统静音时发生异常: {e}")
+            logger.warning("取消系统静音时发生异常: %s", e)
             return False
     
-    def init_pygame(self):
-        """安全初始化pygame"""
-        try:
-            pygame.init()
-            pygame.mixer.init()
-            print("Pygame已成功初始化")
-        except Exception as e:
-            print(f"Pygame初始化失败: {e}")
-            # 即使pygame初始化失败，程序仍可以继续运行，只是可能会影响某些功能
+    def on_audio_event(self, event):
+        """默认输出设备变化时丢弃缓存的端点句柄"""
+        if event.kind == EVENT_DEVICE_CHANGED:
+            self.audio_resolver.invalidate()
+    
+    def check_once(self):
+        """执行一个检测周期，返回(是否有声音, 是否需要静音)"""
+        # 开始新的检测周期，本周期内的检测共享同一个音频会话快照
+        tick_start = time.perf_counter()
+        self.audio_snapshots.next_tick()
+        
+        # 检查音量和媒体播放状态
+        has_sound = self.get_system_volume()
+        scan_start = time.perf_counter()
+        VOLUME_CHECK_SECONDS.observe(scan_start - tick_start)
+        should_mute = False
+        if has_sound:
+            should_mute = self.is_media_playing()
+            MEDIA_SCAN_SECONDS.observe(time.perf_counter() - scan_start)
+        changes = self.audio_snapshots.diff()
+        if changes:
+            logger.debug("音频会话变化: %s", changes.describe())
+        POLL_SECONDS.observe(time.perf_counter() - tick_start)
+        return has_sound, should_mute
     
     def monitor_volume(self):
         """监控音量状态的线程函数，添加超时机制和更好的错误处理"""
-        check_interval = 1  # 默认检查间隔
-        
         while self.monitoring:
             try:
                 # 检查是否处于禁用静音设置的时间窗口内
                 current_time = time.time()
                 if current_time < self.mute_disabled_until:
                     remaining_time = int(self.mute_disabled_until - current_time)
-                    print(f"静音设置已暂时禁用，剩余时间: {remaining_time}秒")
-                    # 使用较短的间隔，但检查监控标志
-                    for _ in range(10):  # 总共等待10秒，但每秒检查一次监控标志
-                        if not self.monitoring:
-                            break
-                        time.sleep(1)
+                    logger.debug("静音设置已暂时禁用，%s秒后恢复检测", remaining_time)
+                    # 一直等待到禁用窗口结束，退出时立即唤醒
+                    self.scheduler.sleep_until(self.mute_disabled_until)
                     continue
                 
-                # 检查音量和媒体播放状态
-                if self.get_system_volume() and self.is_media_playing():
+                has_sound, should_mute = self.check_once()
+                
+                # 有媒体出声时提高检测频率，长时间无声时逐步降低
+                self.record_activity(has_sound, should_mute)
+                
+                if should_mute:
+                    MUTE_TRIGGERS.inc()
+                    self.state.set('last_mute_at', time.time())
+                    self.state.incr('mute_triggers')
                     # 设置系统静音
                     self.set_system_mute()
                     # 在主线程中显示消息框
                     if self.monitoring and self.root:
                         self.root.after(0, self.show_volume_warning)
-                    # 避免频繁触发，使用分段等待以响应退出信号
-                    for _ in range(5):  # 总共等待5秒，但每秒检查一次监控标志
-                        if not self.monitoring:
-                            break
-                        time.sleep(1)
+                    # 避免频繁触发，退出时立即唤醒
+                    self.scheduler.sleep(self.trigger_backoff)
                 else:
-                    # 使用较短的间隔，确保线程可以及时响应退出信号
-                    time.sleep(check_interval)
+                    self.wait_for_audio_change()
             except Exception as e:
-                print(f"监控线程出错: {e}")
-                # 发生错误后使用较短的间隔，但确保线程不会无限循环报错
-                for _ in range(2):  # 总共等待2秒，但每秒检查一次监控标志
-                    if not self.monitoring:
-                        break
-                    time.sleep(1)
+                logger.warning("监控线程出错: %s", e)
+                # 发生错误后等待一段时间，避免线程无限循环报错
+                self.scheduler.sleep(self.error_backoff)
+    
+    def record_activity(self, has_sound, should_mute):
+        """按本周期的检测结果调整轮询间隔，返回本周期是否算作音频活动
+
+        只有媒体正在播放或有会话正在出声时才算活动；音量不为0但没有声音的空闲桌面逐步降低检测频率。
+        """
+        active = should_mute or (has_sound and self.has_audible_session())
+        self.scheduler.record_activity(active)
+        if active:
+            self.state.set('last_activity_at', time.time())
+        return active
+    
+    def has_audible_session(self):
+        """本周期的音频会话快照中是否有正在出声的会话"""
+        try:
+            return bool(self.audio_snapshots.get().audible_names())
+        except Exception as e:
+            logger.debug("读取音频会话快照失败: %s", e)
+            return False
+    
+    def wait_for_audio_change(self):
+        """等待下一次检测时机：事件模式下等待变化通知，否则按自适应间隔轮询"""
+        if self.audio_backend.supports_events:
+            events = self.audio_waiter.wait(self.fallback_poll_interval)
+            if events:
+                logger.debug("收到音频状态变化通知: %s 个事件", len(events))
+        else:
+            self.scheduler.sleep(self.scheduler.next_delay())
     
     def show_volume_warning(self):
-        """显示音量警告消息框（顶层窗口，带取消静音选项）"""
+        """显示音量警告（带取消静音选项）；窗口仍在显示时只累加触发次数，不叠加新窗口"""
+        if self.headless:
+            # 无界面模式：发送提醒通知
+            self.notifier.notify("音量提示", "检测到当前为外放状态，已设置系统为静音", LEVEL_WARNING)
+            return
         try:
-            # 创建一个自定义的顶级窗口，设置为顶层
-            dialog = tk.Toplevel(self.root)
-            dialog.title("音量提示")
-            dialog.geometry("350x180")
-            dialog.resizable(False, False)
-            # 设置为顶层窗口
-            dialog.attributes('-topmost', True)
-            # 禁用父窗口
-            dialog.grab_set()
-            
-            # 计算窗口位置，使其显示在屏幕中间
-            dialog.update_idletasks()
-            width = dialog.winfo_width()
-            height = dialog.winfo_height()
-            x = (dialog.winfo_screenwidth() // 2) - (width // 2)
-            y = (dialog.winfo_screenheight() // 2) - (height // 2)
-            dialog.geometry('{}x{}+{}+{}'.format(width, height, x, y))
-            
-            # 添加提示信息
-            message = tk.Label(dialog, text="检测到当前为外放状态，已设置系统为静音", wraplength=330, pady=20)
-            message.pack()
-            
-            # 创建按钮框架
-            button_frame = tk.Frame(dialog)
-            button_frame.pack(pady=10)
-            
-            # 创建确定按钮
-            ok_button = tk.Button(button_frame, text="确定", width=10, command=dialog.destroy)
-            ok_button.pack(side=tk.LEFT, padx=5)
-            
-            # 创建取消静音设置按钮
-            cancel_mute_button = tk.Button(button_frame, text="取消静音设置", width=15, command=lambda: self.handle_cancel_mute(dialog))
-            cancel_mute_button.pack(side=tk.LEFT, padx=5)
-            
+            self.warning_dialog.show()
         except Exception as e:
-            print(f"显示消息框时出错: {e}")
+            logger.warning("显示消息框时出错: %s", e)
     
-    def handle_cancel_mute(self, dialog):
-        """处理取消静音设置的逻辑"""
+    def handle_cancel_mute(self):
+        """处理取消静音设置的逻辑（警告窗口已隐藏）"""
         try:
             # 取消系统静音
             self.unmute_system()
             
             # 设置5分钟（300秒）内不再监测音量
             self.mute_disabled_until = time.time() + 300
-            print("已取消静音设置，5分钟内不再监测音量")
-            
-            # 关闭对话框
-            dialog.destroy()
-            
-            # 显示一个确认消息，增大窗口尺寸以确保文字完全显示
-            confirm_dialog = tk.Toplevel(self.root)
-            confirm_dialog.title("操作确认")
-            confirm_dialog.geometry("320x120")
-            confirm_dialog.resizable(False, False)
-            confirm_dialog.attributes('-topmost', True)
+            self.state.set('mute_disabled_until', self.mute_disabled_until)
+            logger.info("已取消静音设置，5分钟内不再监测音量")
             
-            # 计算窗口位置，使其显示在屏幕中间
-            confirm_dialog.update_idletasks()
-            width = confirm_dialog.winfo_width()
-            height = confirm_dialog.winfo_height()
-            x = (confirm_dialog.winfo_screenwidth() // 2) - (width // 2)
-            y = (confirm_dialog.winfo_screenheight() // 2) - (height // 2)
-            confirm_dialog.geometry('{}x{}+{}+{}'.format(width, height, x, y))
-            
-            # 增加wraplength确保文字能完全显示
-            confirm_label = tk.Label(confirm_dialog, text="已取消静音设置，5分钟内不再监测音量", wraplength=300)
-            confirm_label.pack(pady=20)
-            
-            ok_button = tk.Button(confirm_dialog, text="确定", command=confirm_dialog.destroy)
-            ok_button.pack()
+            # 显示自动关闭的确认提示
+            self.confirm_toast.show("已取消静音设置，5分钟内不再监测音量")
             
         except Exception as e:
-            print(f"处理取消静音设置时出错: {e}")
+            logger.warning("处理取消静音设置时出错: %s", e)
     
-    def on_key_press(self, key):
-        """键盘按键处理"""
+    def stop(self):
+        """停止监控线程和键盘监听并释放资源，不关闭窗口也不退出进程"""
+        if self.stopped:
+            return
+        self.stopped = True
+        
+        # 1. 首先停止监控标志，通知线程停止运行
+        self.monitoring = False
+        
+        # 唤醒正在等待的监控线程，并注销系统通知
+        self.scheduler.stop()
         try:
-            if hasattr(key, 'char') and key.char:
-                if key.char.lower() == 'q':
-                    self.quit_program()
+            self.audio_waiter.close()
+            self.audio_backend.stop()
         except Exception as e:
-            print(f"键盘处理出错: {e}")
+            logger.warning("停止音频后端时出错: %s", e)
+        
+        if self.process_tracker.feed is not None:
+            self.process_tracker.feed.stop()
+        
+        # 2. 注销本组件的快捷键，最后一个组件注销时键盘钩子随之停止
+        self.keyboard_bus.unregister_owner(self)
+        
+        # 3. 等待监控线程结束：所有等待都会被调度器立即唤醒，通常无需等满超时时间
+        if self.monitor_thread and self.monitor_thread.is_alive() and threading.current_thread() is not self.monitor_thread:
+            logger.debug("等待监控线程结束...")
+            self.monitor_thread.join(timeout=1.0)
     
     def quit_program(self):
         """安全退出程序，确保所有线程和资源正确释放"""
-        print("正在退出程序...")
-        
-        # 1. 首先停止监控标志，通知线程停止运行
-        self.monitoring = False
-        
-        # 2. 停止键盘监听器
-        if self.listener:
-            try:
-                self.listener.stop()
-                print("键盘监听器已停止")
-            except Exception as e:
-                print(f"停止键盘监听器时出错: {e}")
+        logger.info("正在退出程序...")
+        self.stop()
         
-        # 3. 等待监控线程结束（最多等待2秒）
-        if self.monitor_thread and self.monitor_thread.is_alive():
+        # 进程内宿主模式：只销毁本组件的窗口，不停止共享的主循环，也不退出进程
+        # Q键处理函数在键盘钩子线程中运行，窗口操作交给Tk线程执行
+        if self.hosted:
             try:
-                # 由于线程设置了daemon=True，它不会阻止程序退出，但我们还是尝试等待它结束
-                import threading
-                # 使用事件和超时机制，而不是直接join，避免阻塞
-                monitor_event = threading.Event()
-                # 设置一个定时器，在1秒后继续执行退出流程
-                timer = threading.Timer(1.0, lambda: None)
-                timer.daemon = True
-                timer.start()
-                print("等待监控线程结束...")
+                self.root.after(0, self.close_hosted_window)
             except Exception as e:
-                print(f"等待监控线程结束时出错: {e}")
-        
-        # 4. 清理pygame资源
-        try:
-            pygame.quit()
-            print("Pygame资源已释放")
-        except Exception as e:
-            print(f"释放Pygame资源时出错: {e}")
+                logger.warning("关闭组件窗口时出错: %s", e)
+            return
         
         # 5. 安全关闭Tkinter窗口
         try:
             # 先quit，再destroy，确保事件循环停止
             if self.root:
                 self.root.quit()
-                print("Tkinter主循环已停止")
+                logger.debug("Tkinter主循环已停止")
                 # 短暂延迟，确保quit生效
                 time.sleep(0.1)
                 self.root.destroy()
-                print("Tkinter窗口已销毁")
+                logger.debug("Tkinter窗口已销毁")
         except Exception as e:
-            print(f"关闭Tkinter窗口时出错: {e}")
+            logger.warning("关闭Tkinter窗口时出错: %s", e)
         
         # 6. 最后退出Python进程
-        print("程序退出完成")
+        logger.info("程序退出完成")
         # 使用sys.exit(0)表示正常退出
         sys.exit(0)
     
+    def close_hosted_window(self):
+        """进程内宿主模式：在Tk线程中销毁本组件的窗口并通知宿主"""
+        try:
+            self.root.destroy()
+        except Exception as e:
+            logger.warning("关闭组件窗口时出错: %s", e)
+        if self.on_quit:
+            self.on_quit()
+        logger.info("组件已停止")
+    
     def run(self):
         """运行程序主循环"""
         self.root.mainloop()
 
 if __name__ == "__main__":
+    setup_logging('volume_monitor')
+    setup_metrics('volume_monitor')
     try:
-        app = VolumeMonitorApp()
+        app = VolumeMonitorApp(headless=HEADLESS_FLAG in sys.argv)
+        startup_profiler.watch_window(app.root)
+        # 由主程序启动时定期输出心跳
+        start_heartbeat(app.root)
         app.run()
     except Exception as e:
-        print(f"程序启动失败: {e}")
-        input("按回车键退出...")
\ No newline at end of file
+        logger.error("程序启动失败: %s", e)
+        # 单独运行时保留控制台窗口；由主程序监管时以非零退出码退出，按崩溃处理
+        if not is_supervised():
+            input("按回车键退出...")
+        sys.exit(1)
\ No newline at end of file
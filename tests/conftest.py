@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 组件模块以src为导入根目录（与入口脚本的运行方式一致）
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
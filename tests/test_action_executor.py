@@ -0,0 +1,91 @@
+"""动作执行器：合并、限流、有界队列和冷却时间的持久化"""
+import threading
+import time
+
+from action_executor import ActionExecutor, TokenBucket
+from state_store import StateStore
+
+
+def blocked_executor(**options):
+    """返回执行器和放行事件：执行器线程先被一个占位动作阻塞，之后提交的动作留在队列中"""
+    executor = ActionExecutor(**options)
+    started, release = threading.Event(), threading.Event()
+
+    def hold():
+        started.set()
+        release.wait(5)
+
+    executor.submit('hold', hold)
+    assert started.wait(5)
+    return executor, release
+
+
+def wait_for(condition, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > end:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def test_token_bucket_refuses_when_empty_and_refills():
+    bucket = TokenBucket(rate=2.0, capacity=2)
+    now = bucket.updated
+    assert bucket.try_acquire(now)
+    assert bucket.try_acquire(now)
+    assert not bucket.try_acquire(now)
+    # 0.5秒补充一个令牌
+    assert bucket.try_acquire(now + 0.5)
+    assert not bucket.try_acquire(now + 0.5)
+
+
+def test_coalesced_action_runs_once():
+    executor, release = blocked_executor()
+    runs = []
+    assert executor.submit('save', lambda: runs.append(1))
+    assert not executor.submit('save', lambda: runs.append(2))
+    assert not executor.submit('save', lambda: runs.append(3))
+    release.set()
+    assert wait_for(lambda: runs)
+    executor.stop()
+    assert runs == [1]
+    assert executor.coalesced == 2
+
+
+def test_rate_limited_action_is_refused():
+    executor = ActionExecutor()
+    executor.set_limit('pause', TokenBucket.from_cooldown(60))
+    runs = []
+    assert executor.submit('pause', lambda: runs.append(1))
+    assert wait_for(lambda: runs)
+    assert not executor.submit('pause', lambda: runs.append(2))
+    executor.stop()
+    assert runs == [1]
+    assert executor.rate_limited == 1
+
+
+def test_full_queue_drops_instead_of_blocking():
+    executor, release = blocked_executor(max_pending=1)
+    assert executor.submit('first', lambda: None)
+    start = time.perf_counter()
+    assert not executor.submit('second', lambda: None)
+    assert time.perf_counter() - start < 0.5
+    assert executor.dropped == 1
+    release.set()
+    executor.stop()
+
+
+def test_cooldown_survives_restart_through_state():
+    store = StateStore()
+    executor = ActionExecutor(state=store.namespace('hotkey_controller'))
+    ran = threading.Event()
+    executor.submit('pause', ran.set)
+    assert ran.wait(5)
+    executor.stop()
+    # 重启后的执行器从上次执行的时间继续计算冷却
+    restarted = ActionExecutor(state=store.namespace('hotkey_controller'))
+    restarted.set_limit('pause', TokenBucket.from_cooldown(60))
+    assert not restarted.submit('pause', lambda: None)
+    assert store.counter('hotkey_controller', 'runs.pause') == 1
+    restarted.stop()
@@ -0,0 +1,45 @@
+"""日志配置：重复日志抑制和不阻塞的日志队列"""
+import json
+import logging
+import queue
+
+from app_logging import DedupFilter, DroppingQueueHandler, JsonFormatter
+
+
+def make_record(message, *args, level=logging.WARNING):
+    return logging.LogRecord('volume_monitor', level, __file__, 1, message, args, None)
+
+
+def test_duplicates_are_suppressed_within_the_window_and_counted():
+    now = [0.0]
+    dedup = DedupFilter(window=60.0, clock=lambda: now[0])
+    assert dedup.filter(make_record("获取音量失败: %s", 'timeout'))
+    assert not dedup.filter(make_record("获取音量失败: %s", 'timeout'))
+    assert not dedup.filter(make_record("获取音量失败: %s", 'timeout'))
+    # 不同的消息不受影响
+    assert dedup.filter(make_record("获取音量失败: %s", 'denied'))
+    now[0] = 61.0
+    record = make_record("获取音量失败: %s", 'timeout')
+    assert dedup.filter(record)
+    assert record.repeated == 2
+
+
+def test_full_queue_drops_records_without_blocking():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    for index in range(5):
+        handler.handle(make_record("第%d条", index))
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_records_are_formatted_in_the_calling_thread():
+    handler = DroppingQueueHandler(queue.Queue())
+    args = ['原始']
+    handler.handle(make_record("参数: %s", args))
+    args.append('之后修改')
+    record = handler.queue.get_nowait()
+    assert record.msg == "参数: ['原始']"
+    assert record.args is None
+    entry = json.loads(JsonFormatter('volume_monitor').format(record))
+    assert entry['msg'] == "参数: ['原始']"
+    assert entry['component'] == 'volume_monitor'
@@ -0,0 +1,48 @@
+"""应用程序分类注册表"""
+from app_registry import (AhoCorasick, AppRegistry, CATEGORY_BROWSER, CATEGORY_DOCUMENT, CATEGORY_IDE,
+                          CATEGORY_MEDIA)
+
+
+def test_exact_substring_and_glob_matches():
+    registry = AppRegistry()
+    assert CATEGORY_MEDIA in registry.classify('VLC.exe')
+    assert CATEGORY_BROWSER in registry.classify('msedge.exe')
+    assert CATEGORY_DOCUMENT in registry.classify('notepad++.exe')
+    assert CATEGORY_IDE in registry.classify('idea64.exe')
+    assert registry.classify('') == frozenset()
+
+
+def test_is_media_uses_memoised_classification():
+    registry = AppRegistry()
+    assert registry.is_media('spotify.exe')
+    assert registry.is_media('firefox-esr')
+    assert not registry.is_media('winword.exe')
+    assert not registry.is_media(None)
+    assert {'spotify.exe', 'firefox-esr', 'winword.exe'} <= set(registry._cache)
+
+
+def test_background_browser_helpers_are_not_media():
+    registry = AppRegistry()
+    for name in ('msedgewebview2.exe', 'microsoftedgeupdate.exe', 'chromedriver.exe', 'operagx_updater.exe'):
+        assert not registry.is_media(name), name
+
+
+def test_short_office_names_do_not_match_other_apps():
+    registry = AppRegistry()
+    assert registry.is_editor('winword.exe')
+    for name in ('1password.exe', 'wordpad.exe', 'keywordmgr.exe', 'excelsior.exe', 'outlookupdater.exe',
+                 'anatomy.exe'):
+        assert not registry.is_editor(name), name
+
+
+def test_custom_tables():
+    registry = AppRegistry(exact={CATEGORY_MEDIA: ['player.bin']}, substrings={}, globs={})
+    assert registry.is_media('player.bin')
+    assert not registry.is_media('chrome.exe')
+
+
+def test_aho_corasick_finds_overlapping_patterns():
+    automaton = AhoCorasick()
+    for pattern in ('he', 'she', 'hers'):
+        automaton.add(pattern, pattern)
+    assert automaton.search('ushers') == {'he', 'she', 'hers'}
@@ -0,0 +1,137 @@
+"""音频后端事件路径：使用FakeAudioBackend，无需声卡和Windows"""
+import threading
+
+from audio_backend import (AudioChangeWaiter, FakeAudioBackend, PycawAudioBackend, EVENT_DEVICE_CHANGED,
+                           EVENT_MUTE, EVENT_SESSION_CREATED, EVENT_SESSION_STATE, EVENT_VOLUME, SESSION_ACTIVE,
+                           SESSION_EXPIRED, SESSION_INACTIVE)
+
+
+def make_backend():
+    backend = FakeAudioBackend()
+    assert backend.start()
+    events = []
+    backend.add_listener(events.append)
+    return backend, events
+
+
+def test_volume_and_mute_events_reach_listeners():
+    backend, events = make_backend()
+    backend.set_volume(0.5)
+    backend.set_mute(True)
+    assert [event.kind for event in events] == [EVENT_VOLUME, EVENT_MUTE]
+    assert events[0].volume == 0.5
+    assert events[1].muted is True
+    assert not backend.has_sound()
+
+
+def test_new_session_emits_created_then_state():
+    backend, events = make_backend()
+    backend.set_session_state('vlc.exe', SESSION_ACTIVE)
+    backend.set_session_state('vlc.exe', SESSION_INACTIVE)
+    assert [event.kind for event in events] == [EVENT_SESSION_CREATED, EVENT_SESSION_STATE, EVENT_SESSION_STATE]
+    assert events[-1].state == SESSION_INACTIVE
+    assert backend.active_sessions() == []
+
+
+def test_device_change_reattaches_before_notifying():
+    backend = FakeAudioBackend()
+    backend.start()
+    seen = []
+    backend.add_listener(lambda event: seen.append((event.kind, backend.device, backend.attachments)))
+    backend.change_device('headphones')
+    assert seen == [(EVENT_DEVICE_CHANGED, 'headphones', 2)]
+
+
+def test_failing_listener_does_not_block_others():
+    backend, events = make_backend()
+
+    def broken(event):
+        raise RuntimeError("boom")
+
+    backend.add_listener(broken)
+    backend.add_listener(events.append)  # 重复注册被忽略
+    backend.set_volume(0.2)
+    assert len(events) == 1
+
+
+def test_removed_listener_receives_nothing():
+    backend, events = make_backend()
+    backend.remove_listener(events.append)
+    backend.set_volume(0.3)
+    assert events == []
+
+
+def test_waiter_coalesces_events_into_one_wakeup():
+    backend = FakeAudioBackend()
+    waiter = AudioChangeWaiter(backend)
+    backend.set_volume(0.4)
+    backend.set_mute(False)
+    events = waiter.wait(1.0)
+    assert [event.kind for event in events] == [EVENT_VOLUME, EVENT_MUTE]
+    assert waiter.wait(0.01) == []
+
+
+def test_waiter_wakes_on_event_from_another_thread():
+    backend = FakeAudioBackend()
+    waiter = AudioChangeWaiter(backend)
+    timer = threading.Timer(0.05, backend.set_session_state, args=('vlc.exe', SESSION_ACTIVE))
+    timer.start()
+    events = waiter.wait(2.0)
+    timer.join()
+    assert events and events[0].kind == EVENT_SESSION_CREATED
+
+
+def test_closed_waiter_stops_listening():
+    backend = FakeAudioBackend()
+    waiter = AudioChangeWaiter(backend)
+    waiter.close()
+    backend.set_volume(0.9)
+    assert waiter.wait(0.01) == []
+
+
+class FakeSession:
+    def __init__(self, key, state=SESSION_ACTIVE):
+        self.InstanceIdentifier = key
+        self.State = state
+        self.Process = None
+        self.callback = None
+
+    def register_notification(self, callback):
+        self.callback = callback
+
+    def unregister_notification(self):
+        self.callback = None
+
+
+class FakeAudioUtilities:
+    def __init__(self, sessions):
+        self.sessions = sessions
+
+    def GetAllSessions(self):
+        return list(self.sessions)
+
+
+def test_session_callbacks_of_ended_sessions_are_removed():
+    backend = PycawAudioBackend()
+    player, browser = FakeSession('player'), FakeSession('browser')
+    utilities = FakeAudioUtilities([player, browser])
+    backend._register_sessions(utilities, lambda name: object())
+    assert set(backend._session_callbacks) == {'player', 'browser'}
+    # 播放器会话结束，浏览器会话从枚举中消失
+    player.State = SESSION_EXPIRED
+    utilities.sessions = [player]
+    backend._register_sessions(utilities, None)
+    assert backend._session_callbacks == {}
+    assert player.callback is None and browser.callback is None
+
+
+def test_new_sessions_are_registered_on_a_worker_thread():
+    backend = PycawAudioBackend()
+    backend._audio_utilities = FakeAudioUtilities([FakeSession('player')])
+    backend._callback_classes = (None, None, lambda name: threading.current_thread().name)
+    created = threading.Event()
+    backend.add_listener(lambda event: event.kind == EVENT_SESSION_CREATED and created.set())
+    backend._spawn(backend._on_session_created, "audio-session-register")
+    assert created.wait(2)
+    _, callback = backend._session_callbacks['player']
+    assert callback == "audio-session-register"
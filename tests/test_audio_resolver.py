@@ -0,0 +1,112 @@
+"""音频后端解析器：阶段顺序、熔断和恢复"""
+import time
+
+import pytest
+
+from audio_resolver import AllStagesFailedError, AudioBackendResolver, AudioStage, OP_MUTE, OP_UNMUTE, OP_VOLUME
+
+
+class ScriptedStage(AudioStage):
+    operations = frozenset([OP_VOLUME])
+
+    def __init__(self, name, result=True):
+        self.name = name
+        self.result = result
+        self.fail = False
+        self.calls = 0
+
+    def get_volume(self):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError(f"{self.name} failed")
+        return self.result
+
+
+def expire(resolver, name, operation=OP_VOLUME):
+    """让阶段该操作的退避时间立即结束（半开试探）"""
+    resolver.breakers[(name, operation)].open_until = 0
+
+
+def test_falls_back_while_primary_breaker_is_open():
+    primary, fallback = ScriptedStage('primary', True), ScriptedStage('fallback', False)
+    resolver = AudioBackendResolver([primary, fallback], base_delay=60)
+    primary.fail = True
+    assert resolver.run(OP_VOLUME) is False
+    assert resolver.preferred(OP_VOLUME) == 'fallback'
+    # 熔断期间不再调用失败的阶段
+    assert resolver.run(OP_VOLUME) is False
+    assert primary.calls == 1
+    assert fallback.calls == 2
+
+
+def test_recovers_primary_after_backoff():
+    primary, fallback = ScriptedStage('primary', True), ScriptedStage('fallback', False)
+    resolver = AudioBackendResolver([primary, fallback], base_delay=60)
+    primary.fail = True
+    resolver.run(OP_VOLUME)
+    primary.fail = False
+    expire(resolver, 'primary')
+    assert resolver.run(OP_VOLUME) is True
+    assert resolver.preferred(OP_VOLUME) == 'primary'
+    # 恢复后不再调用低优先级阶段
+    resolver.run(OP_VOLUME)
+    assert fallback.calls == 1
+
+
+def test_failed_probe_backs_off_exponentially():
+    primary, fallback = ScriptedStage('primary'), ScriptedStage('fallback')
+    resolver = AudioBackendResolver([primary, fallback], base_delay=10)
+    primary.fail = True
+    resolver.run(OP_VOLUME)
+    first = resolver.breakers[('primary', OP_VOLUME)].open_until - time.monotonic()
+    expire(resolver, 'primary')
+    resolver.run(OP_VOLUME)
+    second = resolver.breakers[('primary', OP_VOLUME)].open_until - time.monotonic()
+    assert primary.calls == 2
+    assert 9 < first <= 10
+    assert 19 < second <= 20
+
+
+def test_stages_without_the_operation_are_skipped():
+    stage = ScriptedStage('volume_only')
+    resolver = AudioBackendResolver([stage])
+    with pytest.raises(AllStagesFailedError):
+        resolver.run(OP_MUTE)
+    assert stage.calls == 0
+
+
+def test_invalidate_closes_breakers():
+    primary, fallback = ScriptedStage('primary', True), ScriptedStage('fallback', False)
+    resolver = AudioBackendResolver([primary, fallback], base_delay=60)
+    primary.fail = True
+    resolver.run(OP_VOLUME)
+    primary.fail = False
+    resolver.invalidate()
+    assert resolver.run(OP_VOLUME) is True
+
+
+class PowerShellLikeStage(ScriptedStage):
+    """读取音量失败但能静音的阶段"""
+    operations = frozenset([OP_VOLUME, OP_MUTE, OP_UNMUTE])
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.fail = True
+        self.mutes = 0
+
+    def mute(self):
+        self.mutes += 1
+        return True
+
+
+def test_failed_operation_does_not_block_other_operations_of_the_stage():
+    stage = PowerShellLikeStage('powershell')
+    resolver = AudioBackendResolver([stage], base_delay=60)
+    with pytest.raises(AllStagesFailedError):
+        resolver.run(OP_VOLUME)
+    assert resolver.run(OP_MUTE) is True
+    assert stage.mutes == 1
+    # 音量读取仍在熔断中
+    with pytest.raises(AllStagesFailedError):
+        resolver.run(OP_VOLUME)
+    assert stage.calls == 1
@@ -0,0 +1,60 @@
+"""定时自动保存：空闲判断不受自己注入的保存快捷键影响"""
+import threading
+import time
+
+from auto_saver import AutoSaver
+
+
+class FakeDesktop:
+    """带修改标记的记事本窗口，以及按最近一次输入计算的空闲时间"""
+
+    def __init__(self, windows=3):
+        self.windows = [(hwnd, f'*笔记{hwnd}.txt - 记事本', 100 + hwnd) for hwnd in range(1, windows + 1)]
+        self.last_input = time.monotonic() - 60.0
+        self.saved = []
+
+    def input(self):
+        self.last_input = time.monotonic()
+
+    def idle(self):
+        return time.monotonic() - self.last_input
+
+    def save_window(self, window, rule):
+        # 注入的Ctrl+S和窗口切换都会重置系统空闲计时：返回时空闲时间为0
+        self.saved.append(window.hwnd)
+        self.input()
+        return 'confirmed'
+
+
+def make_saver(desktop, save_window=None):
+    return AutoSaver(save_window or desktop.save_window, window_source=lambda: desktop.windows,
+                     idle_source=desktop.idle, process_names=lambda pid: 'notepad.exe',
+                     idle_threshold=5.0, spacing=0.01)
+
+
+def test_injected_saves_do_not_interrupt_the_batch():
+    desktop = FakeDesktop()
+    results = make_saver(desktop).run_batch()
+    assert [status for _, status in results] == ['confirmed'] * 3
+    assert sorted(desktop.saved) == [1, 2, 3]
+
+
+def test_real_input_after_injection_interrupts_the_batch():
+    desktop = FakeDesktop()
+
+    def save_then_type(window, rule):
+        # 用户在保存完成之后、下一个文档之前恢复输入
+        threading.Timer(0.1, desktop.input).start()
+        return desktop.save_window(window, rule)
+
+    saver = make_saver(desktop, save_then_type)
+    saver.spacing = 0.3
+    results = saver.run_batch()
+    assert len(results) == 1
+
+
+def test_user_idle_survives_injection():
+    desktop = FakeDesktop()
+    saver = make_saver(desktop)
+    saver.run_batch()
+    assert saver.idle_seconds() >= 60.0
@@ -0,0 +1,62 @@
+"""前台窗口跟踪器：事件源中断后的轮询回退和进程名缓存"""
+from foreground_tracker import (ForegroundTracker, FakeForegroundBackend, PollingBackend,
+                                ProcessInfoCache, WinEventBackend)
+
+
+class FailingHookBackend(WinEventBackend):
+    """钩子线程在就绪前或就绪后抛出异常的WinEvent事件源"""
+
+    def __init__(self, fail_before_ready):
+        super().__init__()
+        self.fail_before_ready = fail_before_ready
+
+    def _hook_loop(self, on_change):
+        if not self.fail_before_ready:
+            self._ready.set()
+        raise OSError("GetMessageW failed")
+
+
+def make_tracker(backend, processes):
+    return ForegroundTracker(backend, process_cache=ProcessInfoCache(processes.get),
+                             pid_source=lambda: list(processes), pid_exists=lambda pid: pid in processes)
+
+
+def test_hook_failure_during_start_falls_back_to_polling():
+    tracker = make_tracker(FailingHookBackend(fail_before_ready=True), {})
+    tracker.start()
+    assert isinstance(tracker.backend, PollingBackend)
+    tracker.stop()
+
+
+def test_hook_thread_dying_after_start_falls_back_to_polling():
+    backend = FailingHookBackend(fail_before_ready=False)
+    tracker = make_tracker(backend, {})
+    tracker.start()
+    backend._thread.join(2.0)
+    assert isinstance(tracker.backend, PollingBackend)
+    tracker.stop()
+
+
+def test_stopped_hook_thread_does_not_trigger_fallback():
+    backend = FailingHookBackend(fail_before_ready=False)
+    failures = []
+    backend.on_failure = failures.append
+    backend._ready.set()
+    backend.stop()
+    backend._run(None)
+    assert failures == []
+
+
+def test_exited_process_is_dropped_from_cache_before_pid_reuse():
+    processes = {5: 'winword.exe', 6: 'explorer.exe'}
+    backend = FakeForegroundBackend()
+    tracker = make_tracker(backend, processes)
+    tracker.start()
+    backend.set_foreground(1, '报告 - Word', 5)
+    assert tracker.current.process_name == 'winword.exe'
+    # Word退出，前台切换到资源管理器，之后pid 5被新进程复用
+    del processes[5]
+    backend.set_foreground(2, '下载', 6)
+    processes[5] = 'excel.exe'
+    backend.set_foreground(3, '表格 - Excel', 5)
+    assert tracker.current.process_name == 'excel.exe'
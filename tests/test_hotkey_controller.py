@@ -0,0 +1,59 @@
+"""快捷键控制器：没有可控制的媒体会话时的暂停回退"""
+import pytest
+
+from foreground_tracker import FakeForegroundBackend, ForegroundTracker, ProcessInfoCache
+from hotkey_controller import HotkeyControllerApp
+from input_injector import RecordingInjector
+from keyboard_bus import KeyboardBus
+from media_control import FakeMediaBackend, MediaController
+from notifications import NotificationSink
+from state_store import StateStore
+
+
+class FakeListener:
+    def __init__(self, on_press):
+        self.on_press = on_press
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class RecordingSink(NotificationSink):
+    def __init__(self):
+        self.statuses = []
+
+    def status(self, component, message):
+        self.statuses.append(message)
+
+
+@pytest.fixture
+def controller():
+    processes = {10: 'winword.exe', 20: 'vlc.exe'}
+    backend = FakeForegroundBackend()
+    tracker = ForegroundTracker(backend, process_cache=ProcessInfoCache(processes.get),
+                                pid_source=lambda: list(processes), pid_exists=lambda pid: pid in processes)
+    tracker.start()
+    injector = RecordingInjector()
+    app = HotkeyControllerApp(keyboard_bus=KeyboardBus(FakeListener), foreground_tracker=tracker,
+                              input_injector=injector, media_controller=MediaController(FakeMediaBackend()),
+                              headless=True, notifier=RecordingSink(), state_store=StateStore())
+    yield app, backend, injector
+    app.stop()
+
+
+def test_no_key_is_sent_to_an_editor_without_a_media_session(controller):
+    app, foreground, injector = controller
+    foreground.set_foreground(1, '报告 - Word', 10)
+    app.pause_video()
+    assert injector.keys == []
+    assert app.notifier.statuses[-1] == "没有正在播放的媒体，未发送暂停命令"
+
+
+def test_space_is_sent_to_a_focused_media_player(controller):
+    app, foreground, injector = controller
+    foreground.set_foreground(2, '电影 - VLC media player', 20)
+    app.pause_video()
+    assert injector.keys == [('space',)]
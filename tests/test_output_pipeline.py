@@ -0,0 +1,49 @@
+"""子进程输出管道：持续读取输出、行过滤和积压丢弃"""
+import subprocess
+import sys
+import time
+
+from output_pipeline import LogLine, OutputPipeline
+
+# 写出远超管道缓冲区（通常64KB）的输出后退出；没有持续读取时子进程会阻塞在print上
+CHATTY_CHILD = r"""
+import sys
+for index in range(5000):
+    print(f"line {index} " + "x" * 60)
+    if index % 1000 == 0:
+        print("@@heartbeat@@")
+print("oops", file=sys.stderr)
+"""
+
+
+def test_chatty_child_does_not_block_and_lines_are_filtered():
+    pipeline = OutputPipeline(capacity=10000)
+    heartbeats = []
+
+    def heartbeat_filter(component, stream, text):
+        if text == '@@heartbeat@@':
+            heartbeats.append(component)
+            return True
+        return False
+
+    pipeline.add_filter(heartbeat_filter)
+    process = subprocess.Popen([sys.executable, '-c', CHATTY_CHILD], stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE, text=True)
+    pipeline.attach('volume_monitor', process)
+    assert process.wait(timeout=20) == 0
+    for reader in pipeline._readers:
+        reader.join(5)
+    lines = pipeline.drain(max_lines=10000)
+    assert len([line for line in lines if line.stream == 'stdout']) == 5000
+    assert [line.text for line in lines if line.stream == 'stderr'] == ['oops']
+    assert heartbeats == ['volume_monitor'] * 5
+    assert all(line.component == 'volume_monitor' for line in lines)
+
+
+def test_backlog_beyond_capacity_drops_oldest_lines():
+    pipeline = OutputPipeline(capacity=3)
+    for index in range(5):
+        pipeline.append(LogLine('saver', 'stdout', f'line {index}', timestamp=time.time()))
+    assert pipeline.dropped == 2
+    assert [line.text for line in pipeline.drain()] == ['line 2', 'line 3', 'line 4']
+    assert pipeline.drain() == []
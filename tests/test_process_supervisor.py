@@ -0,0 +1,85 @@
+"""子进程监管器：停止与重启期间的状态通知"""
+import threading
+
+from process_supervisor import ProcessSupervisor, STATE_CRASHED, STATE_RUNNING, STATE_STOPPED
+
+
+class FakeProcess:
+    # 不会与真实进程重复的pid，_kill_tree查找psutil进程时总是失败
+    _next_pid = 10 ** 9
+
+    def __init__(self):
+        FakeProcess._next_pid += 1
+        self.pid = FakeProcess._next_pid
+        self.returncode = None
+        self.killed = False
+
+    def poll(self):
+        return self.returncode
+
+    def terminate(self):
+        self.returncode = 0
+
+    def kill(self):
+        self.killed = True
+        self.returncode = -9
+
+    def wait(self, timeout=None):
+        return self.returncode
+
+
+def make_supervisor(launcher=None):
+    events = []
+    supervisor = ProcessSupervisor(launcher or (lambda name: FakeProcess()),
+                                   on_state_change=lambda name, state, detail: events.append((name, state)),
+                                   check_interval=3600)
+    return supervisor, events
+
+
+def test_background_stop_does_not_mark_replacement_as_stopped():
+    supervisor, events = make_supervisor()
+    supervisor.add('volume_monitor', FakeProcess())
+    release = threading.Event()
+    done = threading.Event()
+    old = supervisor.children['volume_monitor']
+    old.process.wait = lambda timeout=None: release.wait(5)
+    supervisor.stop_all(on_done=done.set)
+    # 停止线程还在等待旧进程时，同名组件重新启动
+    supervisor.add('volume_monitor', FakeProcess())
+    release.set()
+    assert done.wait(5)
+    assert events[-1] == ('volume_monitor', STATE_RUNNING)
+    assert supervisor.states() == {'volume_monitor': STATE_RUNNING}
+    supervisor.shutdown()
+
+
+def test_stop_without_replacement_reports_stopped():
+    supervisor, events = make_supervisor()
+    supervisor.add('volume_monitor', FakeProcess())
+    supervisor.stop_all(wait=True)
+    assert events[-1] == ('volume_monitor', STATE_STOPPED)
+    supervisor.shutdown()
+
+
+def test_stop_during_restart_kills_relaunched_process():
+    launched = []
+
+    def launcher(name):
+        # 重启过程中用户停止所有组件并启动了新实例
+        supervisor.stop_all(wait=True)
+        supervisor.add(name, FakeProcess())
+        process = FakeProcess()
+        launched.append(process)
+        return process
+
+    supervisor, events = make_supervisor(launcher)
+    supervisor.add('hotkey_controller', FakeProcess())
+    child = supervisor.children['hotkey_controller']
+    child.state = STATE_CRASHED
+    child.restart_at = 0
+    supervisor._check(child, now=1.0)
+    assert launched[0].killed
+    assert events[-1] == ('hotkey_controller', STATE_RUNNING)
+    assert supervisor.children['hotkey_controller'] is not child
+    assert supervisor.children['hotkey_controller'].restarts == 0
+    supervisor.shutdown()
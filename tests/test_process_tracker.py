@@ -0,0 +1,80 @@
+"""增量进程跟踪器：pid差集同步和事件源"""
+from process_tracker import ProcessTracker
+
+
+class FakeFeed:
+    def __init__(self):
+        self.running = True
+        self.pending = []
+
+    def drain(self):
+        events, self.pending = self.pending, []
+        return events
+
+
+def is_media(name):
+    return name in ('vlc.exe', 'spotify.exe')
+
+
+def make_tracker(processes, feed=None, during_listing=None):
+    def pids():
+        snapshot = list(processes)
+        if during_listing is not None:
+            during_listing()
+        return snapshot
+    return ProcessTracker(is_media, pid_source=pids, name_lookup=processes.get, feed=feed)
+
+
+def test_diff_sync_tracks_started_and_exited_processes():
+    processes = {1: 'explorer.exe', 2: 'vlc.exe'}
+    tracker = make_tracker(processes)
+    tracker.refresh()
+    assert tracker.matched_names() == {'vlc.exe'}
+    del processes[2]
+    processes[3] = 'spotify.exe'
+    tracker.refresh()
+    assert tracker.matched_names() == {'spotify.exe'}
+
+
+def test_events_during_full_sync_are_applied_on_top_of_snapshot():
+    processes = {1: 'explorer.exe', 2: 'vlc.exe'}
+    feed = FakeFeed()
+    # 快照之前的旧事件：对应的进程早已不存在
+    feed.pending.append(('exec', 99))
+
+    def race():
+        # 列举进行中：新的媒体进程启动，已列举的进程退出
+        processes[3] = 'spotify.exe'
+        feed.pending.append(('exec', 3))
+        del processes[2]
+        feed.pending.append(('exit', 2))
+
+    tracker = make_tracker(processes, feed=feed, during_listing=race)
+    tracker.refresh()
+    assert tracker.matched_names() == {'spotify.exe'}
+    assert 99 not in tracker.names
+
+
+def test_event_mode_after_initial_sync():
+    processes = {1: 'explorer.exe'}
+    feed = FakeFeed()
+    tracker = make_tracker(processes, feed=feed)
+    tracker.refresh()
+    processes[5] = 'vlc.exe'
+    feed.pending.append(('fork', 5))
+    tracker.refresh()
+    assert tracker.has_match()
+    feed.pending.append(('exit', 5))
+    tracker.refresh()
+    assert not tracker.has_match()
+
+
+def test_exec_of_vanished_process_removes_it():
+    processes = {1: 'explorer.exe', 2: 'vlc.exe'}
+    feed = FakeFeed()
+    tracker = make_tracker(processes, feed=feed)
+    tracker.refresh()
+    del processes[2]
+    feed.pending.append(('exec', 2))
+    tracker.refresh()
+    assert not tracker.has_match()
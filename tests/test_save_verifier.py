@@ -0,0 +1,34 @@
+"""保存确认：标题修改标记、文件修改时间和无法观察的情况"""
+import os
+
+from save_verifier import SaveVerifier, SAVE_CONFIRMED, SAVE_NOT_DIRTY, SAVE_UNVERIFIED
+
+
+def make_verifier(titles):
+    return SaveVerifier(lambda hwnd: titles[hwnd], poll_interval=0.001, deadline=0.05, clean_deadline=0.02)
+
+
+def test_unobservable_window_is_unverified():
+    titles = {1: 'Untitled - Editor'}
+    verifier = make_verifier(titles)
+    result = verifier.verify(verifier.snapshot(1))
+    assert result.status == SAVE_UNVERIFIED
+    assert not result.confirmed
+
+
+def test_dirty_mark_cleared_confirms_save():
+    titles = {1: '*notes.txt - Notepad'}
+    verifier = make_verifier(titles)
+    snapshot = verifier.snapshot(1)
+    titles[1] = 'notes.txt - Notepad'
+    assert verifier.verify(snapshot).status == SAVE_CONFIRMED
+
+
+def test_clean_title_with_unchanged_file_is_not_dirty(tmp_path):
+    path = tmp_path / 'notes.txt'
+    path.write_text('text')
+    titles = {1: f'{path} - Notepad++'}
+    verifier = make_verifier(titles)
+    snapshot = verifier.snapshot(1)
+    assert snapshot.path == os.fspath(path)
+    assert verifier.verify(snapshot).status == SAVE_NOT_DIRTY
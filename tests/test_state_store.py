@@ -0,0 +1,70 @@
+"""状态存储：重启后保留状态，多个进程共用计数器"""
+from state_store import StateStore
+
+
+def open_store(tmp_path):
+    # 写出间隔设得很长，测试中由flush/close决定何时写入
+    return StateStore(str(tmp_path / 'state.db'), flush_interval=3600)
+
+
+def test_values_and_counters_survive_reopen(tmp_path):
+    store = open_store(tmp_path)
+    assert store.persistent
+    store.set('executor', 'cooldown:mute', 123.5)
+    store.set('saver', 'disabled', {'until': 10, 'apps': ['word.exe']})
+    store.incr('stats', 'saves')
+    store.incr('stats', 'saves', 4)
+    store.close()
+
+    store = open_store(tmp_path)
+    assert store.get('executor', 'cooldown:mute') == 123.5
+    assert store.get('saver', 'disabled') == {'until': 10, 'apps': ['word.exe']}
+    assert store.counter('stats', 'saves') == 5
+    assert store.get('executor', 'missing', 'default') == 'default'
+    store.close()
+
+
+def test_two_stores_add_to_the_same_counter(tmp_path):
+    first = open_store(tmp_path)
+    second = open_store(tmp_path)
+    # 两个进程各自载入了旧值后再累加，增量写出不会互相覆盖
+    assert first.counter('stats', 'mutes') == 0
+    assert second.counter('stats', 'mutes') == 0
+    for _ in range(3):
+        first.incr('stats', 'mutes')
+    second.incr('stats', 'mutes', 10)
+    first.close()
+    second.close()
+
+    store = open_store(tmp_path)
+    assert store.counter('stats', 'mutes') == 13
+    store.close()
+
+
+def test_flush_writes_only_last_value_of_each_key(tmp_path):
+    store = open_store(tmp_path)
+    for value in range(100):
+        store.set('executor', 'cooldown:pause', value)
+    store.incr('stats', 'pauses')
+    store.incr('stats', 'pauses')
+    assert store.flush() == 2
+    assert store.flush() == 0
+    store.close()
+
+    store = open_store(tmp_path)
+    assert store.get('executor', 'cooldown:pause') == 99
+    assert store.counter('stats', 'pauses') == 2
+    store.close()
+
+
+def test_namespace_view_and_prefix_items(tmp_path):
+    store = open_store(tmp_path)
+    executor = store.namespace('executor')
+    executor.set('cooldown:mute', 1)
+    executor.set('cooldown:pause', 2)
+    executor.set('limit', 3)
+    store.close()
+
+    store = open_store(tmp_path)
+    assert sorted(store.namespace('executor').items('cooldown:')) == [('cooldown:mute', 1), ('cooldown:pause', 2)]
+    store.close()
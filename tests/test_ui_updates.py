@@ -0,0 +1,68 @@
+"""状态发布板：合并更新并按上限频率刷新"""
+import threading
+
+import ui_updates
+from ui_updates import StatusBoard
+
+
+class FakeRoot:
+    """记录after回调，由测试决定何时执行（相当于Tk主循环）"""
+
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, delay_ms, callback):
+        self.scheduled.append((delay_ms, callback))
+
+    def run_pending(self):
+        pending, self.scheduled = self.scheduled, []
+        for _, callback in pending:
+            callback()
+
+
+def test_burst_of_publishes_is_one_flush_with_the_latest_text():
+    root = FakeRoot()
+    board = StatusBoard(root, rate=30)
+    shown = []
+    board.slot('saver', shown.append)
+    threads = [threading.Thread(target=lambda i=i: board.publish('saver', f'状态 {i}')) for i in range(50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    board.publish('saver', '最终状态')
+    assert len(root.scheduled) == 1
+    root.run_pending()
+    assert shown == ['最终状态']
+    assert board.flushes == 1
+
+
+def test_next_flush_waits_for_the_rate_interval(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(ui_updates.time, 'monotonic', lambda: clock[0])
+    root = FakeRoot()
+    board = StatusBoard(root, rate=30)
+    board.slot('hotkey', lambda text: None)
+    board.publish('hotkey', '第一次')
+    assert root.scheduled[0][0] == 0
+    root.run_pending()
+    clock[0] += 0.010
+    board.publish('hotkey', '第二次')
+    # 10毫秒前刚刷新过：下一次刷新安排在1/30秒的间隔结束时
+    assert root.scheduled[0][0] == 23
+
+
+def test_only_changed_and_registered_slots_are_updated():
+    root = FakeRoot()
+    board = StatusBoard(root)
+    shown = {'volume': [], 'saver': []}
+    board.slot('volume', shown['volume'].append)
+    board.slot('saver', shown['saver'].append)
+    board.publish('volume', '已静音')
+    board.publish('unknown', '忽略')
+    root.run_pending()
+    assert shown == {'volume': ['已静音'], 'saver': []}
+    board.publish('saver', '已保存')
+    board.remove('saver')
+    root.run_pending()
+    assert shown['saver'] == []
@@ -0,0 +1,61 @@
+"""音量监控：轮询间隔只在媒体真正出声时缩短"""
+import pytest
+
+from audio_backend import FakeAudioBackend, SESSION_ACTIVE, SESSION_INACTIVE
+from audio_snapshot import AudioSnapshotSource, SessionRecord
+from keyboard_bus import KeyboardBus
+from notifications import NotificationSink
+from state_store import StateStore
+from volume_monitor import VolumeMonitorApp
+
+
+class FakeListener:
+    def __init__(self, on_press):
+        pass
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+@pytest.fixture
+def monitor():
+    app = VolumeMonitorApp(audio_backend=FakeAudioBackend(), keyboard_bus=KeyboardBus(FakeListener),
+                           headless=True, notifier=NotificationSink(), state_store=StateStore())
+    # 由测试逐个驱动检测周期
+    app.stop()
+    sessions = []
+    app.audio_snapshots = AudioSnapshotSource(reader=lambda: sessions)
+    yield app, sessions
+
+
+def tick(app, has_sound, should_mute=False):
+    app.audio_snapshots.next_tick()
+    return app.record_activity(has_sound, should_mute)
+
+
+def test_idle_desktop_with_volume_on_backs_off(monitor):
+    app, sessions = monitor
+    sessions.append(SessionRecord(1, 'explorer.exe', SESSION_INACTIVE, False, 1.0))
+    for _ in range(20):
+        assert not tick(app, has_sound=True)
+    assert app.scheduler.interval == app.scheduler.max_interval
+
+
+def test_audible_session_or_mute_counts_as_activity(monitor):
+    app, sessions = monitor
+    for _ in range(20):
+        tick(app, has_sound=True)
+    sessions.append(SessionRecord(2, 'game.exe', SESSION_ACTIVE, False, 0.8))
+    assert tick(app, has_sound=True)
+    assert app.scheduler.interval == app.scheduler.min_interval
+    sessions.clear()
+    assert tick(app, has_sound=True, should_mute=True)
+
+
+def test_muted_output_is_not_activity(monitor):
+    app, sessions = monitor
+    sessions.append(SessionRecord(2, 'game.exe', SESSION_ACTIVE, False, 0.8))
+    assert not tick(app, has_sound=False)